@@ -8,6 +8,20 @@ from app.models.user import User, UserAccessRole, UserUpdate
 from app.models.game_and_roles import Game
 from app.services.user_service import get_user, get_all_users, update_user, delete_user
 from app.services.game_service import delete_game, get_all_games
+from app.services.game_phases_service import phase_manager
+from app.services.game_state_service import game_state_manager
+from app.services.state_snapshot_service import state_snapshot_service
+from app.services.game_index_service import game_index_service
+from app.services.eligible_targets_service import eligible_targets_service
+from app.services.voting_service import voting_service
+from app.services.werewolf_consensus_service import werewolf_consensus_service
+from app.services.game_actor_service import game_actor_service
+from app.services.game_event_service import game_event_service
+from app.services.player_view_service import player_view_service
+from app.services.auth_cache_service import auth_cache_service
+from app.services.password_hashing_service import password_hashing_service
+from app.services.user_status_buffer_service import user_status_buffer
+from app.services.presence_service import presence_service
 from app.core.dependencies import admin_required
 
 router = APIRouter(prefix="/admin",tags=["admin"])
@@ -66,3 +80,23 @@ def admin_delete_game(game_id: str, admin=Depends(admin_required)):
 def admin_list_games(admin=Depends(admin_required)):
     """Consultar el estado de todas las partidas activas o históricas (solo admin)."""
     return get_all_games()
+
+@router.get("/metrics")
+def admin_get_metrics(admin=Depends(admin_required)):
+    """Métricas internas del servidor de juego: fases, timers y partidas residentes (solo admin)."""
+    return {
+        "phases": phase_manager.get_metrics(),
+        "game_states": game_state_manager.get_metrics(),
+        "snapshots": state_snapshot_service.get_metrics(),
+        "game_indexes": game_index_service.get_metrics(),
+        "eligible_targets": eligible_targets_service.get_metrics(),
+        "voting": voting_service.get_metrics(),
+        "werewolf_consensus": werewolf_consensus_service.get_metrics(),
+        "game_actors": game_actor_service.get_metrics(),
+        "game_events": game_event_service.get_metrics(),
+        "player_views": player_view_service.get_metrics(),
+        "auth_cache": auth_cache_service.get_metrics(),
+        "password_hashing": password_hashing_service.get_metrics(),
+        "user_status": user_status_buffer.get_metrics(),
+        "presence": presence_service.get_metrics()
+    }
@@ -7,15 +7,25 @@ Estos endpoints no requieren autenticación previa.
 from fastapi import APIRouter, HTTPException, Form, status
 from app.models.user import User, UserAccessRole, UserStatus
 from app.models.user_responses import LoginResponse, UserProfileResponse
-from app.services.user_service import create_user, get_all_users
-from app.core.security import hash_password, verify_password, create_access_token
+from app.services.user_service import create_user, get_user_by_username, update_password_hash
+from app.services.password_hashing_service import PasswordHashingBusy, busy_http_exception, password_hashing_service
+from app.core.security import create_access_token
+import asyncio
 import uuid
 
 router = APIRouter(tags=["auth"])
 
+# Las rutas son async para que la espera de bcrypt (en su propio pool acotado) no ocupe
+# hilos del threadpool de Starlette; los accesos a la base de datos (síncronos) se
+# ejecutan con asyncio.to_thread para no bloquear el loop.
+
 @router.post("/register", response_model=UserProfileResponse)
-def register_user(username: str = Form(...), email: str = Form(...), password: str = Form(...)):
-    hashed = hash_password(password)
+async def register_user(username: str = Form(...), email: str = Form(...), password: str = Form(...)):
+    try:
+        hashed = await password_hashing_service.hash_password(password)
+    except PasswordHashingBusy as e:
+        raise busy_http_exception(e)
+    
     user = User(
         id=str(uuid.uuid4()),
         username=username,
@@ -24,7 +34,7 @@ def register_user(username: str = Form(...), email: str = Form(...), password: s
         status=UserStatus.DISCONNECTED,
         hashed_password=hashed
     )
-    create_user(user)
+    await asyncio.to_thread(create_user, user)
     
     return UserProfileResponse(
         success=True,
@@ -33,13 +43,23 @@ def register_user(username: str = Form(...), email: str = Form(...), password: s
     )
 
 @router.post("/login", response_model=LoginResponse)
-def login_user(username: str = Form(...), password: str = Form(...)):
+async def login_user(username: str = Form(...), password: str = Form(...)):
     # Buscar usuario por username
-    users = get_all_users()
-    user = next((u for u in users if u.username == username), None)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await asyncio.to_thread(get_user_by_username, username)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales incorrectas")
     
+    try:
+        valid, new_hash = await password_hashing_service.verify_password(password, user.hashed_password)
+    except PasswordHashingBusy as e:
+        raise busy_http_exception(e)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales incorrectas")
+    
+    # El hash usaba otro coste: guardar el regenerado (la contraseña solo está disponible aquí)
+    if new_hash:
+        await asyncio.to_thread(update_password_hash, user, new_hash)
+    
     # Generar token JWT
     token = create_access_token({"sub": user.id, "username": user.username, "role": user.role})
     
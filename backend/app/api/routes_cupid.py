@@ -14,6 +14,7 @@ from app.models.player_actions import (
     LoversStatusResponse
 )
 from app.services import player_action_service
+from app.services.game_actor_service import game_actor_service
 
 router = APIRouter(prefix="/cupid", tags=["cupid"])
 
@@ -42,8 +43,8 @@ async def choose_lovers(
         )
     
     # Elegir enamorados
-    updated_game = player_action_service.cupid_choose_lovers(
-        game_id, current_user.id, request.lover1_id, request.lover2_id
+    updated_game = await game_actor_service.call(
+        game_id, player_action_service.cupid_choose_lovers, game_id, current_user.id, request.lover1_id, request.lover2_id
     )
     
     if not updated_game:
@@ -171,7 +172,7 @@ async def check_lovers_death(
     # Esta función debería ser solo para administradores o llamadas internas del sistema
     # Por simplicidad, permitimos que cualquier jugador la llame
     
-    deaths = player_action_service.check_lovers_death(game_id, dead_player_id)
+    deaths = await game_actor_service.call(game_id, player_action_service.check_lovers_death, game_id, dead_player_id)
     
     return {
         "success": True,
@@ -220,7 +221,7 @@ async def initialize_cupid(
             detail="Solo Cupido puede inicializar sus acciones"
         )
     
-    success = player_action_service.initialize_cupid_night_actions(game_id, current_user.id)
+    success = await game_actor_service.call(game_id, player_action_service.initialize_cupid_night_actions, game_id, current_user.id)
     
     if not success:
         raise HTTPException(
@@ -244,7 +245,7 @@ async def reset_cupid_actions(
     Solo para administradores o el sistema.
     """
     # En una implementación real, esto debería ser solo para administradores
-    success = player_action_service.reset_cupid_night_actions(game_id)
+    success = await game_actor_service.call(game_id, player_action_service.reset_cupid_night_actions, game_id)
     
     if not success:
         raise HTTPException(
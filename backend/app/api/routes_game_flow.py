@@ -2,15 +2,27 @@
 Rutas de la API para el control de flujo de juego.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+import json
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from app.core.dependencies import get_current_user
-from app.models.user import User
+from app.models.user import User, UserAccessRole
 from app.models.game_and_roles import GameStatus, GameRole
+from app.models.player_actions import RoleActionBatchRequest, RoleActionBatchResponse
 from app.services.game_flow_controller import game_flow_controller
+from app.services.game_actor_service import game_actor_service
+from app.services.game_event_service import HISTORY_PAGE_SIZE, game_event_service
+from app.services.game_index_service import game_index_service
+from app.services.role_action_service import MAX_BATCH_ACTIONS, perform_role_actions
+from app.services.player_view_service import player_view_service
 
 router = APIRouter(prefix="/game-flow", tags=["game-flow"])
 
+MAX_HISTORY_PAGE_SIZE = 500
+
 
 @router.post("/process-night/{game_id}")
 async def process_night_phase(
@@ -22,7 +34,7 @@ async def process_night_phase(
     Solo accesible por administradores o el creador del juego.
     """
     # En una implementación real, verificaríamos permisos aquí
-    results = game_flow_controller.process_night_phase(game_id)
+    results = await game_actor_service.call(game_id, game_flow_controller.process_night_phase, game_id)
     
     if not results["success"]:
         raise HTTPException(
@@ -47,7 +59,7 @@ async def process_day_phase(
     Solo accesible por administradores o el creador del juego.
     """
     # En una implementación real, verificaríamos permisos aquí
-    results = game_flow_controller.process_day_phase(game_id)
+    results = await game_actor_service.call(game_id, game_flow_controller.process_day_phase, game_id)
     
     if not results["success"]:
         raise HTTPException(
@@ -111,6 +123,29 @@ async def get_pending_actions(
     }
 
 
+@router.post("/actions/{game_id}", response_model=RoleActionBatchResponse)
+async def submit_role_actions(
+    game_id: str,
+    request: RoleActionBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Aplica en orden un lote de acciones de rol del jugador (p. ej. curar y envenenar, o
+    elegir enamorados y consultar el estado de Cupido) con una sola carga y escritura de
+    la partida. Es atómico: si una acción falla, success es false y no se aplica ninguna.
+    """
+    if not request.actions:
+        raise HTTPException(status_code=400, detail="No actions provided")
+    if len(request.actions) > MAX_BATCH_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ACTIONS} actions per batch")
+    
+    outcome = await game_actor_service.call(
+        game_id, perform_role_actions, game_id, current_user.id,
+        [action.model_dump(exclude_none=True) for action in request.actions]
+    )
+    return RoleActionBatchResponse(**outcome)
+
+
 @router.post("/auto-advance/{game_id}")
 async def auto_advance_phase(
     game_id: str,
@@ -137,9 +172,9 @@ async def auto_advance_phase(
     
     # Procesar la fase actual
     if summary["status"] == "night":
-        results = game_flow_controller.process_night_phase(game_id)
+        results = await game_actor_service.call(game_id, game_flow_controller.process_night_phase, game_id)
     elif summary["status"] == "day":
-        results = game_flow_controller.process_day_phase(game_id)
+        results = await game_actor_service.call(game_id, game_flow_controller.process_day_phase, game_id)
     else:
         raise HTTPException(
             status_code=400,
@@ -159,6 +194,25 @@ async def auto_advance_phase(
     }
 
 
+@router.get("/my-view/{game_id}")
+def get_my_view(
+    game_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Vista consolidada de la fase actual para el jugador: rol, jugadores (con los roles que
+    puede conocer), acciones disponibles con sus objetivos, pociones, voto y temporizador.
+    Sustituye a las consultas por separado de rol, objetivos, información nocturna y voto.
+    """
+    view = player_view_service.get_view(game_id, current_user.id)
+    if view is None:
+        if not game_index_service.get_by_id(game_id):
+            raise HTTPException(status_code=404, detail="Game not found")
+        raise HTTPException(status_code=403, detail="You are not part of this game")
+    
+    return {"success": True, "view": view}
+
+
 @router.get("/player-role-info/{game_id}")
 async def get_player_role_info(
     game_id: str,
@@ -214,7 +268,8 @@ async def get_player_role_info(
                     response["available_actions"].append("wild_child_choose_model")
                     
         elif game.status == GameStatus.DAY:
-            if current_user.id not in game.day_votes:
+            from app.services.voting_service import VoteType, voting_service
+            if current_user.id not in voting_service.get_votes(game_id, VoteType.DAY_VOTE):
                 response["available_actions"].append("day_vote")
     
     # Información específica del rol
@@ -257,17 +312,58 @@ async def get_player_role_info(
 
 
 @router.get("/game-history/{game_id}")
-async def get_game_history(
+def get_game_history(
     game_id: str,
+    after_seq: int = Query(0, ge=0, description="Devolver eventos posteriores a esta secuencia (cursor)"),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    stream: bool = Query(False, description="Transmitir todo el historial como NDJSON, página a página"),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Obtiene el historial de eventos del juego.
-    (Placeholder - requeriría un sistema de logging de eventos)
+    Obtiene el historial de eventos del juego, paginado por secuencia.
+    Revela roles y acciones ocultas: solo para administradores o partidas terminadas.
     """
-    # En una implementación completa, esto devolvería el historial de eventos
+    _check_history_access(game_id, current_user)
+    
+    if stream:
+        lines = (
+            json.dumps(event, ensure_ascii=False) + "\n"
+            for event in game_event_service.iter_history(game_id, after_seq, limit)
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    
+    page = game_event_service.get_history(game_id, after_seq, limit)
     return {
         "success": True,
-        "message": "Game history feature not yet implemented",
-        "history": []
+        "history": page["events"],
+        "next_cursor": page["next_cursor"]
     }
+
+
+@router.get("/game-history/{game_id}/state")
+def get_game_state_at(
+    game_id: str,
+    seq: Optional[int] = Query(None, ge=1, description="Secuencia del evento (por defecto, el último)"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Reconstruye el estado del juego tras un evento, desde el snapshot más cercano.
+    Solo para administradores o partidas terminadas.
+    """
+    _check_history_access(game_id, current_user)
+    
+    reconstructed = game_event_service.reconstruct(game_id, seq)
+    if not reconstructed:
+        raise HTTPException(status_code=404, detail="No history available for this game")
+    
+    game, applied_seq = reconstructed
+    return {"success": True, "seq": applied_seq, "game": game}
+
+
+def _check_history_access(game_id: str, user: User):
+    """El historial solo es visible para administradores o cuando la partida ha terminado"""
+    index = game_index_service.get_by_id(game_id)
+    if not index:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if user.role != UserAccessRole.ADMIN and index.status != GameStatus.FINISHED:
+        raise HTTPException(status_code=403, detail="Game history is only available once the game has finished")
@@ -30,7 +30,7 @@ from app.services.game_flow_service import (
     change_game_status,
     assign_roles,
 )
-from app.core.dependencies import get_current_user, get_current_user_id
+from app.core.dependencies import get_current_user
 from app.database import game_to_game_response
 import uuid
 
@@ -111,7 +111,7 @@ def join_game_endpoint(game_id: str, user: User = Depends(get_current_user)):
 def assign_roles_endpoint(game_id: str, user=Depends(get_current_user)):
     """Permite al creador o admin iniciar el reparto de roles y comenzar la partida."""
     is_admin = user.role == UserAccessRole.ADMIN
-    game = assign_roles(game_id, get_current_user_id(), is_admin)
+    game = assign_roles(game_id, user.id, is_admin)
     if game:
         game_response = game_to_game_response(game)
         
@@ -50,8 +50,8 @@ def cast_day_vote(
         )
     
     # Realizar el voto
-    updated_game = day_vote(game_id, user.id, vote_request.target_id)
-    if not updated_game:
+    session = day_vote(game_id, user.id, vote_request.target_id)
+    if not session:
         raise HTTPException(
             status_code=400,
             detail="No se pudo registrar el voto. Verifica que el objetivo sea válido."
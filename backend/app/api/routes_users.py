@@ -17,10 +17,14 @@ from app.models.user_responses import (
     UserProfileResponse,
     UsersListResponse,
     UserUpdateResponse,
-    UserStatusUpdateResponse
+    UserStatusUpdateResponse,
+    PresenceListResponse
 )
 from app.services.user_service import get_user, get_all_users, update_user, update_user_status
+from app.services.password_hashing_service import PasswordHashingBusy, busy_http_exception, password_hashing_service
+from app.services.presence_service import presence_service
 from app.core.dependencies import get_current_user, admin_required
+import asyncio
 
 router = APIRouter(prefix="/users",tags=["users"])
 
@@ -33,6 +37,21 @@ def get_my_profile(current_user=Depends(get_current_user)):
         user=current_user
     )
 
+@router.get("/presence", response_model=PresenceListResponse)
+def get_presence(game_id: str | None = None, current_user=Depends(get_current_user)):
+    """
+    Obtiene los usuarios conectados ahora mismo, opcionalmente solo los de una partida.
+    Se responde desde la presencia en memoria, sin consultar la base de datos.
+    """
+    users = presence_service.get_all_presence(game_id)
+    return PresenceListResponse(
+        success=True,
+        message="Usuarios conectados obtenidos exitosamente",
+        game_id=game_id,
+        users=users,
+        total_online=len(users)
+    )
+
 @router.get("/{user_id}", response_model=UserProfileResponse)
 def get_user_by_id(user_id: str, current_user=Depends(get_current_user)):
     """Obtiene los datos de un usuario específico por su ID."""
@@ -64,12 +83,19 @@ def list_users(admin=Depends(admin_required)):
     )
 
 @router.put("/me", response_model=UserUpdateResponse)
-def update_my_profile(
+async def update_my_profile(
     update: UserUpdate = Body(...),
     user=Depends(get_current_user)
 ):
     """Actualiza los datos del perfil del usuario autenticado actual."""
-    updated = update_user(user, update)
+    # El hash de la nueva contraseña se calcula en el pool de contraseñas, no en línea
+    if update.password:
+        try:
+            user.hashed_password = await password_hashing_service.hash_password(update.password)
+        except PasswordHashingBusy as e:
+            raise busy_http_exception(e)
+    # Escritura síncrona en la base de datos: fuera del loop
+    updated = await asyncio.to_thread(update_user, user, update.model_copy(update={"password": None}))
     
     # Determinar qué campos se actualizaron basándose en los datos del request
     updated_fields = []
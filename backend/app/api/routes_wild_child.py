@@ -4,6 +4,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.core.dependencies import get_current_user
 from app.services import player_action_service, game_service
+from app.services.game_actor_service import game_actor_service
 from app.models.player_actions import (
     WildChildChooseModelRequest, WildChildChooseModelResponse,
     WildChildStatusResponse, WildChildAvailableModelsResponse
@@ -108,8 +109,8 @@ async def choose_model(
         )
     
     # Realizar la elección
-    updated_game = player_action_service.wild_child_choose_model(
-        game_id, wild_child_id, request.model_player_id
+    updated_game = await game_actor_service.call(
+        game_id, player_action_service.wild_child_choose_model, game_id, wild_child_id, request.model_player_id
     )
     
     if not updated_game:
@@ -184,7 +185,7 @@ async def check_transformation_trigger(
     # Este endpoint podría ser usado por el sistema para verificar transformaciones
     # después de muertes en el juego
     
-    transformations = player_action_service.check_wild_child_transformation(game_id, dead_player_id)
+    transformations = await game_actor_service.call(game_id, player_action_service.check_wild_child_transformation, game_id, dead_player_id)
     
     return {
         "success": True,
@@ -252,7 +253,7 @@ async def initialize_wild_child(
     """
     wild_child_id = current_user.id
     
-    success = player_action_service.initialize_wild_child(game_id, wild_child_id)
+    success = await game_actor_service.call(game_id, player_action_service.initialize_wild_child, game_id, wild_child_id)
     
     if not success:
         raise HTTPException(
@@ -275,7 +276,7 @@ async def process_death_checks(
     Procesa todas las verificaciones de muerte para posibles transformaciones.
     (Endpoint para uso del sistema después de procesar muertes)
     """
-    transformations = player_action_service.process_wild_child_death_check(game_id)
+    transformations = await game_actor_service.call(game_id, player_action_service.process_wild_child_death_check, game_id)
     
     return {
         "success": True,
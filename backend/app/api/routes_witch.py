@@ -4,6 +4,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.core.dependencies import get_current_user
 from app.services import player_action_service, game_service
+from app.services.game_actor_service import game_actor_service
 from app.models.player_actions import (
     WitchHealRequest, WitchHealResponse,
     WitchPoisonRequest, WitchPoisonResponse,
@@ -84,8 +85,8 @@ async def witch_heal_victim(
                 break
     
     # Realizar la curación
-    updated_game = player_action_service.witch_heal_victim(
-        game_id, witch_id, request.target_id
+    updated_game = await game_actor_service.call(
+        game_id, player_action_service.witch_heal_victim, game_id, witch_id, request.target_id
     )
     
     if not updated_game:
@@ -130,8 +131,8 @@ async def witch_poison_player(
                 break
     
     # Realizar el envenenamiento
-    updated_game = player_action_service.witch_poison_player(
-        game_id, witch_id, request.target_id
+    updated_game = await game_actor_service.call(
+        game_id, player_action_service.witch_poison_player, game_id, witch_id, request.target_id
     )
     
     if not updated_game:
@@ -248,7 +249,7 @@ async def initialize_potions(
     """
     witch_id = current_user.id
     
-    success = player_action_service.initialize_witch_potions(game_id, witch_id)
+    success = await game_actor_service.call(game_id, player_action_service.initialize_witch_potions, game_id, witch_id)
     
     if not success:
         raise HTTPException(
@@ -1,24 +1,30 @@
 """
 Dependencias reutilizables para rutas (por ejemplo, obtener usuario actual autenticado).
 """
+from typing import Any, Dict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.core.security import verify_access_token
-from app.services.user_service import get_user
+from app.services.auth_cache_service import auth_cache_service
 from app.models.user import UserAccessRole, User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)):
-    """Obtiene el ID del usuario actual a partir del token JWT."""
-    payload = verify_access_token(token)
+# FastAPI resuelve cada dependencia una sola vez por petición: get_current_user_id y
+# get_current_user comparten los claims del token aunque una ruta pida ambas.
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """Claims del token JWT, verificado una sola vez mientras siga en caché."""
+    payload = auth_cache_service.verify_token(token)
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido o expirado")
-    return payload["sub"]
+    return payload
+
+def get_current_user_id(claims: Dict[str, Any] = Depends(get_token_claims)) -> str:
+    """Obtiene el ID del usuario actual a partir del token JWT."""
+    return claims["sub"]
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    user_id = get_current_user_id(token)
-    user = get_user(user_id)
+def get_current_user(user_id: str = Depends(get_current_user_id)) -> User:
+    user = auth_cache_service.get_user(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
     return user
@@ -6,9 +6,14 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, UTC
 from typing import Optional
+import os
+
+# Coste de bcrypt (log2 de las iteraciones): cada punto duplica el tiempo de hash.
+# Los hashes con otro coste se regeneran de forma transparente en el siguiente login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 # Contexto de hash para contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # Configuración JWT
 SECRET_KEY = "supersecretkey"  # Cambiar por una clave segura en producción
@@ -23,6 +28,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica que la contraseña en texto plano coincide con el hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Indica si el hash usa un esquema obsoleto o un coste distinto del configurado."""
+    if pwd_context.needs_update(hashed_password):
+        return True
+    # $2b$<coste>$<salt+hash>
+    parts = hashed_password.split("$")
+    return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != BCRYPT_ROUNDS
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Genera un token JWT con los datos proporcionados."""
     to_encode = data.copy()
@@ -1,15 +1,18 @@
 import os
 import json
 import uuid
-from typing import List, Optional, Generator
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Generator
 from datetime import datetime, UTC
 from contextlib import contextmanager
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Boolean
+from contextvars import ContextVar
+from sqlalchemy import create_engine, func, Column, String, DateTime, Integer, Boolean, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
 from app.models.user import User, UserAccessRole, UserStatus
-from app.models.game_and_roles import Game, GameStatus, GameResponse
+from app.models.game_and_roles import Game, GameStatus, GameResponse, PlayerInfo
 from app.core.security import hash_password
 from dotenv import load_dotenv
 
@@ -25,7 +28,8 @@ load_dotenv(env_path)
 DB_DIR = os.path.join(os.path.dirname(__file__), 'db_sqlite')
 os.makedirs(DB_DIR, exist_ok=True)
 
-DATABASE_URL = f"sqlite:///{os.path.join(DB_DIR, 'hombres_lobo.db')}"
+# Se puede sustituir (p. ej. el simulador usa una base de datos temporal propia)
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(DB_DIR, 'hombres_lobo.db')}")
 
 # Configuración SQLAlchemy
 engine = create_engine(DATABASE_URL, echo=False)
@@ -101,7 +105,7 @@ class GameDB(Base):
             name=getattr(self, 'name'),
             creator_id=getattr(self, 'creator_id'),
             players=getattr(self, 'players'),
-            roles=getattr(self, 'roles'),
+            roles={player_id: PlayerInfo.model_validate(info) for player_id, info in (getattr(self, 'roles') or {}).items()},
             status=GameStatus(getattr(self, 'status')),
             created_at=getattr(self, 'created_at').replace(tzinfo=UTC),
             current_round=getattr(self, 'current_round'),
@@ -119,7 +123,8 @@ class GameDB(Base):
             name=game.name,
             creator_id=game.creator_id,
             players=game.players,
-            roles=game.roles,
+            # Columna JSON: los PlayerInfo se guardan serializados
+            roles={player_id: info.model_dump(mode="json") for player_id, info in game.roles.items()},
             status=game.status.value,
             created_at=game.created_at,
             current_round=game.current_round,
@@ -129,9 +134,42 @@ class GameDB(Base):
             max_players=game.max_players
         )
 
+class VotingSessionDB(Base):
+    __tablename__ = "voting_sessions"
+    
+    id = Column(String, primary_key=True, index=True)  # "{game_id}:{vote_type}"
+    game_id = Column(String, nullable=False, index=True)
+    vote_type = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    data = Column(SQLiteJSON, nullable=False, default=dict)  # Sesión serializada (votantes, votos...)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class GameEventDB(Base):
+    __tablename__ = "game_events"
+    __table_args__ = (UniqueConstraint("game_id", "seq", name="uq_game_events_game_seq"),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_id = Column(String, nullable=False, index=True)
+    seq = Column(Integer, nullable=False)  # Secuencia del evento dentro de la partida
+    type = Column(String, nullable=False)
+    round = Column(Integer, nullable=True)
+    data = Column(SQLiteJSON, nullable=False, default=dict)  # Argumentos y cambios de estado del evento
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class GameSnapshotDB(Base):
+    __tablename__ = "game_snapshots"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_id = Column(String, nullable=False, index=True)
+    seq = Column(Integer, nullable=False)  # Último evento incluido en el snapshot
+    state = Column(SQLiteJSON, nullable=False)  # Partida completa serializada
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
 # Crear todas las tablas
 Base.metadata.create_all(bind=engine)
 
+logger = logging.getLogger(__name__)
+
 # Dependency para obtener la sesión de base de datos
 @contextmanager
 def get_db_session() -> Generator[Session, None, None]:
@@ -263,6 +301,20 @@ if admin_username and admin_email and admin_password:
 
 # --- Funciones específicas para usuarios optimizadas ---
 
+# Listeners de cambios de usuario (p. ej. para invalidar cachés de autenticación)
+_user_change_listeners: List[Callable[[str], None]] = []
+
+def add_user_change_listener(listener: Callable[[str], None]) -> None:
+    """Registra una función a la que se notifica el id de cada usuario guardado o eliminado."""
+    _user_change_listeners.append(listener)
+
+def _notify_user_changed(user_id: str) -> None:
+    for listener in _user_change_listeners:
+        try:
+            listener(user_id)
+        except Exception as e:
+            logger.error(f"Error notificando el cambio del usuario {user_id}: {e}")
+
 def save_user(user: User) -> None:
     """Guarda un usuario en la base de datos."""
     with get_db_session() as db:
@@ -279,6 +331,8 @@ def save_user(user: User) -> None:
             db.add(db_user)
         
         db.commit()
+    
+    _notify_user_changed(user.id)
 
 def load_user(user_id: str) -> Optional[User]:
     """Carga un usuario por id."""
@@ -286,11 +340,25 @@ def load_user(user_id: str) -> Optional[User]:
         db_user = db.query(UserDB).filter(UserDB.id == user_id).first()
         return db_user.to_pydantic() if db_user else None
 
+def load_usernames(user_ids: Iterable[str]) -> Dict[str, str]:
+    """Carga los nombres de usuario de varios ids en una sola consulta."""
+    ids = list(set(user_ids))
+    if not ids:
+        return {}
+    with get_db_session() as db:
+        rows = db.query(UserDB.id, UserDB.username).filter(UserDB.id.in_(ids)).all()
+        return {user_id: username for user_id, username in rows}
+
 def load_all_users() -> List[User]:
     """Carga todos los usuarios."""
     with get_db_session() as db:
         return [db_user.to_pydantic() for db_user in db.query(UserDB).all()]
 
+def count_users() -> int:
+    """Número de usuarios registrados (sin cargarlos)."""
+    with get_db_session() as db:
+        return db.query(func.count(UserDB.id)).scalar() or 0
+
 def delete_user(user_id: str) -> bool:
     """Elimina un usuario de la base de datos."""
     with get_db_session() as db:
@@ -298,6 +366,7 @@ def delete_user(user_id: str) -> bool:
         if db_user:
             db.delete(db_user)
             db.commit()
+            _notify_user_changed(user_id)
             return True
         return False
 
@@ -313,10 +382,167 @@ def find_user_by_email(email: str) -> Optional[User]:
         db_user = db.query(UserDB).filter(UserDB.email == email).first()
         return db_user.to_pydantic() if db_user else None
 
+# --- Funciones de estado de usuarios (escritura por lotes) ---
+
+# Máximo de ids por cláusula IN (SQLite limita el número de parámetros por sentencia)
+_STATUS_IN_CHUNK = 500
+
+def load_user_statuses(user_ids: Iterable[str]) -> Dict[str, str]:
+    """Carga solo la columna status de varios usuarios en una sola consulta."""
+    ids = list(set(user_ids))
+    if not ids:
+        return {}
+    with get_db_session() as db:
+        rows = db.query(UserDB.id, UserDB.status).filter(UserDB.id.in_(ids)).all()
+        return {user_id: status for user_id, status in rows}
+
+def update_user_statuses(statuses: Dict[str, str]) -> int:
+    """Actualiza el estado de varios usuarios con un UPDATE ... WHERE id IN (...) por estado distinto,
+    en una única transacción. Los usuarios baneados no se modifican. Devuelve las filas actualizadas."""
+    if not statuses:
+        return 0
+    by_status: Dict[str, List[str]] = {}
+    for user_id, status in statuses.items():
+        by_status.setdefault(status, []).append(user_id)
+
+    now = datetime.now(UTC)
+    updated = 0
+    with get_db_session() as db:
+        for status, ids in by_status.items():
+            for start in range(0, len(ids), _STATUS_IN_CHUNK):
+                updated += db.query(UserDB).filter(
+                    UserDB.id.in_(ids[start:start + _STATUS_IN_CHUNK]),
+                    UserDB.status != UserStatus.BANNED.value
+                ).update({UserDB.status: status, UserDB.updated_at: now}, synchronize_session=False)
+        db.commit()
+
+    for user_id in statuses:
+        _notify_user_changed(user_id)
+    return updated
+
+def reset_user_statuses(status: str = UserStatus.DISCONNECTED.value) -> int:
+    """Pone a todos los usuarios no baneados en el estado indicado con una sola sentencia UPDATE.
+    Devuelve las filas actualizadas."""
+    with get_db_session() as db:
+        query = db.query(UserDB).filter(UserDB.status.notin_([status, UserStatus.BANNED.value]))
+        ids = [user_id for (user_id,) in query.with_entities(UserDB.id).all()]
+        if not ids:
+            return 0
+        updated = query.update({UserDB.status: status, UserDB.updated_at: datetime.now(UTC)}, synchronize_session=False)
+        db.commit()
+
+    for user_id in ids:
+        _notify_user_changed(user_id)
+    return updated
+
 # --- Funciones específicas para partidas optimizadas ---
 
+# Versión en memoria de cada partida: se incrementa en cada escritura de este proceso
+# y permite a índices y cachés en memoria detectar que la partida ha cambiado.
+_game_versions: dict[str, int] = {}
+_game_versions_lock = threading.Lock()
+_game_save_listeners: List[Callable[[Game], None]] = []
+
+def add_game_save_listener(listener: Callable[[Game], None]) -> None:
+    """Registra una función a la que se notifica cada partida guardada (tras el commit)."""
+    _game_save_listeners.append(listener)
+
+def get_game_version(game_id: str) -> int:
+    """Obtiene la versión en memoria de una partida (0 si no se ha escrito en este proceso)."""
+    return _game_versions.get(game_id, 0)
+
+class GameTransaction:
+    """
+    Unidad de trabajo sobre una partida (ver game_transaction): todas las lecturas devuelven
+    la misma copia en memoria y los guardados se acumulan hasta el commit.
+    """
+
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+        self.game: Optional[Game] = None
+        self.loaded = False
+        self.dirty = False
+        self.rolled_back = False
+        self.after_commit: List[Callable[[], None]] = []
+
+    def rollback(self) -> None:
+        """Descartar los cambios acumulados al salir de la transacción."""
+        self.rolled_back = True
+
+_game_transaction: ContextVar[Optional[GameTransaction]] = ContextVar("game_transaction", default=None)
+
+def _get_game_transaction(game_id: str) -> Optional[GameTransaction]:
+    transaction = _game_transaction.get()
+    return transaction if transaction is not None and transaction.game_id == game_id else None
+
+def _bump_game_version(game_id: str) -> None:
+    with _game_versions_lock:
+        _game_versions[game_id] = _game_versions.get(game_id, 0) + 1
+
+def in_game_transaction(game_id: str) -> bool:
+    """Indica si hay una transacción abierta sobre la partida en el contexto actual.
+
+    Las cachés por versión no guardan nada mientras tanto: la copia en memoria aún no está
+    confirmada y la versión global solo cambia en el commit."""
+    return _get_game_transaction(game_id) is not None
+
+def run_after_commit(game_id: str, callback: Callable[[], None]) -> None:
+    """Ejecuta un efecto secundario (notificaciones) cuando se confirme la partida.
+
+    Sin transacción abierta sobre la partida se ejecuta al momento; dentro de una, al salir
+    tras el commit, y se descarta si la transacción se revierte."""
+    transaction = _get_game_transaction(game_id)
+    if transaction is None:
+        callback()
+    else:
+        transaction.after_commit.append(callback)
+
+@contextmanager
+def game_transaction(game_id: str) -> Generator[GameTransaction, None, None]:
+    """
+    Aplicar varias operaciones sobre una partida con una sola carga y una sola escritura.
+
+    Dentro del bloque, load_game devuelve siempre la misma copia en memoria y save_game solo
+    la marca como modificada. La versión global no cambia hasta el commit, de modo que el
+    resto de lectores sigue viendo (y cacheando) el estado confirmado; las cachés por versión
+    no guardan nada dentro de la transacción (ver in_game_transaction). Al salir se escribe
+    una vez, se notifica a los listeners y se ejecutan los efectos diferidos con
+    run_after_commit; si hay una excepción o se llama a rollback() no se escribe nada y los
+    efectos diferidos se descartan.
+    """
+    outer = _game_transaction.get()
+    if outer is not None and outer.game_id == game_id:
+        # Transacción anidada sobre la misma partida: se une a la exterior
+        yield outer
+        return
+
+    transaction = GameTransaction(game_id)
+    token = _game_transaction.set(transaction)
+    try:
+        yield transaction
+    except BaseException:
+        transaction.rolled_back = True
+        raise
+    finally:
+        _game_transaction.reset(token)
+        if not transaction.rolled_back:
+            if transaction.dirty and transaction.game is not None:
+                save_game(transaction.game)
+            for callback in transaction.after_commit:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error ejecutando un efecto diferido de la partida {game_id}: {e}")
+
 def save_game(game: Game) -> None:
     """Guarda una partida en la base de datos."""
+    transaction = _get_game_transaction(game.id)
+    if transaction is not None:
+        transaction.game = game
+        transaction.loaded = True
+        transaction.dirty = True
+        return
+    
     with get_db_session() as db:
         db_game = db.query(GameDB).filter(GameDB.id == game.id).first()
         if db_game:
@@ -331,9 +557,26 @@ def save_game(game: Game) -> None:
             db.add(db_game)
         
         db.commit()
+    
+    _bump_game_version(game.id)
+    
+    for listener in _game_save_listeners:
+        try:
+            listener(game)
+        except Exception as e:
+            logger.error(f"Error notificando el guardado de la partida {game.id}: {e}")
 
 def load_game(game_id: str) -> Optional[Game]:
-    """Carga una partida por id."""
+    """Carga una partida por id (la copia en memoria si hay una transacción abierta sobre ella)."""
+    transaction = _get_game_transaction(game_id)
+    if transaction is not None:
+        if not transaction.loaded:
+            transaction.game = _load_game_from_db(game_id)
+            transaction.loaded = True
+        return transaction.game
+    return _load_game_from_db(game_id)
+
+def _load_game_from_db(game_id: str) -> Optional[Game]:
     with get_db_session() as db:
         db_game = db.query(GameDB).filter(GameDB.id == game_id).first()
         return db_game.to_pydantic() if db_game else None
@@ -349,10 +592,92 @@ def delete_game(game_id: str) -> bool:
         db_game = db.query(GameDB).filter(GameDB.id == game_id).first()
         if db_game:
             db.delete(db_game)
+            db.query(GameEventDB).filter(GameEventDB.game_id == game_id).delete(synchronize_session=False)
+            db.query(GameSnapshotDB).filter(GameSnapshotDB.game_id == game_id).delete(synchronize_session=False)
             db.commit()
+            with _game_versions_lock:
+                _game_versions.pop(game_id, None)
             return True
         return False
 
+# --- Funciones de sesiones de votación (escritura por lotes) ---
+
+def save_voting_sessions(sessions: List[dict]) -> None:
+    """Guarda (upsert) varias sesiones de votación serializadas en una única transacción."""
+    if not sessions:
+        return
+    with get_db_session() as db:
+        for data in sessions:
+            db.merge(VotingSessionDB(
+                id=f"{data['game_id']}:{data['vote_type']}",
+                game_id=data["game_id"],
+                vote_type=data["vote_type"],
+                status=data["status"],
+                data=data,
+                updated_at=datetime.utcnow()
+            ))
+        db.commit()
+
+def load_voting_sessions() -> List[dict]:
+    """Carga todas las sesiones de votación persistidas."""
+    with get_db_session() as db:
+        return [db_session.data for db_session in db.query(VotingSessionDB).all()]
+
+def delete_voting_sessions(session_ids: Iterable[str]) -> None:
+    """Elimina varias sesiones de votación ("{game_id}:{vote_type}") en una única transacción."""
+    session_ids = list(session_ids)
+    if not session_ids:
+        return
+    with get_db_session() as db:
+        db.query(VotingSessionDB).filter(VotingSessionDB.id.in_(session_ids)).delete(synchronize_session=False)
+        db.commit()
+
+# --- Funciones del historial de eventos (append-only, escritura por lotes) ---
+
+def append_game_events(events: List[Dict[str, Any]], snapshots: List[Dict[str, Any]]) -> None:
+    """Añade un lote de eventos y snapshots de partidas en una única transacción."""
+    if not events and not snapshots:
+        return
+    with get_db_session() as db:
+        db.bulk_insert_mappings(GameEventDB, [
+            {**event, "created_at": datetime.fromtimestamp(event["created_at"], UTC)} for event in events
+        ])
+        db.bulk_insert_mappings(GameSnapshotDB, [
+            {**snapshot, "created_at": datetime.fromtimestamp(snapshot["created_at"], UTC)} for snapshot in snapshots
+        ])
+        db.commit()
+
+def load_game_events(game_id: str, after_seq: int = 0, until_seq: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Carga eventos de una partida con seq > after_seq (y <= until_seq), en orden."""
+    with get_db_session() as db:
+        query = db.query(GameEventDB).filter(GameEventDB.game_id == game_id, GameEventDB.seq > after_seq)
+        if until_seq is not None:
+            query = query.filter(GameEventDB.seq <= until_seq)
+        query = query.order_by(GameEventDB.seq)
+        if limit is not None:
+            query = query.limit(limit)
+        return [
+            {
+                "game_id": e.game_id, "seq": e.seq, "type": e.type, "round": e.round,
+                "data": e.data, "created_at": e.created_at.replace(tzinfo=UTC).timestamp()
+            }
+            for e in query.all()
+        ]
+
+def get_last_game_event_seq(game_id: str) -> int:
+    """Última secuencia de evento persistida de una partida (0 si no hay)."""
+    with get_db_session() as db:
+        return db.query(func.max(GameEventDB.seq)).filter(GameEventDB.game_id == game_id).scalar() or 0
+
+def load_latest_game_snapshot(game_id: str, max_seq: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Carga el snapshot más reciente de una partida con seq <= max_seq."""
+    with get_db_session() as db:
+        query = db.query(GameSnapshotDB).filter(GameSnapshotDB.game_id == game_id)
+        if max_seq is not None:
+            query = query.filter(GameSnapshotDB.seq <= max_seq)
+        snapshot = query.order_by(GameSnapshotDB.seq.desc()).first()
+        return {"game_id": snapshot.game_id, "seq": snapshot.seq, "state": snapshot.state} if snapshot else None
+
 def find_games_by_creator(creator_id: str) -> List[Game]:
     """Encuentra todas las partidas creadas por un usuario."""
     with get_db_session() as db:
@@ -2,6 +2,15 @@ from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import routes_games, routes_admin, routes_users, routes_auth, routes_players_voting, routes_warewolfs, routes_special_roles, routes_sheriff, routes_hunter, routes_witch, routes_wild_child, routes_cupid, routes_game_flow
 from app.websocket.message_handlers import websocket_endpoint
+from app.websocket.game_handlers import game_handler
+from app.services.game_state_service import game_state_manager
+from app.services.phase_scheduler_service import phase_scheduler
+from app.services.state_snapshot_service import state_snapshot_service
+from app.services.voting_service import voting_service
+from app.services.game_actor_service import game_actor_service
+from app.services.game_event_service import game_event_service
+from app.services.password_hashing_service import password_hashing_service
+from app.services.user_status_buffer_service import user_status_buffer
 
 app = FastAPI(
     title="Hombres Lobo API",
@@ -25,6 +34,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Ciclo de vida de los servicios en memoria
+@app.on_event("startup")
+async def start_in_memory_services():
+    """Restablecer los estados de usuario, rehidratar el estado vivo del último snapshot y las votaciones persistidas, y arrancar actores, limpieza y snapshots periódicos"""
+    # Capturar el loop: los hilos del threadpool programan flushes y notificaciones a través de él
+    phase_scheduler.start()
+    # Ninguna conexión WebSocket sobrevive al reinicio: un único UPDATE en lugar de un guardado por usuario
+    await user_status_buffer.reset_all()
+    game_actor_service.start()
+    await voting_service.restore()
+    for game_state in await state_snapshot_service.restore():
+        game_handler.attach_phase_callbacks(game_state.game_id, game_state)
+    await game_state_manager.start_manager()
+    await state_snapshot_service.start()
+
+@app.on_event("shutdown")
+async def stop_in_memory_services():
+    """Vaciar los buzones de las partidas, guardar un último snapshot, persistir votos, eventos y estados de usuario pendientes y detener limpieza, planificador de fases y pool de contraseñas"""
+    await game_actor_service.stop()
+    await state_snapshot_service.stop()
+    await voting_service.flush()
+    await game_event_service.flush()
+    await user_status_buffer.flush()
+    await game_state_manager.stop_manager()
+    await phase_scheduler.stop()
+    password_hashing_service.shutdown()
+
 # WebSocket endpoint para tiempo real
 @app.websocket("/ws/{game_id}")
 async def websocket_game_endpoint(websocket: WebSocket, game_id: str, token: str):
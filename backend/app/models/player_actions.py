@@ -4,7 +4,7 @@ Define las estructuras de datos para requests y responses de las acciones espec
 """
 
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 
 
 class WarewolfAttackRequest(BaseModel):
@@ -219,3 +219,32 @@ class LoversStatusResponse(BaseModel):
     partner_id: Optional[str] = None
     partner_username: Optional[str] = None
     both_alive: bool = False
+
+
+class RoleActionItem(BaseModel):
+    """Una acción dentro de un lote (ver role_action_service.ROLE_ACTIONS)."""
+    action: str  # warewolf_attack, seer_vision, witch_heal, witch_poison, cupid_choose_lovers, ...
+    target_id: Optional[str] = None
+    lover1_id: Optional[str] = None
+    lover2_id: Optional[str] = None
+    model_player_id: Optional[str] = None
+
+
+class RoleActionBatchRequest(BaseModel):
+    """Lote ordenado de acciones de un jugador, aplicado atómicamente."""
+    actions: List[RoleActionItem]
+
+
+class RoleActionResultItem(BaseModel):
+    """Resultado de una acción del lote."""
+    action: Optional[str] = None
+    success: bool
+    message: str
+    data: Dict[str, Any] = {}
+
+
+class RoleActionBatchResponse(BaseModel):
+    """Respuesta de un lote de acciones: se aplican todas o ninguna."""
+    success: bool
+    message: str
+    results: List[RoleActionResultItem]
@@ -4,7 +4,7 @@ Define las estructuras de datos para las respuestas de la API de usuarios.
 """
 
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from app.models.user import User
 
 
@@ -50,3 +50,20 @@ class UserStatusUpdateResponse(BaseModel):
     old_status: str
     new_status: str
     updated_at: str
+
+
+class UserPresence(BaseModel):
+    """Presencia en vivo de un usuario conectado."""
+    user_id: str
+    status: str
+    game_ids: List[str]
+    connections: int
+
+
+class PresenceListResponse(BaseModel):
+    """Respuesta para consultar los usuarios conectados."""
+    success: bool = True
+    message: str
+    game_id: Optional[str] = None
+    users: List[UserPresence]
+    total_online: int
@@ -0,0 +1,115 @@
+"""
+Auth Cache Service
+Cachés de la autenticación de peticiones: claims de tokens JWT ya verificados y usuarios
+cargados para get_current_user.
+
+- Tokens: LRU indexada por el hash SHA-256 del token (nunca se guarda el token en claro),
+  válida como mucho hasta el `exp` del propio token. Los tokens inválidos no se cachean.
+- Usuarios: caché de vida corta por id, invalidada en cuanto el usuario se guarda o se
+  elimina (actualización de perfil, cambio de rol o de estado, baneo o borrado).
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import os
+import threading
+import time
+
+from app.core.security import verify_access_token
+from app.database import add_user_change_listener, load_user
+from app.models.user import User
+
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "30"))
+
+
+class AuthCacheService:
+    """Claims de tokens verificados y usuarios autenticados recientes"""
+
+    def __init__(self, token_cache_size: int = TOKEN_CACHE_SIZE, user_cache_seconds: float = USER_CACHE_SECONDS):
+        self.token_cache_size = token_cache_size
+        self.user_cache_seconds = user_cache_seconds
+        self._tokens: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._users: Dict[str, Tuple[float, User]] = {}
+        self._invalidations = 0  # Detecta cambios de usuario mientras se cargaba uno
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims de un token válido (verificándolo solo la primera vez), o None si no es válido"""
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None:
+                expires_at, claims = cached
+                if now < expires_at:
+                    self._tokens.move_to_end(key)
+                    self.token_hits += 1
+                    return claims
+                del self._tokens[key]
+            self.token_misses += 1
+
+        claims = verify_access_token(token)
+        if not claims or "exp" not in claims:
+            return claims
+
+        with self._lock:
+            self._tokens[key] = (float(claims["exp"]), claims)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.token_cache_size:
+                self._tokens.popitem(last=False)
+        return claims
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        """Usuario por id; devuelve una copia para que las rutas no modifiquen la cacheada"""
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and now < cached[0]:
+                self.user_hits += 1
+                return cached[1].model_copy()
+            self.user_misses += 1
+            invalidations = self._invalidations
+
+        user = load_user(user_id)
+        if user is not None:
+            with self._lock:
+                # Si algún usuario cambió durante la carga, no cachear un posible valor antiguo
+                if invalidations == self._invalidations:
+                    self._users[user_id] = (now + self.user_cache_seconds, user)
+                if len(self._users) > self.token_cache_size:
+                    # Purgar los caducados solo cuando la caché crece
+                    for expired in [u for u, (expires_at, _) in self._users.items() if expires_at <= now]:
+                        del self._users[expired]
+            return user.model_copy()
+        return None
+
+    def invalidate_user(self, user_id: str):
+        """Descartar el usuario cacheado (listener de cambios de usuario en la base de datos)"""
+        with self._lock:
+            self._users.pop(user_id, None)
+            self._invalidations += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cached_tokens": len(self._tokens),
+                "cached_users": len(self._users),
+                "token_hits": self.token_hits,
+                "token_misses": self.token_misses,
+                "user_hits": self.user_hits,
+                "user_misses": self.user_misses
+            }
+
+
+# Instancia global de las cachés de autenticación
+auth_cache_service = AuthCacheService()
+add_user_change_listener(auth_cache_service.invalidate_user)
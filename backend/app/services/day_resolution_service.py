@@ -0,0 +1,127 @@
+"""
+Day Resolution Service
+Resolución pura de la fase diurna en una sola pasada sobre una instancia de Game:
+recuento ponderado (voto doble del alguacil), desempate del alguacil, linchamiento,
+consecuencias de la muerte, victoria y preparación de la siguiente noche.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.models.game_and_roles import Game, GameStatus, GameRole
+from app.services.death_cascade_service import resolve_death_cascade
+from app.services.game_index_service import GameIndex
+from app.services.night_resolution_service import check_victory, start_night
+
+
+@dataclass
+class DayResolution:
+    """Resultado de resolver un día"""
+    game: Game
+    lynched_player: Optional[str] = None
+    reason: str = ""
+    vote_counts: List[Dict[str, Any]] = field(default_factory=list)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    deaths: List[str] = field(default_factory=list)
+    transformations: List[Dict[str, Any]] = field(default_factory=list)
+    notifications: List[Dict[str, Any]] = field(default_factory=list)
+    victory: Optional[Dict[str, Any]] = None
+
+
+def get_vote_weight(game: Game, voter_id: str) -> int:
+    """Peso del voto de un jugador: doble para el alguacil con voto doble"""
+    role_info = game.roles.get(voter_id)
+    if role_info and role_info.role == GameRole.SHERIFF and role_info.has_double_vote:
+        return 2
+    return 1
+
+
+def tally_day_votes(game: Game) -> Dict[str, int]:
+    """Recuento ponderado de los votos de jugadores vivos sobre objetivos vivos"""
+    counts: Dict[str, int] = {}
+    for voter_id, target_id in game.day_votes.items():
+        voter = game.roles.get(voter_id)
+        target = game.roles.get(target_id)
+        if not voter or not voter.is_alive or not target or not target.is_alive:
+            continue
+        counts[target_id] = counts.get(target_id, 0) + get_vote_weight(game, voter_id)
+    return counts
+
+
+def get_sheriff_tiebreak(game: Game, tied_players: List[str]) -> Optional[str]:
+    """El alguacil vivo desempata a favor del empatado al que votó"""
+    for player_id, role_info in game.roles.items():
+        if role_info.role == GameRole.SHERIFF and role_info.is_alive and role_info.can_break_ties is not False:
+            choice = game.day_votes.get(player_id)
+            return choice if choice in tied_players else None
+    return None
+
+
+def resolve_day(game: Game, index: Optional[GameIndex] = None) -> DayResolution:
+    """
+    Resolver un día completo en una sola pasada y sin I/O.
+    El índice de la partida, si se pasa, se mantiene en sitio con las muertes.
+
+    Returns:
+        DayResolution con la nueva partida (ya preparada para la siguiente noche, o FINISHED)
+    """
+    new_game = game.model_copy(deep=True)
+    resolution = DayResolution(game=new_game)
+    index = index or GameIndex.from_game(new_game)
+
+    # 1. Recuento ponderado, expuesto para todos los jugadores vivos
+    counts = tally_day_votes(new_game)
+    resolution.vote_counts = sorted(
+        (
+            {"player_id": player_id, "vote_count": counts.get(player_id, 0)}
+            for player_id in new_game.players
+            if player_id in new_game.roles and new_game.roles[player_id].is_alive
+        ),
+        key=lambda count: count["vote_count"],
+        reverse=True
+    )
+
+    # 2. Líder o desempate del alguacil
+    if not counts:
+        resolution.reason = "No votes cast"
+    else:
+        max_votes = max(counts.values())
+        tied_players = [player_id for player_id, votes in counts.items() if votes == max_votes]
+
+        if len(tied_players) == 1:
+            resolution.lynched_player = tied_players[0]
+        else:
+            resolution.lynched_player = get_sheriff_tiebreak(new_game, tied_players)
+            if resolution.lynched_player:
+                resolution.events.append({
+                    "type": "sheriff_tiebreak",
+                    "tied_players": tied_players,
+                    "chosen_player": resolution.lynched_player
+                })
+            else:
+                resolution.reason = "Tie vote with no sheriff tiebreak"
+
+    # 3. Linchamiento y consecuencias encadenadas
+    if resolution.lynched_player:
+        resolution.reason = "Lynching successful"
+        resolution.events.append({
+            "type": "lynching",
+            "victim": resolution.lynched_player,
+            "vote_counts": resolution.vote_counts
+        })
+
+        cascade = resolve_death_cascade(new_game, [(resolution.lynched_player, "lynching")], index=index)
+        resolution.events.extend(cascade.events)
+        resolution.deaths.extend(cascade.deaths)
+        resolution.transformations.extend(cascade.transformations)
+        resolution.notifications.extend(cascade.notifications)
+    else:
+        resolution.events.append({"type": "no_lynching", "reason": resolution.reason})
+
+    # 4. Victoria o preparación de la siguiente noche
+    resolution.victory = check_victory(new_game, index)
+    if resolution.victory:
+        new_game.status = GameStatus.FINISHED
+    else:
+        resolution.game = start_night(new_game)
+
+    return resolution
@@ -0,0 +1,147 @@
+"""
+Death Cascade Service
+Resolución en memoria de todas las consecuencias encadenadas de una o varias muertes
+(enamorados, venganza del cazador, Niño Salvaje y sucesión del alguacil) hasta alcanzar
+un punto fijo, mediante una lista de trabajo sobre un grafo de jugadores.
+
+No realiza I/O: modifica la partida recibida y devuelve los eventos en orden, de modo
+que el llamador persiste una única vez.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.models.game_and_roles import Game, GameRole
+from app.services.game_index_service import GameIndex
+
+
+@dataclass
+class DeathCascade:
+    """Resultado de resolver una cascada de muertes"""
+    deaths: List[str] = field(default_factory=list)  # Todas las muertes, en orden
+    events: List[Dict[str, Any]] = field(default_factory=list)  # Eventos ordenados
+    transformations: List[Dict[str, Any]] = field(default_factory=list)
+    notifications: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class PlayerGraph:
+    """Relaciones entre jugadores que propagan una muerte, construidas una sola vez"""
+
+    def __init__(self, game: Game):
+        self.lovers: Dict[str, str] = {}
+        self.wild_children_by_model: Dict[str, List[str]] = {}
+
+        for player_id, role_info in game.roles.items():
+            if role_info.is_lover and role_info.lover_partner_id:
+                self.lovers[player_id] = role_info.lover_partner_id
+            if role_info.role == GameRole.WILD_CHILD and role_info.model_player_id:
+                self.wild_children_by_model.setdefault(role_info.model_player_id, []).append(player_id)
+
+
+def resolve_death_cascade(
+    game: Game,
+    initial_deaths: List[Tuple[str, str]],
+    index: Optional[GameIndex] = None
+) -> DeathCascade:
+    """
+    Matar a los jugadores iniciales y propagar sus consecuencias hasta el punto fijo.
+
+    Args:
+        game: Partida a modificar en memoria
+        initial_deaths: Lista de (player_id, causa) en el orden en que ocurren
+        index: Índice de la partida a mantener con cada muerte y transformación (opcional)
+
+    Returns:
+        DeathCascade con muertes, eventos, transformaciones y notificaciones ordenadas
+    """
+    graph = PlayerGraph(game)
+    cascade = DeathCascade()
+    worklist: Deque[str] = deque()
+    processed: Set[str] = set()
+
+    def kill(player_id: str, cause: str, source: Optional[str] = None, force: bool = False):
+        role_info = game.roles.get(player_id)
+        if role_info is None:
+            return
+        if not role_info.is_alive and not force:
+            return
+        if role_info.is_alive and index:
+            index.on_death(player_id, role_info.role)
+        role_info.is_alive = False
+        if player_id in cascade.deaths:
+            return
+        cascade.deaths.append(player_id)
+        event = {"type": "death", "player_id": player_id, "cause": cause}
+        if source:
+            event["source"] = source
+        cascade.events.append(event)
+        worklist.append(player_id)
+
+    # Las muertes iniciales cuentan aunque el jugador ya estuviera marcado como muerto
+    for player_id, cause in initial_deaths:
+        kill(player_id, cause, force=True)
+
+    while worklist:
+        dead_id = worklist.popleft()
+        if dead_id in processed:
+            continue
+        processed.add(dead_id)
+        dead_role = game.roles[dead_id]
+
+        # 1. Niños Salvajes cuyo modelo ha muerto se convierten en hombres lobo
+        for wild_child_id in graph.wild_children_by_model.get(dead_id, []):
+            wild_child = game.roles[wild_child_id]
+            if wild_child.is_alive and not wild_child.has_transformed and wild_child.role == GameRole.WILD_CHILD:
+                wild_child.has_transformed = True
+                wild_child.role = GameRole.WAREWOLF
+                if index:
+                    index.on_transformation(wild_child_id, GameRole.WILD_CHILD, GameRole.WAREWOLF)
+                cascade.transformations.append({
+                    "wild_child_id": wild_child_id,
+                    "model_id": dead_id,
+                    "reason": f"Su modelo {dead_id} ha muerto"
+                })
+                notification = {
+                    "type": "new_werewolf",
+                    "new_werewolf": wild_child_id,
+                    "existing_werewolves": [
+                        ww_id for ww_id, ww_info in game.roles.items()
+                        if ww_info.role == GameRole.WAREWOLF and ww_info.is_alive and ww_id != wild_child_id
+                    ]
+                }
+                cascade.notifications.append(notification)
+                cascade.events.append(notification)
+
+        # 2. El enamorado superviviente muere de pena
+        partner_id = graph.lovers.get(dead_id)
+        if partner_id and partner_id in game.roles and game.roles[partner_id].is_alive:
+            kill(partner_id, "love", source=dead_id)
+            notification = {"type": "lover_death", "original_death": dead_id, "lover_deaths": [partner_id]}
+            cascade.notifications.append(notification)
+
+        # 3. Venganza del cazador: queda pendiente (el objetivo se elige tras morir, con hunter_revenge_kill,
+        #    que resuelve la muerte del objetivo como una cascada nueva)
+        if dead_role.role == GameRole.HUNTER and not dead_role.has_used_revenge:
+            dead_role.can_revenge_kill = True
+            notification = {"type": "hunter_revenge_available", "hunter_id": dead_id}
+            cascade.notifications.append(notification)
+            cascade.events.append(notification)
+
+        # 4. Sucesión del alguacil
+        if dead_role.role == GameRole.SHERIFF and dead_role.successor_id:
+            successor = game.roles.get(dead_role.successor_id)
+            if successor and successor.is_alive:
+                if index:
+                    index.on_transformation(dead_role.successor_id, successor.role, GameRole.SHERIFF)
+                successor.role = GameRole.SHERIFF
+                successor.has_double_vote = True
+                successor.can_break_ties = True
+                notification = {
+                    "type": "sheriff_succession",
+                    "old_sheriff": dead_id,
+                    "new_sheriff": dead_role.successor_id
+                }
+                cascade.notifications.append(notification)
+                cascade.events.append(notification)
+
+    return cascade
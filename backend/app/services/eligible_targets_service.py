@@ -0,0 +1,84 @@
+"""
+Eligible Targets Service
+Caché de las listas de objetivos elegibles ({id, username}) que consultan por polling
+todos los jugadores: vidente, veneno de la bruja, Cupido, modelos del Niño Salvaje,
+votación diurna y venganza del cazador.
+
+Todas estas listas son los jugadores vivos en el orden de la partida, menos como mucho
+el propio jugador. Se calcula una única lista base por partida y fase, con los nombres
+resueltos en una sola consulta, y se reutiliza mientras no cambie la fase ni el conjunto
+de vivos. La clave es el roster del índice de la partida y no su versión, de modo que
+los votos y acciones que no matan a nadie no invalidan la caché.
+"""
+from typing import Dict, List, Optional, Tuple
+import threading
+
+from app.models.game_and_roles import GameStatus
+from app.services.game_index_service import GameIndex, game_index_service
+from app.services.user_service import UserService
+
+RosterKey = Tuple[Optional[GameStatus], Tuple[str, ...]]
+
+
+class EligibleTargetsService:
+    """Listas de objetivos elegibles calculadas una vez por partida, fase y roster"""
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[RosterKey, List[Dict[str, str]]]] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+
+    def get_targets(self, game_id: str, exclude: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Jugadores vivos de la partida con su nombre, excluyendo opcionalmente a un jugador.
+
+        Args:
+            game_id: ID de la partida
+            exclude: Jugador a excluir (p. ej. la propia vidente o el cazador)
+
+        Returns:
+            Lista de diccionarios con id y username, en el orden de la partida
+        """
+        index = game_index_service.get_by_id(game_id)
+        if not index:
+            return []
+
+        base = self._get_base(index)
+        return [dict(target) for target in base if target["id"] != exclude]
+
+    def invalidate(self, game_id: str):
+        """Descartar la lista cacheada de una partida"""
+        with self._lock:
+            self._cache.pop(game_id, None)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"cached_games": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def _get_base(self, index: GameIndex) -> List[Dict[str, str]]:
+        alive_players = index.get_alive_players()
+        key: RosterKey = (index.status, tuple(alive_players))
+
+        with self._lock:
+            cached = self._cache.get(index.game_id)
+            if cached and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        # Un roster nuevo (muerte, cambio de rol o de fase): nombres en una sola consulta
+        usernames = UserService.get_usernames_by_ids(alive_players)
+        base = [
+            {"id": player_id, "username": usernames.get(player_id, "unknown name")}
+            for player_id in alive_players
+        ]
+
+        with self._lock:
+            self._cache[index.game_id] = (key, base)
+        return base
+
+
+# Instancia global de la caché de objetivos
+eligible_targets_service = EligibleTargetsService()
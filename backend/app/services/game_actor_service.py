@@ -0,0 +1,229 @@
+"""
+Game Actor Service
+Un actor asyncio por partida (buzón + un único consumidor) por el que pasan todas las
+mutaciones de esa partida, lleguen de rutas REST, de handlers WebSocket o de timers.
+Las mutaciones de una misma partida se ejecutan en orden y sin solaparse (sin
+actualizaciones perdidas en el ciclo cargar-modificar-guardar), mientras que partidas
+distintas se procesan en paralelo, sin locks globales.
+
+Las funciones de servicio que mutan una partida se marcan con @game_mutation: desde
+el threadpool (rutas síncronas) se encolan en el actor y esperan su resultado; dentro
+del propio actor (llamadas anidadas) se ejecutan directamente. Sin loop activo (scripts,
+simulador) se ejecutan en línea.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+ACTOR_IDLE_SECONDS = float(os.getenv("GAME_ACTOR_IDLE_SECONDS", "300"))
+# Hilos propios de los actores: no compiten con el threadpool de las rutas que esperan al actor
+ACTOR_WORKERS = int(os.getenv("GAME_ACTOR_WORKERS", "32"))
+
+# Partida cuyo actor está ejecutando la mutación en curso (se propaga al hilo del actor)
+_current_game: ContextVar[Optional[str]] = ContextVar("current_game_actor", default=None)
+
+
+@dataclass
+class MutationContext:
+    """Mutación en curso: nombre de la función y sus argumentos (sin game_id)"""
+    name: str
+    arguments: Dict[str, Any]
+
+
+_current_mutation: ContextVar[Optional[MutationContext]] = ContextVar("current_game_mutation", default=None)
+
+
+def get_current_mutation() -> Optional[MutationContext]:
+    """Mutación @game_mutation que se está ejecutando en este contexto, si hay alguna"""
+    return _current_mutation.get()
+
+
+@dataclass
+class ActorStats:
+    """Métricas de un actor"""
+    processed: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    max_depth: int = 0
+    last_processed_at: Optional[float] = None
+
+    def to_dict(self, depth: int) -> Dict[str, Any]:
+        return {
+            "mailbox_depth": depth,
+            "max_mailbox_depth": self.max_depth,
+            "processed": self.processed,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.processed, 3) if self.processed else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_processed_at": self.last_processed_at
+        }
+
+
+@dataclass
+class GameActor:
+    """Buzón y consumidor de una partida"""
+    game_id: str
+    mailbox: asyncio.Queue = field(default_factory=asyncio.Queue)
+    stats: ActorStats = field(default_factory=ActorStats)
+    task: Optional[asyncio.Task] = None
+
+
+class GameActorService:
+    """Registro de actores por partida"""
+
+    def __init__(self, idle_seconds: float = ACTOR_IDLE_SECONDS, workers: int = ACTOR_WORKERS):
+        self.idle_seconds = idle_seconds
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.actors: Dict[str, GameActor] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Asociar el servicio al loop en ejecución (llamar al arrancar la aplicación)"""
+        self._loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="game-actor")
+
+    async def stop(self):
+        """Detener todos los actores tras vaciar sus buzones"""
+        for game_id in list(self.actors):
+            await self.stop_actor(game_id)
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def call(self, game_id: str, fn: Callable, *args, **kwargs) -> Any:
+        """Ejecutar fn(*args, **kwargs) en el actor de la partida y devolver su resultado"""
+        if _current_game.get() == game_id:
+            return fn(*args, **kwargs)
+
+        actor = self._get_actor(game_id)
+        future = asyncio.get_running_loop().create_future()
+        actor.mailbox.put_nowait((fn, args, kwargs, future))
+        actor.stats.max_depth = max(actor.stats.max_depth, actor.mailbox.qsize())
+        return await future
+
+    def call_sync(self, game_id: str, fn: Callable, *args, **kwargs) -> Any:
+        """Ejecutar en el actor desde código síncrono, esperando el resultado"""
+        if _current_game.get() == game_id or not self._can_dispatch():
+            return fn(*args, **kwargs)
+        future = asyncio.run_coroutine_threadsafe(self.call(game_id, fn, *args, **kwargs), self._loop)
+        return future.result()
+
+    async def stop_actor(self, game_id: str):
+        """Detener el actor de una partida tras procesar lo ya encolado"""
+        actor = self.actors.pop(game_id, None)
+        if actor and actor.task:
+            actor.mailbox.put_nowait(None)
+            try:
+                await actor.task
+            except asyncio.CancelledError:
+                pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Profundidad del buzón y tiempos de proceso por partida"""
+        return {
+            "actors": len(self.actors),
+            "games": {
+                game_id: actor.stats.to_dict(actor.mailbox.qsize())
+                for game_id, actor in list(self.actors.items())
+            }
+        }
+
+    def _can_dispatch(self) -> bool:
+        """Hay un loop al que encolar y no estamos en su propio hilo (no se puede bloquear el loop)"""
+        if self._loop is None or self._loop.is_closed():
+            return False
+        try:
+            return asyncio.get_running_loop() is not self._loop
+        except RuntimeError:
+            return True
+
+    def _get_actor(self, game_id: str) -> GameActor:
+        actor = self.actors.get(game_id)
+        if actor is None or actor.task is None or actor.task.done():
+            actor = GameActor(game_id=game_id)
+            actor.task = asyncio.get_running_loop().create_task(self._consume(actor))
+            self.actors[game_id] = actor
+        return actor
+
+    async def _consume(self, actor: GameActor):
+        """Consumidor único: procesa el buzón en orden; termina tras un periodo inactivo"""
+        _current_game.set(actor.game_id)
+        while True:
+            try:
+                item = await asyncio.wait_for(actor.mailbox.get(), timeout=self.idle_seconds)
+            except asyncio.TimeoutError:
+                if actor.mailbox.empty():
+                    if self.actors.get(actor.game_id) is actor:
+                        del self.actors[actor.game_id]
+                    return
+                continue
+
+            if item is None:
+                return
+
+            fn, args, kwargs, future = item
+            started = time.perf_counter()
+            try:
+                # Las mutaciones hacen I/O síncrono: fuera del loop, pero de una en una
+                context = copy_context()
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, functools.partial(context.run, fn, *args, **kwargs)
+                )
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                actor.stats.errors += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                actor.stats.processed += 1
+                actor.stats.total_ms += elapsed_ms
+                actor.stats.max_ms = max(actor.stats.max_ms, elapsed_ms)
+                actor.stats.last_processed_at = time.time()
+
+
+# Instancia global de actores por partida
+game_actor_service = GameActorService()
+
+
+def game_mutation(fn: Callable) -> Callable:
+    """Decorador: ejecutar la función en el actor de su partida (argumento game_id)"""
+    signature = inspect.signature(fn)
+
+    def run(arguments: Dict[str, Any], args: tuple, kwargs: dict):
+        context = MutationContext(
+            name=fn.__name__,
+            arguments={
+                key: value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+                for key, value in arguments.items() if key not in ("self", "game_id")
+            }
+        )
+        token = _current_mutation.set(context)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_mutation.reset(token)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+        game_id = arguments.get("game_id")
+        if game_id is None:
+            return fn(*args, **kwargs)
+        return game_actor_service.call_sync(game_id, run, arguments, args, kwargs)
+
+    return wrapper
@@ -0,0 +1,308 @@
+"""
+Game Event Service
+Historial append-only de cada partida: cada guardado de una partida se registra como un
+evento pequeño (nombre de la mutación, sus argumentos y solo los campos que cambiaron),
+y cada cierto número de eventos se guarda un snapshot completo del estado.
+
+Los eventos se acumulan en memoria y se escriben por lotes en una única transacción.
+El historial se añade a la escritura de la fila de la partida, no la sustituye: la tabla
+games sigue siendo el estado vigente y se reescribe en cada guardado (load_game y las
+cachés por versión dependen de ella), así que el coste extra por acción se limita a
+serializar y comparar el estado fuera del lock y a un append en memoria.
+Las consultas de historial leen los eventos persistidos más los aún pendientes, y la
+reconstrucción del estado en cualquier punto parte del snapshot más cercano y reaplica
+los cambios posteriores.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.database import (
+    add_game_save_listener, append_game_events, get_last_game_event_seq,
+    load_game_events, load_latest_game_snapshot
+)
+from app.models.game_and_roles import Game
+from app.services.game_actor_service import get_current_mutation
+from app.services.phase_scheduler_service import phase_scheduler
+
+logger = logging.getLogger(__name__)
+
+EVENT_FLUSH_INTERVAL_SECONDS = float(os.getenv("GAME_EVENT_FLUSH_INTERVAL_SECONDS", "1"))
+SNAPSHOT_EVERY_EVENTS = int(os.getenv("GAME_EVENT_SNAPSHOT_EVERY", "50"))
+HISTORY_PAGE_SIZE = 100
+
+
+def diff_game_state(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cambios entre dos estados serializados de una partida.
+    Los roles se comparan por jugador para que un evento solo lleve los jugadores afectados.
+    """
+    if old is None:
+        return {"set": dict(new)}
+
+    patch: Dict[str, Any] = {}
+    changed = {key: value for key, value in new.items() if key != "roles" and old.get(key) != value}
+    if changed:
+        patch["set"] = changed
+
+    old_roles, new_roles = old.get("roles", {}), new.get("roles", {})
+    roles = {player_id: info for player_id, info in new_roles.items() if old_roles.get(player_id) != info}
+    if roles:
+        patch["roles"] = roles
+    removed = [player_id for player_id in old_roles if player_id not in new_roles]
+    if removed:
+        patch["roles_removed"] = removed
+    return patch
+
+
+def apply_game_patch(state: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplicar sobre un estado serializado los cambios de un evento"""
+    state.update(patch.get("set", {}))
+    if "roles" in patch or "roles_removed" in patch:
+        roles = dict(state.get("roles", {}))
+        roles.update(patch.get("roles", {}))
+        for player_id in patch.get("roles_removed", ()):
+            roles.pop(player_id, None)
+        state["roles"] = roles
+    return state
+
+
+@dataclass
+class GameEventLog:
+    """Estado del registro de una partida en este proceso"""
+    last_seq: int
+    last_state: Optional[Dict[str, Any]] = None  # Último estado serializado (para calcular diffs)
+    events_since_snapshot: int = 0
+
+
+class GameEventService:
+    """Registro de eventos por partida con escritura por lotes y snapshots periódicos"""
+
+    def __init__(
+        self,
+        flush_interval_seconds: float = EVENT_FLUSH_INTERVAL_SECONDS,
+        snapshot_every: int = SNAPSHOT_EVERY_EVENTS
+    ):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.snapshot_every = snapshot_every
+        self._logs: Dict[str, GameEventLog] = {}
+        self._pending_events: List[Dict[str, Any]] = []
+        self._pending_snapshots: List[Dict[str, Any]] = []
+        # Lote que se está escribiendo: sigue siendo visible para las lecturas hasta el commit
+        self._inflight_events: List[Dict[str, Any]] = []
+        self._inflight_snapshots: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_scheduled = False
+
+        # Métricas
+        self.events_total = 0
+        self.snapshots_total = 0
+        self.flushes_total = 0
+        self.last_flush_size = 0
+        self.last_flush_ms = 0.0
+
+    # --- Escritura ---
+
+    def on_game_saved(self, game: Game):
+        """Registrar el guardado de una partida como evento (listener de database.save_game)"""
+        # Serializar y comparar fuera del lock: el lock solo protege el append
+        state = game.model_dump(mode="json")
+        mutation = get_current_mutation()
+        with self._lock:
+            base = self._get_log(game.id).last_state
+        patch = diff_game_state(base, state)
+
+        with self._lock:
+            log = self._get_log(game.id)
+            if log.last_state is not base:
+                # Se ha registrado otro guardado de la partida mientras tanto
+                patch = diff_game_state(log.last_state, state)
+            if not patch:
+                return
+            event = self._append(
+                log, game.id, mutation.name if mutation else "game_saved", game.current_round,
+                {"args": mutation.arguments if mutation else {}, "patch": patch}
+            )
+            # Sin estado previo conocido (partida nueva o proceso reiniciado) el evento lleva el estado completo
+            if log.last_state is None or log.events_since_snapshot >= self.snapshot_every:
+                self._pending_snapshots.append({
+                    "game_id": game.id, "seq": event["seq"], "state": state, "created_at": event["created_at"]
+                })
+                log.events_since_snapshot = 0
+                self.snapshots_total += 1
+            log.last_state = state
+
+    def record(self, game_id: str, event_type: str, data: Dict[str, Any], round_number: Optional[int] = None):
+        """Registrar un evento sin cambios en la partida guardada (p. ej. un voto del motor de votaciones)"""
+        with self._lock:
+            self._append(self._get_log(game_id), game_id, event_type, round_number, {"args": data})
+
+    async def flush(self):
+        """Escribir los eventos y snapshots pendientes en un único lote, fuera del loop"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            with self._lock:
+                self._flush_scheduled = False
+                events, self._pending_events = self._pending_events, []
+                snapshots, self._pending_snapshots = self._pending_snapshots, []
+                self._inflight_events, self._inflight_snapshots = events, snapshots
+            if not events and not snapshots:
+                return
+
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(append_game_events, events, snapshots)
+            except Exception as e:
+                logger.error(f"Error guardando {len(events)} eventos de partida: {e}")
+                with self._lock:
+                    # Reencolar delante de lo llegado mientras tanto para no perder el orden
+                    self._pending_events = events + self._pending_events
+                    self._pending_snapshots = snapshots + self._pending_snapshots
+                    self._inflight_events, self._inflight_snapshots = [], []
+                    self._schedule_flush()
+                return
+
+            with self._lock:
+                self._inflight_events, self._inflight_snapshots = [], []
+            self.flushes_total += 1
+            self.last_flush_size = len(events)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def forget(self, game_id: str):
+        """Liberar el estado en memoria de una partida (sus eventos pendientes se escriben igualmente)"""
+        with self._lock:
+            self._logs.pop(game_id, None)
+
+    def discard(self, game_id: str):
+        """Olvidar una partida borrada, descartando también sus eventos aún no escritos"""
+        with self._lock:
+            self._logs.pop(game_id, None)
+            self._pending_events = [e for e in self._pending_events if e["game_id"] != game_id]
+            self._pending_snapshots = [s for s in self._pending_snapshots if s["game_id"] != game_id]
+
+    # --- Lectura ---
+
+    def get_history(self, game_id: str, after_seq: int = 0, limit: int = HISTORY_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Página de eventos de una partida con seq > after_seq.
+
+        Returns:
+            {"events": [...], "next_cursor": seq del último evento o None si no hay más}
+        """
+        events = load_game_events(game_id, after_seq=after_seq, limit=limit)
+        if len(events) < limit:
+            # Completar con los eventos aún no escritos (siempre posteriores a los persistidos)
+            last_seq = events[-1]["seq"] if events else after_seq
+            events.extend(self._get_pending(game_id, last_seq)[:limit - len(events)])
+        return {
+            "events": events,
+            "next_cursor": events[-1]["seq"] if len(events) == limit else None
+        }
+
+    def iter_history(self, game_id: str, after_seq: int = 0, page_size: int = HISTORY_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Recorrer todo el historial página a página sin cargarlo entero en memoria"""
+        cursor: Optional[int] = after_seq
+        while cursor is not None:
+            page = self.get_history(game_id, cursor, page_size)
+            yield from page["events"]
+            cursor = page["next_cursor"]
+
+    def reconstruct(self, game_id: str, at_seq: Optional[int] = None) -> Optional[Tuple[Game, int]]:
+        """
+        Reconstruir el estado de una partida tras el evento at_seq (por defecto, el último)
+        desde el snapshot más cercano.
+
+        Returns:
+            (partida, seq del último evento aplicado) o None si no hay historial
+        """
+        persisted = load_latest_game_snapshot(game_id, at_seq)
+        pending = [s for s in self._get_pending_snapshots(game_id) if at_seq is None or s["seq"] <= at_seq]
+        snapshot = max([s for s in [persisted] + pending if s], key=lambda s: s["seq"], default=None)
+        if snapshot is None:
+            return None
+
+        state = dict(snapshot["state"])
+        seq = snapshot["seq"]
+        for event in self._iter_events(game_id, seq, at_seq):
+            apply_game_patch(state, event["data"].get("patch", {}))
+            seq = event["seq"]
+        return Game.model_validate(state), seq
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "tracked_games": len(self._logs),
+            "pending_events": len(self._pending_events),
+            "pending_snapshots": len(self._pending_snapshots),
+            "events_total": self.events_total,
+            "snapshots_total": self.snapshots_total,
+            "flushes_total": self.flushes_total,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_ms": round(self.last_flush_ms, 3)
+        }
+
+    # --- Internos ---
+
+    def _get_log(self, game_id: str) -> GameEventLog:
+        """Registro de la partida; la secuencia continúa la persistida (con el lock tomado)"""
+        log = self._logs.get(game_id)
+        if log is None:
+            pending = [e["seq"] for e in self._inflight_events + self._pending_events if e["game_id"] == game_id]
+            log = GameEventLog(last_seq=max(pending) if pending else get_last_game_event_seq(game_id))
+            self._logs[game_id] = log
+        return log
+
+    def _append(self, log: GameEventLog, game_id: str, event_type: str, round_number: Optional[int], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Añadir un evento al lote pendiente (con el lock tomado)"""
+        log.last_seq += 1
+        log.events_since_snapshot += 1
+        event = {
+            "game_id": game_id,
+            "seq": log.last_seq,
+            "type": event_type,
+            "round": round_number,
+            "data": data,
+            "created_at": time.time()
+        }
+        self._pending_events.append(event)
+        self.events_total += 1
+        self._schedule_flush()
+        return event
+
+    def _get_pending(self, game_id: str, after_seq: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                e for e in self._inflight_events + self._pending_events
+                if e["game_id"] == game_id and e["seq"] > after_seq
+            ]
+
+    def _get_pending_snapshots(self, game_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [s for s in self._inflight_snapshots + self._pending_snapshots if s["game_id"] == game_id]
+
+    def _iter_events(self, game_id: str, after_seq: int, until_seq: Optional[int]) -> Iterator[Dict[str, Any]]:
+        """Eventos posteriores a un snapshot, persistidos y pendientes, en orden"""
+        last_seq = after_seq
+        for event in load_game_events(game_id, after_seq=after_seq, until_seq=until_seq):
+            last_seq = event["seq"]
+            yield event
+        for event in self._get_pending(game_id, last_seq):
+            if until_seq is not None and event["seq"] > until_seq:
+                break
+            yield event
+
+    def _schedule_flush(self):
+        """Programar la escritura del lote (con el lock tomado)"""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            phase_scheduler.schedule_threadsafe("game-events-flush", self.flush_interval_seconds, self.flush)
+
+
+# Instancia global del historial de partidas
+game_event_service = GameEventService()
+add_game_save_listener(game_event_service.on_game_saved)
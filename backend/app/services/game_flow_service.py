@@ -5,10 +5,15 @@ Incluye funciones para cambiar estados de partida y asignar roles.
 
 from app.database import save_game, load_game
 from app.models.game_and_roles import Game, GameStatus, GameRole, PlayerInfo
-from typing import Optional
+from app.services.pending_actions_service import pending_actions_service
+from app.services.game_state_service import game_state_manager
+from app.services.game_index_service import game_index_service
+from app.services.game_actor_service import game_mutation
+from typing import List, Optional
 import random
 
 
+@game_mutation
 def change_game_status(game_id: str, user_id: str, new_status: GameStatus, is_admin: bool = False) -> Optional[Game]:
     """Permite al creador o admin iniciar, pausar, avanzar fase o detener la partida."""
     game = load_game(game_id)
@@ -35,9 +40,73 @@ def change_game_status(game_id: str, user_id: str, new_status: GameStatus, is_ad
         return None
     game.status = new_status
     save_game(game)
+    if new_status in (GameStatus.NIGHT, GameStatus.DAY):
+        pending_actions_service.start_phase(game)
+    elif new_status == GameStatus.FINISHED:
+        pending_actions_service.clear_game(game_id)
+        game_state_manager.mark_finished(game_id)
     return game
 
 
+DEFAULT_SPECIAL_ROLES = [GameRole.SEER, GameRole.WITCH, GameRole.HUNTER, GameRole.CUPID]
+
+
+def build_role_list(
+    num_players: int,
+    num_werewolves: Optional[int] = None,
+    special_roles: Optional[List[GameRole]] = None
+) -> List[GameRole]:
+    """
+    Distribución de roles de una partida, sin mezclar.
+    
+    Args:
+        num_players: Número de jugadores
+        num_werewolves: Hombres lobo; por defecto 1 por cada 3 jugadores
+        special_roles: Roles especiales (máximo 1 de cada); por defecto DEFAULT_SPECIAL_ROLES
+    
+    Returns:
+        Lista de roles: hombres lobo, especiales que quepan y aldeanos hasta completar
+    """
+    if num_werewolves is None:
+        num_werewolves = max(1, num_players // 3)
+    if special_roles is None:
+        special_roles = DEFAULT_SPECIAL_ROLES
+    
+    # Añadir hombres lobo
+    roles = [GameRole.WAREWOLF] * num_werewolves
+    
+    # Añadir roles especiales según disponibilidad
+    remaining_slots = num_players - num_werewolves
+    for role in special_roles:
+        if remaining_slots > 1:  # Siempre dejar al menos 1 aldeano
+            roles.append(role)
+            remaining_slots -= 1
+        else:
+            break
+    
+    # El resto son aldeanos
+    roles.extend([GameRole.VILLAGER] * (num_players - len(roles)))
+    return roles
+
+
+def create_player_info(role: GameRole) -> PlayerInfo:
+    """Información inicial de un jugador con las habilidades específicas de su rol"""
+    player_info = PlayerInfo(role=role, is_alive=True, is_revealed=False)
+    if role == GameRole.WITCH:
+        player_info.has_healing_potion = True
+        player_info.has_poison_potion = True
+    elif role == GameRole.CUPID:
+        player_info.is_cupid = True
+    elif role == GameRole.SHERIFF:
+        player_info.has_double_vote = True
+        player_info.can_break_ties = True
+    elif role == GameRole.HUNTER:
+        player_info.can_revenge_kill = True
+        player_info.has_used_revenge = False
+    return player_info
+
+
+@game_mutation
 def assign_roles(game_id: str, user_id: str, is_admin: bool = False) -> Optional[Game]:
     """Asigna roles automáticamente a todos los jugadores de una partida y cambia su estado a STARTED."""
     game = load_game(game_id)
@@ -57,66 +126,23 @@ def assign_roles(game_id: str, user_id: str, is_admin: bool = False) -> Optional
     if num_players < 10 or num_players > 18:
         return None
     
-    # Calcular número de hombres lobo (1 por cada 4 jugadores aproximadamente)
-    num_werewolves = max(1, num_players // 3)
-    
-    # Lista de todos los roles disponibles
-    available_roles = []
-    
-    # Añadir hombres lobo
-    for _ in range(num_werewolves):
-        available_roles.append(GameRole.WAREWOLF)
-    
-    # Añadir roles especiales (máximo 1 de cada tipo, según disponibilidad)
-    special_roles = [GameRole.SEER, GameRole.WITCH, GameRole.HUNTER, GameRole.CUPID]
-    remaining_slots = num_players - num_werewolves
-    
-    # Asignar roles especiales si hay suficientes jugadores
-    for role in special_roles:
-        if remaining_slots > 1:  # Siempre dejar al menos 1 aldeano
-            available_roles.append(role)
-            remaining_slots -= 1
-        else:
-            break
-    
-    # El resto son aldeanos
-    while len(available_roles) < num_players:
-        available_roles.append(GameRole.VILLAGER)
-    
-    # Mezclar roles aleatoriamente
+    # Repartir aleatoriamente la distribución de roles por defecto
+    available_roles = build_role_list(num_players)
     random.shuffle(available_roles)
-    
-    # Asignar roles a jugadores
-    game.roles = {}
-    for i, player_id in enumerate(game.players):
-        player_info = PlayerInfo(
-            role=available_roles[i],
-            is_alive=True,
-            is_revealed=False
-        )
-        
-        # Configurar habilidades específicas según el rol
-        if available_roles[i] == GameRole.WITCH:
-            player_info.has_healing_potion = True
-            player_info.has_poison_potion = True
-        elif available_roles[i] == GameRole.CUPID:
-            player_info.is_cupid = True
-        elif available_roles[i] == GameRole.SHERIFF:
-            player_info.has_double_vote = True
-            player_info.can_break_ties = True
-        elif available_roles[i] == GameRole.HUNTER:
-            player_info.can_revenge_kill = True
-            player_info.has_used_revenge = False
-        
-        game.roles[player_id] = player_info
+    game.roles = {
+        player_id: create_player_info(available_roles[i])
+        for i, player_id in enumerate(game.players)
+    }
     
     # Cambiar estado de la partida a STARTED
     game.status = GameStatus.STARTED
     game.current_round = 1
     
     save_game(game)
+    game_index_service.refresh(game)
     return game
 
+@game_mutation
 def reset_night_actions(game_id: str) -> Optional[Game]:
     """
     Reinicia las acciones nocturnas de todos los jugadores para una nueva noche.
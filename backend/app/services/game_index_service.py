@@ -0,0 +1,239 @@
+"""
+Game Index Service
+Índice en memoria por partida activa: rol -> jugadores, conjunto de vivos, mapa de
+enamorados, alguacil y contadores de vivos por bando, de modo que las consultas de rol
+(is_*, can_*, objetivos) y la comprobación de victoria sean O(1) sin cargar la partida.
+
+El índice se construye una vez a partir de la partida (O(n)) al asignar roles o al
+detectar un cambio, y después se mantiene con los eventos de muerte y transformación.
+Cada índice está asociado a la versión en memoria de la partida
+(database.get_game_version); si la partida se escribe por otro camino, el índice se
+reconstruye de forma perezosa en la siguiente consulta. Dentro de una transacción sobre la
+partida (database.game_transaction) el índice se construye desde la copia sin confirmar y
+no se registra.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+import threading
+
+from app.database import get_game_version, in_game_transaction, load_game
+from app.models.game_and_roles import Game, GameRole, GameStatus, PlayerInfo
+
+FACTION_WEREWOLVES = "werewolves"
+FACTION_VILLAGERS = "villagers"
+
+
+def get_faction(role: GameRole) -> str:
+    """Bando al que pertenece un rol"""
+    return FACTION_WEREWOLVES if role == GameRole.WAREWOLF else FACTION_VILLAGERS
+
+
+@dataclass
+class GameIndex:
+    """Índice incremental de roles y jugadores vivos de una partida"""
+    game_id: str
+    version: int
+    game: Optional[Game] = None  # Partida de la que procede el índice (solo lectura)
+    players: Tuple[str, ...] = ()  # Orden de los jugadores en la partida
+    role_ids: Dict[GameRole, Set[str]] = field(default_factory=dict)
+    alive: Set[str] = field(default_factory=set)
+    lovers_map: Dict[str, str] = field(default_factory=dict)
+    sheriff_id: Optional[str] = None
+    alive_werewolves: int = 0
+    alive_villagers: int = 0
+    lovers: Optional[Tuple[str, str]] = None  # Pareja enlazada entre sí
+    lovers_alive: int = 0
+
+    @classmethod
+    def from_game(cls, game: Game, version: int = 0) -> "GameIndex":
+        """Construir el índice recorriendo los roles una única vez"""
+        index = cls(game_id=game.id, version=version, game=game, players=tuple(game.players))
+        for player_id, role_info in game.roles.items():
+            index.role_ids.setdefault(role_info.role, set()).add(player_id)
+            if role_info.role == GameRole.SHERIFF:
+                index.sheriff_id = player_id
+
+            if role_info.is_alive:
+                index.alive.add(player_id)
+                if get_faction(role_info.role) == FACTION_WEREWOLVES:
+                    index.alive_werewolves += 1
+                else:
+                    index.alive_villagers += 1
+
+            partner_id = role_info.lover_partner_id
+            if role_info.is_lover and partner_id:
+                index.lovers_map[player_id] = partner_id
+            if index.lovers is None and role_info.is_lover and partner_id in game.roles:
+                partner = game.roles[partner_id]
+                if partner.is_lover and partner.lover_partner_id == player_id:
+                    index.lovers = (player_id, partner_id)
+                    index.lovers_alive = int(role_info.is_alive) + int(partner.is_alive)
+        return index
+
+    def copy(self) -> "GameIndex":
+        """Copia para mantener incrementalmente sin alterar el índice registrado"""
+        return GameIndex(
+            game_id=self.game_id,
+            version=self.version,
+            game=self.game,
+            players=self.players,
+            role_ids={role: set(ids) for role, ids in self.role_ids.items()},
+            alive=set(self.alive),
+            lovers_map=dict(self.lovers_map),
+            sheriff_id=self.sheriff_id,
+            alive_werewolves=self.alive_werewolves,
+            alive_villagers=self.alive_villagers,
+            lovers=self.lovers,
+            lovers_alive=self.lovers_alive
+        )
+
+    @property
+    def status(self) -> Optional[GameStatus]:
+        return self.game.status if self.game else None
+
+    @property
+    def alive_total(self) -> int:
+        return self.alive_werewolves + self.alive_villagers
+
+    # --- Consultas ---
+
+    def get_player(self, player_id: str) -> Optional[PlayerInfo]:
+        """Información de rol del jugador en la partida indexada"""
+        return self.game.roles.get(player_id) if self.game else None
+
+    def is_alive(self, player_id: str) -> bool:
+        return player_id in self.alive
+
+    def has_role(self, player_id: str, role: GameRole) -> bool:
+        return player_id in self.role_ids.get(role, ())
+
+    def is_alive_with_role(self, player_id: str, role: GameRole) -> bool:
+        return player_id in self.alive and self.has_role(player_id, role)
+
+    def get_alive_players(self, exclude: Optional[str] = None) -> List[str]:
+        """Jugadores vivos en el orden de la partida"""
+        return [p for p in self.players if p in self.alive and p != exclude]
+
+    # --- Mantenimiento incremental ---
+
+    def on_death(self, player_id: str, role: GameRole):
+        """Actualizar el índice tras la muerte de un jugador"""
+        if player_id not in self.alive:
+            return
+        self.alive.discard(player_id)
+        if get_faction(role) == FACTION_WEREWOLVES:
+            self.alive_werewolves -= 1
+        else:
+            self.alive_villagers -= 1
+        if self.lovers and player_id in self.lovers:
+            self.lovers_alive -= 1
+
+    def on_transformation(self, player_id: str, old_role: GameRole, new_role: GameRole):
+        """Actualizar el índice cuando un jugador vivo cambia de rol"""
+        self.role_ids.get(old_role, set()).discard(player_id)
+        self.role_ids.setdefault(new_role, set()).add(player_id)
+        if new_role == GameRole.SHERIFF:
+            self.sheriff_id = player_id
+
+        old_faction, new_faction = get_faction(old_role), get_faction(new_role)
+        if old_faction == new_faction or player_id not in self.alive:
+            return
+        if old_faction == FACTION_WEREWOLVES:
+            self.alive_werewolves -= 1
+            self.alive_villagers += 1
+        else:
+            self.alive_villagers -= 1
+            self.alive_werewolves += 1
+
+    def get_victory_type(self) -> Optional[str]:
+        """Tipo de victoria en O(1), o None si la partida continúa"""
+        # 1. Enamorados: solo quedan ellos dos
+        if self.lovers and self.lovers_alive == 2 and self.alive_total == 2:
+            return "lovers"
+        # 2. Hombres lobo
+        if self.alive_werewolves >= self.alive_villagers:
+            return FACTION_WEREWOLVES
+        # 3. Aldeanos
+        if self.alive_werewolves == 0:
+            return FACTION_VILLAGERS
+        return None
+
+
+def get_winner_ids(game: Game, victory_type: str) -> List[str]:
+    """IDs de los ganadores; solo se calcula una vez, al terminar la partida"""
+    if victory_type == "lovers":
+        return [p for p, r in game.roles.items() if r.is_alive]
+    return [p for p, r in game.roles.items() if r.is_alive and get_faction(r.role) == victory_type]
+
+
+class GameIndexService:
+    """Registro de índices por partida, validados contra la versión en memoria de la partida"""
+
+    def __init__(self):
+        self._indexes: Dict[str, GameIndex] = {}
+        self._lock = threading.Lock()
+        self.rebuilds_total = 0
+
+    def get(self, game: Game, version: Optional[int] = None) -> GameIndex:
+        """Obtener el índice vigente de una partida, reconstruyéndolo si está desactualizado"""
+        if in_game_transaction(game.id):
+            return GameIndex.from_game(game, get_game_version(game.id))
+        if version is None:
+            version = get_game_version(game.id)
+        with self._lock:
+            index = self._indexes.get(game.id)
+            if index is None or index.version != version:
+                index = GameIndex.from_game(game, version)
+                self._indexes[game.id] = index
+                self.rebuilds_total += 1
+            return index
+
+    def get_by_id(self, game_id: str) -> Optional[GameIndex]:
+        """Obtener el índice vigente por ID; solo carga la partida si el índice está desactualizado"""
+        # La versión se lee antes de cargar: si la partida cambia mientras tanto, el índice
+        # queda asociado a una versión anterior y se reconstruye en la siguiente consulta
+        version = get_game_version(game_id)
+        if not in_game_transaction(game_id):
+            with self._lock:
+                index = self._indexes.get(game_id)
+                if index is not None and index.version == version:
+                    return index
+
+        game = load_game(game_id)
+        if not game:
+            self.discard(game_id)
+            return None
+        return self.get(game, version)
+
+    def refresh(self, game: Game) -> GameIndex:
+        """Reconstruir el índice tras guardar una partida (p. ej. al asignar roles)"""
+        index = GameIndex.from_game(game, get_game_version(game.id))
+        if in_game_transaction(game.id):
+            return index
+        with self._lock:
+            self._indexes[game.id] = index
+            self.rebuilds_total += 1
+        return index
+
+    def commit(self, game_id: str, index: GameIndex, game: Optional[Game] = None):
+        """Adoptar un índice mantenido incrementalmente tras guardar la partida"""
+        if in_game_transaction(game_id):
+            # Sin confirmar: la partida se reindexa tras el commit
+            return
+        with self._lock:
+            index.version = get_game_version(game_id)
+            if game is not None:
+                index.game = game
+            self._indexes[game_id] = index
+
+    def discard(self, game_id: str):
+        """Descartar el índice de una partida"""
+        with self._lock:
+            self._indexes.pop(game_id, None)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"indexed_games": len(self._indexes), "rebuilds_total": self.rebuilds_total}
+
+
+# Instancia global de índices por partida
+game_index_service = GameIndexService()
@@ -3,10 +3,12 @@ Game Phases Service
 Maneja las diferentes fases del juego y sus transiciones automáticas
 """
 from enum import Enum
-from datetime import datetime, timedelta
 from typing import Dict, Optional, Callable, Any
 import asyncio
 import logging
+import time
+from app.services.phase_scheduler_service import phase_scheduler
+from app.services.pending_actions_service import PHASE_NIGHT, PHASE_DAY, PHASE_VOTING, pending_actions_service
 
 logger = logging.getLogger(__name__)
 
@@ -43,18 +45,29 @@ class GamePhaseController:
         GamePhase.FINISHED: PhaseConfig(0, GamePhase.FINISHED, False)  # Final del juego
     }
     
-    def __init__(self, game_id: str, phase_config: Optional[Dict[GamePhase, PhaseConfig]] = None):
+    # Intervalo opcional de ticks de tiempo restante (segundos). Por defecto no hay ticks:
+    # el deadline se envía una sola vez en phase_changed y el cliente calcula la cuenta atrás
+    TIMER_TICK_INTERVAL: Optional[int] = None
+    
+    def __init__(
+        self,
+        game_id: str,
+        phase_config: Optional[Dict[GamePhase, PhaseConfig]] = None,
+        timer_tick_interval: Optional[int] = None
+    ):
         self.game_id = game_id
         self.current_phase = GamePhase.WAITING
-        self.phase_start_time: Optional[datetime] = None
         self.phase_config = phase_config or self.DEFAULT_PHASE_CONFIG.copy()
+        self.timer_tick_interval = timer_tick_interval or self.TIMER_TICK_INTERVAL
         
         # Callbacks para eventos de fase
         self.phase_change_callbacks: list[Callable] = []
         self.phase_timer_callbacks: list[Callable] = []
         
-        # Task para el timer de fase
-        self.phase_timer_task: Optional[asyncio.Task] = None
+        # Timer de fase registrado en el planificador central
+        self.timer_key = f"phase:{game_id}"
+        self.phase_started_at: Optional[float] = None  # time.monotonic() de inicio de fase
+        self.phase_deadline: Optional[float] = None    # time.monotonic() de fin de fase
         
         # Estado del juego
         self.is_active = False
@@ -87,13 +100,11 @@ class GamePhaseController:
             return False
         
         # Cancelar timer anterior
-        if self.phase_timer_task:
-            self.phase_timer_task.cancel()
-            self.phase_timer_task = None
+        self._cancel_phase_timer()
         
         # Cambiar fase
         self.current_phase = new_phase
-        self.phase_start_time = datetime.now()
+        self.phase_started_at = time.monotonic()
         
         logger.info(f"Juego {self.game_id}: {old_phase.value} -> {new_phase.value}")
         
@@ -110,9 +121,7 @@ class GamePhaseController:
         if new_phase in self.phase_config:
             config = self.phase_config[new_phase]
             if config.auto_advance and config.duration_minutes > 0:
-                self.phase_timer_task = asyncio.create_task(
-                    self._start_phase_timer(new_phase, config.duration_minutes)
-                )
+                self._start_phase_timer(new_phase, config.duration_minutes)
         
         # Verificar fin del juego
         if new_phase == GamePhase.FINISHED:
@@ -120,34 +129,73 @@ class GamePhaseController:
         
         return True
     
-    async def _start_phase_timer(self, phase: GamePhase, duration_minutes: int):
-        """Iniciar timer para una fase"""
+    def _start_phase_timer(self, phase: GamePhase, duration_minutes: int):
+        """Registrar el deadline de la fase en el planificador central"""
+        self.phase_deadline = (self.phase_started_at or time.monotonic()) + duration_minutes * 60
+        phase_scheduler.schedule_at(self.timer_key, self._next_wakeup(time.monotonic()), lambda: self._on_phase_timer(phase))
+    
+    def _next_wakeup(self, now: float) -> float:
+        """Siguiente despertar: el deadline, o antes si hay ticks periódicos configurados"""
+        if self.timer_tick_interval:
+            return min(now + self.timer_tick_interval, self.phase_deadline)
+        return self.phase_deadline
+    
+    def advance_now(self) -> bool:
+        """
+        Adelantar el fin de la fase actual (p.ej. cuando no quedan acciones pendientes).
+        Seguro de llamar desde el threadpool: el cambio se ejecuta en el loop del planificador.
+        """
+        if not self.is_active:
+            return False
+        
+        phase = self.current_phase
+        phase_scheduler.schedule_threadsafe(self.timer_key, 0, lambda: self._advance_early(phase))
+        return True
+    
+    async def _advance_early(self, phase: GamePhase):
+        """Avanzar a la siguiente fase si el controlador sigue en la fase esperada"""
+        if not self.is_active or self.current_phase != phase:
+            return
+        
+        logger.info(f"Juego {self.game_id}: fase {phase.value} completada antes de tiempo")
+        await self.change_phase(self.phase_config[phase].next_phase)
+    
+    def _cancel_phase_timer(self):
+        """Cancelar el timer pendiente de la fase actual"""
+        phase_scheduler.cancel(self.timer_key)
+        self.phase_deadline = None
+    
+    async def _on_phase_timer(self, phase: GamePhase):
+        """Tick del planificador: notificar tiempo restante o avanzar de fase"""
         try:
-            total_seconds = duration_minutes * 60
-            
-            # Enviar actualizaciones cada 10 segundos
-            update_interval = 10
+            # Ignorar ticks de una fase que ya terminó
+            if not self.is_active or self.current_phase != phase or self.phase_deadline is None:
+                return
             
-            for remaining in range(total_seconds, 0, -update_interval):
-                # Notificar tiempo restante
-                for callback in self.phase_timer_callbacks:
-                    try:
-                        result = callback(phase, remaining)
-                        if asyncio.iscoroutine(result):
-                            await result
-                    except Exception as e:
-                        logger.error(f"Error en callback de timer: {e}")
-                
-                # Esperar intervalo
-                await asyncio.sleep(min(update_interval, remaining))
+            now = time.monotonic()
+            remaining = self.phase_deadline - now
             
             # Tiempo agotado - avanzar a siguiente fase
-            if self.current_phase == phase:  # Verificar que no haya cambiado mientras tanto
+            if remaining <= phase_scheduler.tick_resolution:
                 config = self.phase_config[phase]
                 await self.change_phase(config.next_phase)
-                
-        except asyncio.CancelledError:
-            logger.debug(f"Timer cancelado para fase {phase.value}")
+                return
+            
+            # Reprogramar antes de notificar para que callbacks lentos no retrasen el deadline
+            phase_scheduler.schedule_at(self.timer_key, self._next_wakeup(now), lambda: self._on_phase_timer(phase))
+            
+            if not self.timer_tick_interval:
+                return
+            
+            # Notificar tiempo restante (ticks opcionales)
+            for callback in self.phase_timer_callbacks:
+                try:
+                    result = callback(phase, int(round(remaining)))
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Error en callback de timer: {e}")
+                    
         except Exception as e:
             logger.error(f"Error en timer de fase {phase.value}: {e}")
     
@@ -174,39 +222,36 @@ class GamePhaseController:
         return to_phase in valid_transitions.get(from_phase, set())
     
     def get_phase_info(self) -> Dict[str, Any]:
-        """Obtener información de la fase actual"""
-        if not self.phase_start_time:
-            return {
-                "phase": self.current_phase.value,
-                "time_remaining": 0,
-                "duration": 0,
-                "progress": 0.0
-            }
-        
+        """Obtener información de la fase actual (calculada sobre reloj monotónico)"""
         config = self.phase_config.get(self.current_phase)
-        if not config or config.duration_minutes == 0:
+        if not self.phase_started_at or not config or config.duration_minutes == 0:
             return {
                 "phase": self.current_phase.value,
                 "time_remaining": 0,
                 "duration": 0,
-                "progress": 0.0
+                "progress": 0.0,
+                "deadline": None,
+                "server_time": time.time()
             }
         
         # Calcular tiempo transcurrido y restante
-        elapsed = datetime.now() - self.phase_start_time
-        total_duration = timedelta(minutes=config.duration_minutes)
-        remaining = total_duration - elapsed
-        
-        if remaining.total_seconds() <= 0:
-            remaining = timedelta(0)
+        now = time.monotonic()
+        total_duration = config.duration_minutes * 60
+        elapsed = now - self.phase_started_at
+        deadline = self.phase_deadline if self.phase_deadline is not None else self.phase_started_at + total_duration
+        remaining = max(0.0, deadline - now)
         
-        progress = min(1.0, elapsed.total_seconds() / total_duration.total_seconds())
+        progress = min(1.0, elapsed / total_duration)
+        server_time = time.time()
         
         return {
             "phase": self.current_phase.value,
-            "time_remaining": int(remaining.total_seconds()),
-            "duration": int(total_duration.total_seconds()),
-            "progress": progress
+            "time_remaining": int(remaining),
+            "duration": int(total_duration),
+            "progress": progress,
+            # Deadline absoluto (epoch, segundos) derivado del reloj monotónico
+            "deadline": server_time + remaining,
+            "server_time": server_time
         }
     
     def get_time_remaining(self) -> int:
@@ -224,14 +269,41 @@ class GamePhaseController:
         self.is_active = False
         
         # Cancelar timer
-        if self.phase_timer_task:
-            self.phase_timer_task.cancel()
-            self.phase_timer_task = None
+        self._cancel_phase_timer()
         
         # Limpiar callbacks
         self.phase_change_callbacks.clear()
         self.phase_timer_callbacks.clear()
     
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Serializar el estado de la fase (deadline en epoch, ya que el reloj monotónico no sobrevive a un reinicio)"""
+        now = time.monotonic()
+        wall_now = time.time()
+        return {
+            "phase": self.current_phase.value,
+            "is_active": self.is_active,
+            "started_at": wall_now - (now - self.phase_started_at) if self.phase_started_at else None,
+            "deadline": wall_now + (self.phase_deadline - now) if self.phase_deadline is not None else None
+        }
+    
+    def restore_snapshot(self, data: Dict[str, Any]):
+        """Restaurar la fase y reprogramar su timer a partir del deadline guardado"""
+        now = time.monotonic()
+        wall_now = time.time()
+        
+        self.current_phase = GamePhase(data["phase"])
+        self.is_active = data.get("is_active", False)
+        self.phase_started_at = now - (wall_now - data["started_at"]) if data.get("started_at") else None
+        
+        if data.get("deadline") is None or not self.is_active:
+            self.phase_deadline = None
+            return
+        
+        # Si el deadline ya venció durante el reinicio, el timer se dispara en el siguiente tick
+        phase = self.current_phase
+        self.phase_deadline = now + (data["deadline"] - wall_now)
+        phase_scheduler.schedule_at(self.timer_key, self._next_wakeup(now), lambda: self._on_phase_timer(phase))
+    
     def update_phase_config(self, phase: GamePhase, config: PhaseConfig):
         """Actualizar configuración de una fase"""
         self.phase_config[phase] = config
@@ -241,8 +313,25 @@ class GamePhaseController:
 class GamePhaseManager:
     """Gestor global de fases de juego"""
     
+    # Fases del controlador que se cierran cuando el seguimiento indicado queda sin pendientes
+    EARLY_ADVANCE_PHASES = {
+        PHASE_NIGHT: {GamePhase.NIGHT},
+        PHASE_DAY: {GamePhase.DAY, GamePhase.VOTING},
+        PHASE_VOTING: {GamePhase.VOTING},
+    }
+    
     def __init__(self):
         self.game_controllers: Dict[str, GamePhaseController] = {}
+        pending_actions_service.add_completion_callback(self._on_pending_actions_complete)
+    
+    def _on_pending_actions_complete(self, game_id: str, phase: str):
+        """Avanzar la fase en cuanto todos los jugadores han completado sus acciones"""
+        controller = self.game_controllers.get(game_id)
+        if not controller or not controller.is_active:
+            return
+        
+        if controller.current_phase in self.EARLY_ADVANCE_PHASES.get(phase, set()):
+            controller.advance_now()
     
     def get_or_create_controller(self, game_id: str) -> GamePhaseController:
         """Obtener o crear controlador para un juego"""
@@ -263,6 +352,14 @@ class GamePhaseManager:
     def get_active_games(self) -> list[str]:
         """Obtener lista de juegos activos"""
         return [game_id for game_id, controller in self.game_controllers.items() if controller.is_active]
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Obtener métricas de controladores y del planificador de timers"""
+        return {
+            "controllers": len(self.game_controllers),
+            "active_games": len(self.get_active_games()),
+            "scheduler": phase_scheduler.get_metrics()
+        }
 
 
 # Instancia global del gestor de fases
@@ -5,6 +5,8 @@ Incluye funciones para crear, obtener y listar partidas usando la base de datos
 
 from app.database import save_game, load_game, load_all_games, delete_game as db_delete_game
 from app.models.game_and_roles import Game, GameStatus
+from app.services.game_actor_service import game_mutation
+from app.services.game_event_service import game_event_service
 from typing import Optional, List
 
 # Lógica relacionada con partidas
@@ -19,9 +21,11 @@ def get_all_games() -> List[Game]:
     return load_all_games()
 
 def delete_game(game_id: str) -> bool:
-    """Elimina una partida de la base de datos por su id. Devuelve True si existía y fue eliminada."""
+    """Elimina una partida (y su historial) de la base de datos por su id. Devuelve True si existía y fue eliminada."""
+    game_event_service.discard(game_id)
     return db_delete_game(game_id)
 
+@game_mutation
 def leave_game(game_id: str, user_id: str) -> bool:
     """Permite que un usuario abandone una partida si es jugador y la partida no ha comenzado."""
     game = load_game(game_id)
@@ -37,6 +41,7 @@ def leave_game(game_id: str, user_id: str) -> bool:
         return True
     return False
 
+@game_mutation
 def update_game_params(game_id: str, user_id: str, name: str | None = None, max_players: int | None = None, roles: dict | None = None, is_admin: bool = False) -> Optional[Game]:
     """Permite al creador o admin modificar nombre, max_players y roles antes de que comience la partida."""
     game = load_game(game_id)
@@ -67,6 +72,7 @@ def creator_delete_game(game_id: str, user_id: str, is_admin: bool = False) -> b
         return False
     return delete_game(game_id)
 
+@game_mutation
 def join_game(game_id: str, user_id: str) -> bool:
     """Permite que un usuario se una a una partida si está en estado WAITING y hay espacios disponibles."""
     game = load_game(game_id)
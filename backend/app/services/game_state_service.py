@@ -2,11 +2,33 @@
 Game State Service
 Maneja el estado del juego en memoria integrado con sistema de fases
 """
-from typing import Dict, List, Set
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
 from datetime import datetime, timedelta
 import asyncio
+import logging
+import os
+import time
 from app.models.game_and_roles import Game, GameStatus
 from app.services.game_phases_service import GamePhaseController, GamePhase, phase_manager
+from app.services.phase_scheduler_service import phase_scheduler
+from app.services.pending_actions_service import pending_actions_service
+from app.services.game_index_service import game_index_service
+from app.services.eligible_targets_service import eligible_targets_service
+from app.services.vote_tally_service import day_vote_tally_service
+from app.services.werewolf_consensus_service import werewolf_consensus_service
+from app.services.voting_service import voting_service
+from app.services.game_actor_service import game_actor_service
+from app.services.game_event_service import game_event_service
+from app.services.player_view_service import player_view_service
+
+logger = logging.getLogger(__name__)
+
+# Ciclo de vida de las partidas residentes en memoria
+GAME_IDLE_TTL_SECONDS = int(os.getenv("GAME_IDLE_TTL_SECONDS", "7200"))  # 2 horas sin actividad
+FINISHED_GAME_GRACE_SECONDS = int(os.getenv("FINISHED_GAME_GRACE_SECONDS", "300"))  # Margen tras terminar
+MAX_RESIDENT_GAMES = int(os.getenv("MAX_RESIDENT_GAMES", "500"))  # Límite de partidas en memoria
+CLEANUP_INTERVAL_SECONDS = 60
 
 class GameState:
     """Estado de un juego en memoria"""
@@ -25,6 +47,10 @@ class GameState:
         self.eliminated_players: Set[str] = set()
         self.is_active = True
         
+        # Ciclo de vida: última actividad (monotónica) y momento de finalización
+        self.last_activity = time.monotonic()
+        self.finished_at: Optional[float] = None
+        
         # Legacy compatibility
         self.phase_start_time = datetime.now()
         self.phase_duration = timedelta(minutes=5)
@@ -148,6 +174,29 @@ class GameState:
         self.phase_start_time = datetime.now()
         self.phase_duration = timedelta(minutes=duration_minutes)
     
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Serializar el estado en memoria de la partida (sin las conexiones, que no sobreviven al reinicio)"""
+        return {
+            "game_id": self.game_id,
+            "votes": dict(self.votes),
+            "night_actions": dict(self.night_actions),
+            "eliminated_players": list(self.eliminated_players),
+            "finished": self.finished_at is not None,
+            "phase_controller": self.phase_controller.to_snapshot()
+        }
+    
+    def restore_snapshot(self, data: Dict[str, Any]):
+        """
+        Restaurar el estado en memoria de la partida desde un snapshot. Ningún WebSocket
+        sobrevive al reinicio: connected_players empieza vacío y se rellena a medida que
+        los clientes vuelven a unirse (handle_join_game).
+        """
+        self.connected_players = set()
+        self.votes = dict(data.get("votes", {}))
+        self.night_actions = dict(data.get("night_actions", {}))
+        self.eliminated_players = set(data.get("eliminated_players", []))
+        self.phase_controller.restore_snapshot(data["phase_controller"])
+    
     async def start_game_phases(self):
         """Iniciar el sistema de fases para el juego"""
         await self.phase_controller.start_game()
@@ -161,12 +210,33 @@ class GameState:
         return self.get_phase_time_remaining() <= 0
 
 class GameStateManager:
-    """Manager para estados de juegos activos"""
+    """
+    Manager para estados de juegos activos.
+    
+    Las partidas se guardan en un OrderedDict ordenado por última actividad (la menos
+    reciente al principio), de modo que la limpieza de inactivas solo examina el principio
+    de la cola: O(1) por partida desalojada. El límite de memoria, solo cuando se supera,
+    recorre la cola para desalojar primero las terminadas y después las menos activas sin
+    conexiones; nunca desaloja una partida en curso con jugadores conectados.
+    """
     
-    def __init__(self):
-        self.active_games: Dict[str, GameState] = {}
+    def __init__(
+        self,
+        idle_ttl_seconds: int = GAME_IDLE_TTL_SECONDS,
+        finished_grace_seconds: int = FINISHED_GAME_GRACE_SECONDS,
+        max_resident_games: int = MAX_RESIDENT_GAMES
+    ):
+        self.active_games: "OrderedDict[str, GameState]" = OrderedDict()
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.finished_grace_seconds = finished_grace_seconds
+        self.max_resident_games = max_resident_games
         self.cleanup_task = None
         
+        # Métricas de desalojo por motivo
+        self.evictions: Dict[str, int] = {"idle": 0, "finished": 0, "capacity": 0, "manual": 0}
+        # Veces que el límite no se ha podido cumplir sin desalojar partidas con conexiones
+        self.capacity_exceeded_total = 0
+        
     async def start_manager(self):
         """Iniciar el manager"""
         if not self.cleanup_task:
@@ -178,9 +248,17 @@ class GameStateManager:
             self.cleanup_task.cancel()
             self.cleanup_task = None
     
+    def touch(self, game_id: str):
+        """Registrar actividad en una partida residente (la mueve al final de la cola)"""
+        game_state = self.active_games.get(game_id)
+        if game_state:
+            game_state.last_activity = time.monotonic()
+            self.active_games.move_to_end(game_id)
+    
     async def get_or_create_game_state(self, game_id: str) -> GameState | None:
         """Obtener o crear estado de juego"""
         if game_id in self.active_games:
+            self.touch(game_id)
             return self.active_games[game_id]
         
         # Cargar juego desde base de datos
@@ -204,47 +282,161 @@ class GameStateManager:
         game_state = GameState(game_id, game_data)
         self.active_games[game_id] = game_state
         
+        # La partida recién creada aún no tiene conexiones, pero se va a usar ahora
+        await self._enforce_capacity(keep=game_id)
         return game_state
     
-    async def remove_game_state(self, game_id: str):
-        """Remover estado de juego"""
-        if game_id in self.active_games:
-            game_state = self.active_games[game_id]
-            game_state.is_active = False
-            
-            # Cancelar timer de fase
-            if game_state.phase_timer_task:
-                game_state.phase_timer_task.cancel()
-            
-            del self.active_games[game_id]
+    def mark_finished(self, game_id: str):
+        """
+        Programar el desalojo de una partida terminada tras el margen de gracia.
+        Se puede llamar desde rutas síncronas (threadpool).
+        """
+        game_state = self.active_games.get(game_id)
+        if not game_state or game_state.finished_at is not None:
+            return
+        
+        game_state.finished_at = time.monotonic()
+        phase_scheduler.schedule_threadsafe(
+            self._eviction_key(game_id),
+            self.finished_grace_seconds,
+            lambda: self.remove_game_state(game_id, reason="finished")
+        )
+    
+    async def remove_game_state(self, game_id: str, reason: str = "manual"):
+        """Remover estado de juego y todos sus recursos asociados"""
+        game_state = self.active_games.pop(game_id, None)
+        if game_state is None:
+            return
+        
+        game_state.is_active = False
+        
+        # Cancelar timers de fase y de desalojo
+        if game_state.phase_timer_task:
+            game_state.phase_timer_task.cancel()
+        phase_scheduler.cancel(self._eviction_key(game_id))
+        
+        # Partida sin terminar: los votos diurnos solo viven en el motor de votaciones
+        # hasta la resolución del día, así que se guardan en la partida antes de descartarlos
+        if game_state.finished_at is None:
+            from app.services.player_action_service import persist_day_votes
+            try:
+                await asyncio.to_thread(persist_day_votes, game_id)
+            except Exception as e:
+                logger.error(f"Error guardando los votos diurnos de la partida {game_id}: {e}")
+        
+        # Liberar controlador, votación, acciones pendientes y room
+        phase_manager.remove_controller(game_id)
+        await voting_service.cleanup_session(game_id)
+        pending_actions_service.clear_game(game_id)
+        game_index_service.discard(game_id)
+        eligible_targets_service.invalidate(game_id)
+        day_vote_tally_service.discard(game_id)
+        werewolf_consensus_service.clear_game(game_id)
+        await game_actor_service.stop_actor(game_id)
+        game_event_service.forget(game_id)
+        player_view_service.forget(game_id)
+        
+        from app.websocket.connection_manager import connection_manager
+        connection_manager.release_game_room(game_id)
+        
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+        logger.info(f"Estado de juego {game_id} desalojado ({reason})")
     
     def get_active_games(self) -> List[str]:
         """Obtener lista de juegos activos"""
         return list(self.active_games.keys())
     
+    def to_snapshot(self) -> List[Dict[str, Any]]:
+        """Serializar las partidas residentes, de menos a más reciente actividad"""
+        return [game_state.to_snapshot() for game_state in self.active_games.values()]
+    
+    async def restore_snapshot(self, games: List[Dict[str, Any]]) -> List[GameState]:
+        """Rehidratar partidas residentes respetando el orden de actividad del snapshot"""
+        restored = []
+        for data in games:
+            try:
+                game_state = await self.get_or_create_game_state(data["game_id"])
+                if not game_state:
+                    continue
+                game_state.restore_snapshot(data)
+                if data.get("finished"):
+                    self.mark_finished(game_state.game_id)
+                restored.append(game_state)
+            except Exception as e:
+                logger.error(f"Error rehidratando partida {data.get('game_id')}: {e}")
+        return restored
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Obtener gauges de partidas residentes y contadores de desalojo"""
+        now = time.monotonic()
+        oldest_idle = None
+        if self.active_games:
+            oldest = next(iter(self.active_games.values()))
+            oldest_idle = round(now - oldest.last_activity, 1)
+        
+        return {
+            "resident_games": len(self.active_games),
+            "finished_pending_eviction": sum(
+                1 for state in self.active_games.values() if state.finished_at is not None
+            ),
+            "max_resident_games": self.max_resident_games,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "oldest_idle_seconds": oldest_idle,
+            "evictions_total": dict(self.evictions),
+            "capacity_exceeded_total": self.capacity_exceeded_total
+        }
+    
+    async def _enforce_capacity(self, keep: Optional[str] = None):
+        """
+        Desalojar partidas mientras se supere el límite de memoria: primero las terminadas
+        y después, de la menos a la más activa, las que no tienen conexiones abiertas.
+        """
+        excess = len(self.active_games) - self.max_resident_games
+        if excess <= 0:
+            return
+        
+        from app.websocket.connection_manager import connection_manager
+        finished = [game_id for game_id, state in self.active_games.items() if state.finished_at is not None]
+        unconnected = [
+            game_id for game_id, state in self.active_games.items()
+            if state.finished_at is None and game_id != keep and not connection_manager.get_game_connections(game_id)
+        ]
+        for game_id in (finished + unconnected)[:excess]:
+            await self.remove_game_state(game_id, reason="capacity")
+        
+        if len(self.active_games) > self.max_resident_games:
+            # El resto son partidas en curso con jugadores conectados: no se interrumpen
+            self.capacity_exceeded_total += 1
+            logger.warning(
+                f"Límite de partidas en memoria superado ({len(self.active_games)}/{self.max_resident_games}): "
+                "las restantes tienen jugadores conectados y no se desalojan"
+            )
+    
+    async def _evict_idle(self):
+        """Desalojar desde el principio de la cola mientras la partida esté inactiva"""
+        deadline = time.monotonic() - self.idle_ttl_seconds
+        while self.active_games:
+            oldest_id, oldest = next(iter(self.active_games.items()))
+            if oldest.last_activity > deadline:
+                break
+            await self.remove_game_state(oldest_id, reason="idle")
+    
+    @staticmethod
+    def _eviction_key(game_id: str) -> str:
+        return f"evict:{game_id}"
+    
     async def _cleanup_loop(self):
         """Loop de limpieza para juegos inactivos"""
         while True:
             try:
-                await asyncio.sleep(300)  # Verificar cada 5 minutos
-                
-                current_time = datetime.now()
-                inactive_games = []
-                
-                for game_id, game_state in self.active_games.items():
-                    # Verificar si el juego está inactivo
-                    if (not game_state.connected_players and 
-                        current_time - game_state.phase_start_time > timedelta(hours=2)):
-                        inactive_games.append(game_id)
-                
-                # Remover juegos inactivos
-                for game_id in inactive_games:
-                    await self.remove_game_state(game_id)
+                await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+                await self._evict_idle()
+                await self._enforce_capacity()
                     
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"Error en cleanup loop: {e}")
+                logger.error(f"Error en cleanup loop: {e}")
 
 # Instancia global del game state manager
 game_state_manager = GameStateManager()
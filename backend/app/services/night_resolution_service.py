@@ -0,0 +1,150 @@
+"""
+Night Resolution Service
+Resolución pura de la fase nocturna: recibe una partida y sus acciones nocturnas y
+devuelve la nueva partida junto con la lista de eventos, sin acceso a base de datos.
+
+El controlador de flujo carga la partida una vez, la resuelve en memoria y la guarda
+una sola vez, en lugar de encadenar helpers que cargan y guardan por separado.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.models.game_and_roles import Game, GameStatus, GameRole
+from app.services.death_cascade_service import resolve_death_cascade
+from app.services.game_index_service import GameIndex, get_winner_ids
+
+
+@dataclass
+class NightResolution:
+    """Resultado de resolver una noche"""
+    game: Game
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    deaths: List[str] = field(default_factory=list)
+    transformations: List[Dict[str, Any]] = field(default_factory=list)
+    notifications: List[Dict[str, Any]] = field(default_factory=list)
+    victory: Optional[Dict[str, Any]] = None
+
+
+def get_werewolf_consensus(game: Game, night_actions: Dict[str, Dict[str, str]]) -> Optional[str]:
+    """
+    Objetivo de los hombres lobo si todos los vivos han votado y hay mayoría clara.
+    Misma regla que player_action_service.get_warewolf_attack_consensus, sin cargar la partida.
+    """
+    attack_votes = night_actions.get("warewolf_attacks")
+    if not attack_votes:
+        return None
+
+    werewolves = [
+        player_id for player_id, role_info in game.roles.items()
+        if role_info.role == GameRole.WAREWOLF and role_info.is_alive
+    ]
+
+    # Todos los hombres lobo vivos deben haber votado
+    if any(ww_id not in attack_votes for ww_id in werewolves):
+        return None
+
+    vote_counts: Dict[str, int] = {}
+    for ww_id in werewolves:
+        target_id = attack_votes[ww_id]
+        vote_counts[target_id] = vote_counts.get(target_id, 0) + 1
+
+    if not vote_counts:
+        return None
+
+    max_votes = max(vote_counts.values())
+    targets_with_max_votes = [target for target, votes in vote_counts.items() if votes == max_votes]
+
+    # Si hay empate, no hay consenso
+    if len(targets_with_max_votes) > 1:
+        return None
+
+    return targets_with_max_votes[0]
+
+
+def check_victory(game: Game, index: Optional[GameIndex] = None) -> Optional[Dict[str, Any]]:
+    """
+    Comprobar las condiciones de victoria con los contadores del índice (O(1)).
+    Devuelve {"victory_type", "winner_ids"} o None si la partida continúa; los
+    ganadores solo se calculan cuando la partida termina.
+    """
+    index = index or GameIndex.from_game(game)
+    victory_type = index.get_victory_type()
+    if not victory_type:
+        return None
+    return {"victory_type": victory_type, "winner_ids": get_winner_ids(game, victory_type)}
+
+
+def resolve_night(
+    game: Game,
+    night_actions: Optional[Dict[str, Dict[str, str]]] = None,
+    index: Optional[GameIndex] = None
+) -> NightResolution:
+    """
+    Resolver una noche completa en una sola pasada y sin I/O.
+
+    Args:
+        game: Partida en fase nocturna (no se modifica)
+        night_actions: Acciones nocturnas enviadas; por defecto las de la partida
+        index: Índice de la partida, que se mantiene en sitio con las muertes (opcional)
+
+    Returns:
+        NightResolution con la nueva partida (en DAY o FINISHED) y los eventos ordenados
+    """
+    new_game = game.model_copy(deep=True)
+    actions = night_actions if night_actions is not None else new_game.night_actions
+    resolution = NightResolution(game=new_game)
+    index = index or GameIndex.from_game(new_game)
+
+    # 1. Ataque de los hombres lobo
+    victim_id = get_werewolf_consensus(new_game, actions)
+    if victim_id:
+        resolution.events.append({"type": "werewolf_attack", "victim": victim_id})
+
+    # 2. Acciones de la bruja
+    healed = list(actions.get("witch_heal", {}).values())
+    poisoned = list(actions.get("witch_poison", {}).values())
+    if healed:
+        resolution.events.append({"type": "witch_healing", "healed": healed})
+    if poisoned:
+        resolution.events.append({"type": "witch_poison", "poisoned": poisoned})
+
+    # 3. Muertes de la noche (víctima no curada y envenenados) y sus consecuencias encadenadas
+    night_deaths = []
+    if victim_id and victim_id not in healed and victim_id in new_game.roles:
+        night_deaths.append((victim_id, "werewolf_attack"))
+    night_deaths.extend((target_id, "witch_poison") for target_id in poisoned if target_id in new_game.roles)
+
+    cascade = resolve_death_cascade(new_game, night_deaths, index=index)
+    resolution.events.extend(cascade.events)
+    resolution.deaths.extend(cascade.deaths)
+    resolution.transformations.extend(cascade.transformations)
+    resolution.notifications.extend(cascade.notifications)
+
+    # 4. Victoria o paso a la fase diurna
+    resolution.victory = check_victory(new_game, index)
+    if resolution.victory:
+        new_game.status = GameStatus.FINISHED
+    else:
+        new_game.status = GameStatus.DAY
+        new_game.day_votes = {}
+
+    return resolution
+
+
+def start_night(game: Game) -> Game:
+    """
+    Preparar en memoria la siguiente noche: avanzar ronda y reiniciar las acciones
+    nocturnas de todos los roles (sustituye a los reseteos por rol con su propia carga).
+    """
+    new_game = game.model_copy(deep=True)
+    new_game.status = GameStatus.NIGHT
+    new_game.current_round += 1
+
+    for role_info in new_game.roles.values():
+        role_info.has_acted_tonight = False
+        role_info.target_player_id = None
+        if role_info.role == GameRole.SEER and role_info.is_alive:
+            role_info.has_used_vision_tonight = False
+
+    new_game.night_actions = {}
+    return new_game
@@ -0,0 +1,134 @@
+"""
+Password Hashing Service
+Ejecuta el hash y la verificación de contraseñas (bcrypt, ~250 ms de CPU cada uno) en un
+pool de hilos propio y acotado, fuera del threadpool de Starlette: una avalancha de logins
+no puede ocupar los hilos que atienden al resto de endpoints.
+
+bcrypt libera el GIL, así que los hilos del pool trabajan en paralelo. Si ya hay más
+trabajos en curso que hilos más la cola permitida, la petición se rechaza al instante con
+PasswordHashingBusy (503 + Retry-After en las rutas) en lugar de esperar sin límite.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import math
+import os
+import time
+
+from fastapi import HTTPException, status
+
+from app.core.security import hash_password, password_needs_rehash, verify_password
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+
+class PasswordHashingBusy(Exception):
+    """El pool de contraseñas está saturado; reintentar pasados retry_after segundos"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Servicio de contraseñas saturado, reintentar en {retry_after}s")
+        self.retry_after = retry_after
+
+
+def busy_http_exception(e: PasswordHashingBusy) -> HTTPException:
+    """Respuesta 503 + Retry-After común a las rutas que usan el pool de contraseñas"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, inténtalo de nuevo en unos segundos",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+class PasswordHashingService:
+    """Pool acotado con control de admisión para el trabajo de bcrypt"""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Solo se modifica desde el loop (las rutas que lo usan son async): no necesita lock
+        self._in_flight = 0
+
+        # Métricas
+        self.completed_total = 0
+        self.rejected_total = 0
+        self.rehashed_total = 0
+        self.avg_ms = 250.0  # Media móvil del tiempo por operación (estimación inicial de bcrypt)
+        self.max_in_flight = 0
+
+    async def hash_password(self, password: str) -> str:
+        """Hash de una contraseña con el coste configurado"""
+        return await self._run(hash_password, password)
+
+    async def verify_password(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verificar una contraseña y, si el hash usa otro coste, calcular uno nuevo en el mismo trabajo.
+
+        Returns:
+            (válida, nuevo hash o None si no hay que actualizarlo)
+        """
+        return await self._run(self._verify_and_rehash, password, hashed_password)
+
+    def shutdown(self):
+        """Liberar los hilos del pool (al apagar la aplicación)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "completed_total": self.completed_total,
+            "rejected_total": self.rejected_total,
+            "rehashed_total": self.rehashed_total,
+            "avg_ms": round(self.avg_ms, 1)
+        }
+
+    # --- Internos ---
+
+    def _verify_and_rehash(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        if not verify_password(password, hashed_password):
+            return False, None
+        if password_needs_rehash(hashed_password):
+            self.rehashed_total += 1
+            return True, hash_password(password)
+        return True, None
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        """Admitir el trabajo si cabe en el pool más la cola y ejecutarlo fuera del loop"""
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected_total += 1
+            raise PasswordHashingBusy(self._retry_after())
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            result, elapsed_ms = await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, fn, args)
+        finally:
+            self._in_flight -= 1
+        self.completed_total += 1
+        self.avg_ms = 0.9 * self.avg_ms + 0.1 * elapsed_ms
+        return result
+
+    @staticmethod
+    def _timed(fn: Callable, args: tuple) -> Tuple[Any, float]:
+        """Ejecutar en el pool midiendo solo el trabajo (sin la espera en cola)"""
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, (time.perf_counter() - started) * 1000
+
+    def _retry_after(self) -> int:
+        """Segundos estimados hasta que se vacíe la cola actual"""
+        batches = math.ceil(self._in_flight / self.workers)
+        return max(1, math.ceil(batches * self.avg_ms / 1000))
+
+
+# Instancia global del pool de contraseñas
+password_hashing_service = PasswordHashingService()
@@ -0,0 +1,202 @@
+"""
+Pending Actions Service
+Seguimiento incremental de las acciones pendientes de cada partida en la fase actual.
+
+El conjunto de acciones pendientes se construye una sola vez al entrar en la fase
+(a partir de una única carga de la partida) y se va reduciendo a medida que llegan
+las acciones. Cuando llega a cero se notifica a los callbacks registrados para que
+la fase pueda avanzar inmediatamente sin esperar al temporizador.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import logging
+import threading
+
+from app.models.game_and_roles import Game, GameStatus, GameRole
+
+logger = logging.getLogger(__name__)
+
+# Etiquetas de fase del seguimiento: estados de la partida en BD y sesión de votación WS
+PHASE_NIGHT = GameStatus.NIGHT.value
+PHASE_DAY = GameStatus.DAY.value
+PHASE_VOTING = "voting"
+
+PendingKey = Tuple[str, str]  # (player_id, action)
+
+
+@dataclass
+class PhasePendingActions:
+    """Acciones pendientes de una partida en una fase concreta"""
+    game_id: str
+    phase: str
+    round: int
+    pending: Set[PendingKey] = field(default_factory=set)
+    completed: bool = False  # Ya se notificó que la fase quedó sin pendientes
+
+    def to_list(self) -> List[Dict[str, str]]:
+        return [{"player_id": player_id, "action": action} for player_id, action in sorted(self.pending)]
+
+
+def compute_pending_actions(game: Game) -> Set[PendingKey]:
+    """
+    Calcular las acciones pendientes de una partida a partir de su estado en memoria.
+    No realiza ninguna carga adicional de la partida.
+    """
+    pending: Set[PendingKey] = set()
+    night_actions = game.night_actions or {}
+
+    if game.status == GameStatus.NIGHT:
+        werewolf_attacks = night_actions.get("warewolf_attacks", {})
+        witch_heal = night_actions.get("witch_heal", {})
+        witch_poison = night_actions.get("witch_poison", {})
+        cupid_lovers = night_actions.get("cupid_lovers", {})
+
+        for player_id, role_info in game.roles.items():
+            if not role_info.is_alive:
+                continue
+
+            # Hombres lobo
+            if role_info.role == GameRole.WAREWOLF:
+                if player_id not in werewolf_attacks:
+                    pending.add((player_id, "werewolf_attack"))
+
+            # Vidente
+            elif role_info.role == GameRole.SEER:
+                if not role_info.has_used_vision_tonight:
+                    pending.add((player_id, "seer_vision"))
+
+            # Bruja: una acción por noche completa su turno
+            elif role_info.role == GameRole.WITCH:
+                has_potions = role_info.has_healing_potion or role_info.has_poison_potion
+                has_acted = player_id in witch_heal or player_id in witch_poison
+                if has_potions and not has_acted:
+                    pending.add((player_id, "witch_actions"))
+
+            # Cupido (solo primera noche)
+            elif role_info.role == GameRole.CUPID and game.current_round == 1:
+                if player_id not in cupid_lovers:
+                    pending.add((player_id, "cupid_lovers"))
+
+            # Niño Salvaje (solo primera noche)
+            elif role_info.role == GameRole.WILD_CHILD and game.current_round <= 1:
+                if not role_info.model_player_id:
+                    pending.add((player_id, "wild_child_model"))
+
+    elif game.status == GameStatus.DAY:
+        # Votos diurnos pendientes: los votos viven en el motor de votaciones, no en game.day_votes
+        # (import local: voting_service depende de este módulo)
+        from app.services.voting_service import VoteType, voting_service
+        day_votes = voting_service.get_votes(game.id, VoteType.DAY_VOTE)
+        for player_id, role_info in game.roles.items():
+            if role_info.is_alive and player_id not in day_votes:
+                pending.add((player_id, "day_vote"))
+
+    return pending
+
+
+class PendingActionsService:
+    """Registro en memoria de acciones pendientes por (partida, fase)"""
+
+    def __init__(self):
+        self._trackers: Dict[Tuple[str, str], PhasePendingActions] = {}
+        self._completion_callbacks: List[Callable[[str, str], None]] = []
+        # Las rutas síncronas se ejecutan en el threadpool: proteger el registro
+        self._lock = threading.Lock()
+
+    def add_completion_callback(self, callback: Callable[[str, str], None]):
+        """Registrar un callback(game_id, phase) que se invoca cuando no quedan pendientes"""
+        self._completion_callbacks.append(callback)
+
+    def start_phase(self, game: Game) -> PhasePendingActions:
+        """Inicializar el seguimiento para la fase actual de la partida"""
+        phase = game.status.value
+        tracker = PhasePendingActions(
+            game_id=game.id,
+            phase=phase,
+            round=game.current_round,
+            pending=compute_pending_actions(game)
+        )
+        with self._lock:
+            # Al cambiar de estado se descartan los seguimientos de estados anteriores
+            for key in [k for k in self._trackers if k[0] == game.id and k[1] != PHASE_VOTING]:
+                del self._trackers[key]
+            self._trackers[(game.id, phase)] = tracker
+        return tracker
+
+    def start_custom_phase(self, game_id: str, phase: str, round: int,
+                           pending: Set[PendingKey]) -> PhasePendingActions:
+        """Inicializar el seguimiento de una fase que no depende del estado en BD (p.ej. votación WS)"""
+        tracker = PhasePendingActions(game_id=game_id, phase=phase, round=round, pending=set(pending))
+        with self._lock:
+            self._trackers[(game_id, phase)] = tracker
+        return tracker
+
+    def sync(self, game: Game) -> PhasePendingActions:
+        """Obtener el seguimiento de la fase actual, reconstruyéndolo si no coincide con la partida"""
+        with self._lock:
+            tracker = self._trackers.get((game.id, game.status.value))
+        if tracker is None or tracker.round != game.current_round:
+            tracker = self.start_phase(game)
+        return tracker
+
+    def record_action(self, game: Game, player_id: str, action: str) -> int:
+        """
+        Registrar una acción ya persistida sobre la partida en memoria.
+        Devuelve el número de acciones pendientes restantes.
+        """
+        tracker = self.sync(game)
+        return self._mark_done(tracker, player_id, action)
+
+    def mark_done(self, game_id: str, phase: str, player_id: str, action: str) -> Optional[int]:
+        """Marcar una acción como completada en un seguimiento ya existente"""
+        with self._lock:
+            tracker = self._trackers.get((game_id, phase))
+        if tracker is None:
+            return None
+        return self._mark_done(tracker, player_id, action)
+
+    def remove_player(self, game_id: str, player_id: str):
+        """Eliminar las acciones pendientes de un jugador (p.ej. al morir o abandonar)"""
+        with self._lock:
+            trackers = [t for (gid, _), t in self._trackers.items() if gid == game_id]
+        for tracker in trackers:
+            for key in [k for k in tracker.pending if k[0] == player_id]:
+                self._mark_done(tracker, *key)
+
+    def get_pending(self, game_id: str, phase: str) -> Optional[List[Dict[str, str]]]:
+        """Obtener la lista de acciones pendientes sin tocar la base de datos"""
+        with self._lock:
+            tracker = self._trackers.get((game_id, phase))
+            return tracker.to_list() if tracker else None
+
+    def clear_phase(self, game_id: str, phase: str):
+        """Descartar el seguimiento de una fase concreta"""
+        with self._lock:
+            self._trackers.pop((game_id, phase), None)
+
+    def clear_game(self, game_id: str):
+        """Descartar todos los seguimientos de una partida"""
+        with self._lock:
+            for key in [k for k in self._trackers if k[0] == game_id]:
+                del self._trackers[key]
+
+    def _mark_done(self, tracker: PhasePendingActions, player_id: str, action: str) -> int:
+        with self._lock:
+            tracker.pending.discard((player_id, action))
+            remaining = len(tracker.pending)
+            notify = remaining == 0 and not tracker.completed
+            if notify:
+                tracker.completed = True
+
+        if notify:
+            logger.info(f"Partida {tracker.game_id}: sin acciones pendientes en fase {tracker.phase}")
+            for callback in self._completion_callbacks:
+                try:
+                    callback(tracker.game_id, tracker.phase)
+                except Exception as e:
+                    logger.error(f"Error en callback de acciones completadas: {e}")
+        return remaining
+
+
+# Instancia global del seguimiento de acciones pendientes
+pending_actions_service = PendingActionsService()
@@ -0,0 +1,326 @@
+"""
+Phase Scheduler Service
+Planificador central de temporizadores de fase basado en un min-heap de deadlines.
+
+En lugar de que cada partida mantenga su propia tarea asyncio dormida, todos los
+GamePhaseController registran sus deadlines aquí y una única tarea se despierta
+cuando vence el siguiente, agrupando los vencimientos que caen en el mismo tick.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledTimer:
+    """Entrada del heap: un deadline monotónico asociado a una clave"""
+    key: str
+    deadline: float  # time.monotonic()
+    callback: Callable[[], Any]
+    seq: int = 0  # Desempate estable para deadlines idénticos
+    index: int = field(default=-1, repr=False)  # Posición actual dentro del heap
+
+    def sort_key(self) -> tuple[float, int]:
+        return (self.deadline, self.seq)
+
+
+class PhaseTimerScheduler:
+    """
+    Planificador único de timers con heap indexado.
+
+    - schedule/reschedule/cancel en O(log n) gracias al índice key -> entrada.
+    - Los timers cuyo deadline cae dentro de la misma ventana de `tick_resolution`
+      se disparan en un único despertar.
+    - Expone métricas de profundidad de cola y de lotes procesados.
+    """
+
+    def __init__(self, tick_resolution: float = 0.05):
+        self.tick_resolution = tick_resolution
+        self._heap: List[ScheduledTimer] = []
+        self._entries: Dict[str, ScheduledTimer] = {}
+        self._seq = 0
+
+        # Tarea única de despacho y evento para despertarla si cambia el mínimo
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._inflight: Set[asyncio.Task] = set()
+        # Peticiones de otros hilos recibidas antes de conocer el loop (se programan en start())
+        self._deferred: List[tuple[str, float, Callable[[], Any]]] = []
+        self._deferred_calls: List[tuple[str, Callable[[], Any]]] = []
+        self._threadsafe_lock = threading.Lock()
+
+        # Métricas
+        self.scheduled_total = 0
+        self.cancelled_total = 0
+        self.fired_total = 0
+        self.batches_total = 0
+        self.max_batch_size = 0
+        self.last_lag_ms = 0.0
+
+    # --- API pública ---
+
+    def schedule(self, key: str, delay_seconds: float, callback: Callable[[], Any]) -> ScheduledTimer:
+        """Programar (o reprogramar) el timer de una clave para dentro de `delay_seconds`"""
+        return self.schedule_at(key, time.monotonic() + max(0.0, delay_seconds), callback)
+
+    def schedule_at(self, key: str, deadline: float, callback: Callable[[], Any]) -> ScheduledTimer:
+        """Programar el timer de una clave en un deadline monotónico absoluto"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            # Reprogramación: actualizar en sitio y recolocar en el heap
+            entry.deadline = deadline
+            entry.callback = callback
+            entry.seq = self._next_seq()
+            self._sift_up(entry.index)
+            self._sift_down(entry.index)
+        else:
+            entry = ScheduledTimer(key=key, deadline=deadline, callback=callback, seq=self._next_seq())
+            entry.index = len(self._heap)
+            self._heap.append(entry)
+            self._entries[key] = entry
+            self._sift_up(entry.index)
+
+        self.scheduled_total += 1
+        self._ensure_runner()
+
+        # Si este timer pasó a ser el más próximo, despertar al despachador
+        if self._heap and self._heap[0] is entry:
+            self._wakeup.set()
+        return entry
+
+    def schedule_threadsafe(self, key: str, delay_seconds: float, callback: Callable[[], Any]):
+        """
+        Programar desde cualquier hilo (p.ej. rutas síncronas ejecutadas en el threadpool).
+
+        Fuera del hilo del loop nunca se toca el heap: la petición se delega al loop capturado
+        en start(), o se guarda hasta que start() lo capture.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is not None and (self._loop is None or running is self._loop):
+            self.schedule(key, delay_seconds, callback)
+            return
+
+        with self._threadsafe_lock:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                self._deferred.append((key, time.monotonic() + max(0.0, delay_seconds), callback))
+                return
+        loop.call_soon_threadsafe(self.schedule, key, delay_seconds, callback)
+
+    def call_soon_threadsafe(self, name: str, callback: Callable[[], Any]):
+        """
+        Ejecutar un callback (síncrono o corrutina) en el loop lo antes posible, desde cualquier
+        hilo, sin pasar por el heap de timers (p.ej. notificaciones de votos desde rutas REST).
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is not None and (self._loop is None or running is self._loop):
+            self._spawn(name, callback)
+            return
+
+        with self._threadsafe_lock:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                self._deferred_calls.append((name, callback))
+                return
+        loop.call_soon_threadsafe(self._spawn, name, callback)
+
+    def cancel(self, key: str) -> bool:
+        """Cancelar el timer de una clave. Devuelve True si existía"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._remove_at(entry.index)
+        self.cancelled_total += 1
+        return True
+
+    def has_timer(self, key: str) -> bool:
+        """Verificar si una clave tiene un timer pendiente"""
+        return key in self._entries
+
+    def get_deadline(self, key: str) -> Optional[float]:
+        """Obtener el deadline monotónico pendiente de una clave"""
+        entry = self._entries.get(key)
+        return entry.deadline if entry else None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Obtener métricas del planificador"""
+        next_in = None
+        if self._heap:
+            next_in = max(0.0, self._heap[0].deadline - time.monotonic())
+        return {
+            "queue_depth": len(self._heap),
+            "inflight_callbacks": len(self._inflight),
+            "next_deadline_in": next_in,
+            "scheduled_total": self.scheduled_total,
+            "cancelled_total": self.cancelled_total,
+            "fired_total": self.fired_total,
+            "batches_total": self.batches_total,
+            "max_batch_size": self.max_batch_size,
+            "last_lag_ms": round(self.last_lag_ms, 3),
+        }
+
+    def start(self):
+        """Capturar el loop de la aplicación y arrancar el despachador (desde el arranque de la app)"""
+        self._ensure_runner()
+        with self._threadsafe_lock:
+            deferred, self._deferred = self._deferred, []
+            deferred_calls, self._deferred_calls = self._deferred_calls, []
+        for key, deadline, callback in deferred:
+            self.schedule_at(key, deadline, callback)
+        for name, callback in deferred_calls:
+            self._spawn(name, callback)
+
+    async def stop(self):
+        """Detener el despachador (los timers pendientes se conservan)"""
+        if self._runner_task:
+            self._runner_task.cancel()
+            try:
+                await self._runner_task
+            except asyncio.CancelledError:
+                pass
+            self._runner_task = None
+
+    # --- Despacho ---
+
+    def _ensure_runner(self):
+        """Arrancar la tarea de despacho si no está activa"""
+        if self._runner_task and not self._runner_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin loop activo (p.ej. registro en import); se arrancará en el próximo schedule
+            return
+        with self._threadsafe_lock:
+            self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._runner_task = loop.create_task(self._run())
+
+    async def _run(self):
+        """Loop único: dormir hasta el deadline más próximo y disparar el lote vencido"""
+        while True:
+            try:
+                self._wakeup.clear()
+                if not self._heap:
+                    await self._wakeup.wait()
+                    continue
+
+                delay = self._heap[0].deadline - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                        continue  # Cambió el mínimo: recalcular
+                    except asyncio.TimeoutError:
+                        pass
+
+                self._fire_due()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error en el planificador de fases: {e}")
+
+    def _fire_due(self):
+        """Extraer y lanzar todos los timers que vencen dentro del tick actual"""
+        now = time.monotonic()
+        horizon = now + self.tick_resolution
+        batch: List[ScheduledTimer] = []
+
+        while self._heap and self._heap[0].deadline <= horizon:
+            entry = self._heap[0]
+            self._remove_at(0)
+            del self._entries[entry.key]
+            batch.append(entry)
+
+        if not batch:
+            return
+
+        self.last_lag_ms = max(0.0, now - batch[0].deadline) * 1000
+        self.batches_total += 1
+        self.fired_total += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+
+        for entry in batch:
+            self._spawn(entry.key, entry.callback)
+
+    def _spawn(self, name: str, callback: Callable[[], Any]):
+        """Lanzar un callback como tarea del loop actual, conservando la referencia hasta que termine"""
+        task = asyncio.get_running_loop().create_task(self._invoke(name, callback))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _invoke(self, name: str, callback: Callable[[], Any]):
+        """Ejecutar un callback aislando sus errores"""
+        try:
+            result = callback()
+            if asyncio.iscoroutine(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error en timer programado {name}: {e}")
+
+    # --- Heap indexado ---
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        heap[i].index = i
+        heap[j].index = j
+
+    def _sift_up(self, i: int):
+        heap = self._heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[i].sort_key() < heap[parent].sort_key():
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i: int):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = i
+            left, right = 2 * i + 1, 2 * i + 2
+            if left < size and heap[left].sort_key() < heap[smallest].sort_key():
+                smallest = left
+            if right < size and heap[right].sort_key() < heap[smallest].sort_key():
+                smallest = right
+            if smallest == i:
+                break
+            self._swap(i, smallest)
+            i = smallest
+
+    def _remove_at(self, i: int):
+        heap = self._heap
+        last = len(heap) - 1
+        if i != last:
+            self._swap(i, last)
+        removed = heap.pop()
+        removed.index = -1
+        if i < len(heap):
+            self._sift_up(i)
+            self._sift_down(i)
+
+
+# Instancia global del planificador de fases
+phase_scheduler = PhaseTimerScheduler()
@@ -6,9 +6,19 @@ Incluye funciones para que los jugadores realicen sus acciones nocturnas especí
 from app.database import save_game, load_game
 from app.models.game_and_roles import Game, GameStatus, GameRole
 from app.services.user_service import UserService
+from app.services.pending_actions_service import pending_actions_service
+from app.services.death_cascade_service import resolve_death_cascade
+from app.services.game_index_service import game_index_service
+from app.services.eligible_targets_service import eligible_targets_service
+from app.services.vote_tally_service import VoteTally, day_vote_tally_service
+from app.services.voting_service import VoteType, VotingSession, voting_service
+from app.services.werewolf_consensus_service import werewolf_consensus_service
+from app.services.day_resolution_service import get_vote_weight
+from app.services.game_actor_service import game_mutation
 from typing import Optional, List, Dict, Any
 
 
+@game_mutation
 def warewolf_attack(game_id: str, attacker_id: str, target_id: str) -> Optional[Game]:
     """
     Permite a un hombre lobo seleccionar a un aldeano para devorar durante la fase nocturna.
@@ -57,6 +67,10 @@ def warewolf_attack(game_id: str, attacker_id: str, target_id: str) -> Optional[
     if attacker_role.has_acted_tonight:
         return None
     
+    # Recuento vivo del ataque, para detectar el momento en que se forma el consenso
+    consensus = werewolf_consensus_service.begin_attack(game)
+    previous_target = consensus.target
+    
     # Registrar la acción del hombre lobo
     game.roles[attacker_id].has_acted_tonight = True
     game.roles[attacker_id].target_player_id = target_id
@@ -66,8 +80,11 @@ def warewolf_attack(game_id: str, attacker_id: str, target_id: str) -> Optional[
         game.night_actions['warewolf_attacks'] = {}
     
     game.night_actions['warewolf_attacks'][attacker_id] = target_id
+    consensus.cast(attacker_id, target_id)
     
     save_game(game)
+    werewolf_consensus_service.commit_attack(game_id, consensus, previous_target)
+    pending_actions_service.record_action(game, attacker_id, "werewolf_attack")
     return game
 
 
@@ -81,45 +98,8 @@ def get_warewolf_attack_consensus(game_id: str) -> Optional[str]:
     Returns:
         ID del jugador objetivo si hay consenso, None en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
-        return None
-    
-    if 'warewolf_attacks' not in game.night_actions:
-        return None
-    
-    # Obtener todos los hombres lobo vivos
-    warewolves = [
-        player_id for player_id, role_info in game.roles.items()
-        if role_info.role == GameRole.WAREWOLF and role_info.is_alive
-    ]
-    
-    # Obtener votos de ataque
-    attack_votes = game.night_actions['warewolf_attacks']
-    
-    # Verificar si todos los hombres lobo han votado
-    warewolf_votes = {ww_id: attack_votes.get(ww_id) for ww_id in warewolves if ww_id in attack_votes}
-    
-    if len(warewolf_votes) != len(warewolves):
-        return None  # No todos han votado aún
-    
-    # Contar votos por objetivo
-    vote_counts = {}
-    for target_id in warewolf_votes.values():
-        vote_counts[target_id] = vote_counts.get(target_id, 0) + 1
-    
-    # Encontrar el objetivo con más votos
-    if not vote_counts:
-        return None
-    
-    max_votes = max(vote_counts.values())
-    targets_with_max_votes = [target for target, votes in vote_counts.items() if votes == max_votes]
-    
-    # Si hay empate, no hay consenso (podrían implementarse reglas de desempate)
-    if len(targets_with_max_votes) > 1:
-        return None
-    
-    return targets_with_max_votes[0]
+    # Recuento vivo: todos los lobos vivos han votado y hay un único objetivo con más votos
+    return werewolf_consensus_service.get_consensus(game_id)
 
 
 def get_alive_players(game_id: str) -> List[Dict[str, str]]:
@@ -185,34 +165,27 @@ def can_warewolf_act(game_id: str, player_id: str) -> bool:
     Returns:
         True si puede actuar, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # Verificar que la partida esté en fase nocturna
-    if game.status != GameStatus.NIGHT:
+    if index.status != GameStatus.NIGHT:
         return False
     
-    # Verificar que el jugador existe y está vivo
-    if player_id not in game.roles:
-        return False
-    
-    player_role = game.roles[player_id]
-    if not player_role.is_alive:
-        return False
-    
-    # Verificar que es un hombre lobo
-    if player_role.role != GameRole.WAREWOLF:
+    # Verificar que es un hombre lobo vivo
+    if not index.is_alive_with_role(player_id, GameRole.WAREWOLF):
         return False
     
     # Verificar que no ha actuado esta noche
-    if player_role.has_acted_tonight:
+    if index.get_player(player_id).has_acted_tonight:
         return False
     
     return True
 
 
-def day_vote(game_id: str, voter_id: str, target_id: str) -> Optional[Game]:
+@game_mutation
+def day_vote(game_id: str, voter_id: str, target_id: str) -> Optional[VotingSession]:
     """
     Permite a un jugador vivo votar para eliminar a otro jugador durante la fase diurna.
     
@@ -222,41 +195,44 @@ def day_vote(game_id: str, voter_id: str, target_id: str) -> Optional[Game]:
         target_id: ID del jugador objetivo a eliminar
     
     Returns:
-        Game actualizado si la acción fue exitosa, None en caso contrario
+        Sesión de votación diurna con el voto ya aplicado (el motor de votaciones lo
+        persiste por lotes; la partida no se escribe) si la acción fue exitosa, None en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return None
     
     # Verificar que la partida esté en fase diurna
-    if game.status != GameStatus.DAY:
+    if index.status != GameStatus.DAY:
         return None
     
-    # Verificar que el votante existe y está vivo
-    if voter_id not in game.roles:
-        return None
-    
-    voter_role = game.roles[voter_id]
-    if not voter_role.is_alive:
-        return None
-    
-    # Verificar que el objetivo existe y está vivo
-    if target_id not in game.roles:
-        return None
-    
-    target_role = game.roles[target_id]
-    if not target_role.is_alive:
+    # Verificar que el votante y el objetivo están vivos
+    if not index.is_alive(voter_id) or not index.is_alive(target_id):
         return None
     
     # No se puede votar por uno mismo
     if voter_id == target_id:
         return None
     
-    # Registrar el voto (sobrescribir si ya había votado)
-    game.day_votes[voter_id] = target_id
+    # Registrar el voto en la sesión diurna del motor de votaciones (sobrescribe si ya había votado)
+    alive_players = index.get_alive_players()
+    session = voting_service.ensure_active_session(game_id, VoteType.DAY_VOTE, alive_players, alive_players)
+    success, _ = voting_service.cast_vote_sync(
+        game_id, voter_id, target_id, get_vote_weight(index.game, voter_id), VoteType.DAY_VOTE
+    )
+    if not success:
+        return None
     
-    save_game(game)
-    return game
+    pending_actions_service.record_action(index.game, voter_id, "day_vote")
+    return session
+
+
+def _get_day_tally(game_id: str) -> Optional[VoteTally]:
+    """Recuento diurno vigente: el de la sesión del motor de votaciones o, si no hay, el de game.day_votes"""
+    session = voting_service.get_voting_session(game_id, VoteType.DAY_VOTE)
+    if session:
+        return session.tally
+    return day_vote_tally_service.get_by_id(game_id)
 
 
 def get_day_vote_counts(game_id: str) -> List[Dict[str, Any]]:
@@ -269,25 +245,15 @@ def get_day_vote_counts(game_id: str) -> List[Dict[str, Any]]:
     Returns:
         Lista con el recuento de votos por jugador
     """
-    game = load_game(game_id)
-    if not game:
+    tally = _get_day_tally(game_id)
+    if tally is None:
         return []
     
-    # Contar votos por objetivo
-    vote_counts = {}
-    for target_id in game.day_votes.values():
-        vote_counts[target_id] = vote_counts.get(target_id, 0) + 1
-    
-    # Crear lista con información de jugadores y sus votos
-    vote_results = []
-    for player in game.players:
-        if player in game.roles and game.roles[player].is_alive:
-            count = vote_counts.get(player, 0)
-            vote_results.append({
-                "player_id": player,
-                "username": UserService.get_username_by_id(player),
-                "vote_count": count
-            })
+    # Jugadores vivos (con nombres cacheados) y sus votos ponderados
+    vote_results = [
+        {"player_id": target["id"], "username": target["username"], "vote_count": tally.counts.get(target["id"], 0)}
+        for target in eligible_targets_service.get_targets(game_id)
+    ]
     
     # Ordenar por número de votos (descendente)
     vote_results.sort(key=lambda x: x["vote_count"], reverse=True)
@@ -306,23 +272,12 @@ def can_player_vote(game_id: str, player_id: str) -> bool:
     Returns:
         True si puede votar, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
-        return False
-    
-    # Verificar que la partida esté en fase diurna
-    if game.status != GameStatus.DAY:
-        return False
-    
-    # Verificar que el jugador existe y está vivo
-    if player_id not in game.roles:
-        return False
-    
-    player_role = game.roles[player_id]
-    if not player_role.is_alive:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    return True
+    # Verificar que la partida esté en fase diurna y que el jugador está vivo
+    return index.status == GameStatus.DAY and index.is_alive(player_id)
 
 
 def get_voting_eligible_players(game_id: str) -> List[Dict[str, str]]:
@@ -335,19 +290,7 @@ def get_voting_eligible_players(game_id: str) -> List[Dict[str, str]]:
     Returns:
         Lista de diccionarios con id y nombre de jugadores vivos
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    eligible_players = []
-    for player in game.players:
-        if player in game.roles and game.roles[player].is_alive:
-            eligible_players.append({
-                "id": player,
-                "username": UserService.get_username_by_id(player) 
-            })
-    
-    return eligible_players
+    return eligible_targets_service.get_targets(game_id)
 
 
 def get_player_vote(game_id: str, player_id: str) -> Optional[str]:
@@ -361,13 +304,14 @@ def get_player_vote(game_id: str, player_id: str) -> Optional[str]:
     Returns:
         ID del jugador votado o None si no ha votado
     """
-    game = load_game(game_id)
-    if not game:
+    tally = _get_day_tally(game_id)
+    if tally is None:
         return None
     
-    return game.day_votes.get(player_id)
+    return tally.get_target(player_id)
 
 
+@game_mutation
 def reset_day_votes(game_id: str) -> Optional[Game]:
     """
     Reinicia los votos diurnos para una nueva fase de votación.
@@ -385,6 +329,32 @@ def reset_day_votes(game_id: str) -> Optional[Game]:
     # Limpiar los votos diurnos
     game.day_votes = {}
     
+    save_game(game)
+    voting_service.discard_session(game_id, VoteType.DAY_VOTE)
+    return game
+
+
+@game_mutation
+def persist_day_votes(game_id: str) -> Optional[Game]:
+    """
+    Vuelca en game.day_votes los votos de la sesión diurna del motor de votaciones, para
+    no perderlos cuando la sesión se descarta sin resolver el día (desalojo de la partida).
+    
+    Args:
+        game_id: ID de la partida
+    
+    Returns:
+        Game actualizado si había votos que guardar, None en caso contrario
+    """
+    votes = voting_service.get_votes(game_id, VoteType.DAY_VOTE)
+    if not votes:
+        return None
+    
+    game = load_game(game_id)
+    if not game or game.status != GameStatus.DAY:
+        return None
+    
+    game.day_votes.update(votes)
     save_game(game)
     return game
 
@@ -399,24 +369,20 @@ def get_voting_summary(game_id: str) -> Dict[str, Any]:
     Returns:
         Diccionario con resumen de votación
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    tally = _get_day_tally(game_id)
+    if not index or tally is None:
         return {}
     
-    # Contar jugadores vivos
-    alive_players = [p for p in game.players if p in game.roles and game.roles[p].is_alive]
-    total_players = len(alive_players)
-    total_votes = len(game.day_votes)
-    
-    # Obtener recuentos de votos
-    vote_counts = get_day_vote_counts(game_id)
+    total_players = len(index.alive)
+    total_votes = tally.total_votes
     
     return {
         "total_players": total_players,
         "total_votes": total_votes,
-        "vote_counts": vote_counts,
+        "vote_counts": get_day_vote_counts(game_id),
         "voting_complete": total_votes >= total_players,
-        "game_status": game.status.value
+        "game_status": index.status.value
     }
 
 
@@ -433,33 +399,26 @@ def can_seer_act(game_id: str, player_id: str) -> bool:
     Returns:
         True si puede actuar como vidente, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # Verificar que la partida esté en fase nocturna
-    if game.status != GameStatus.NIGHT:
+    if index.status != GameStatus.NIGHT:
         return False
     
-    # Verificar que el jugador existe y está vivo
-    if player_id not in game.roles:
-        return False
-    
-    player_role = game.roles[player_id]
-    if not player_role.is_alive:
-        return False
-    
-    # Verificar que el jugador es una vidente
-    if player_role.role != GameRole.SEER:
+    # Verificar que el jugador es una vidente viva
+    if not index.is_alive_with_role(player_id, GameRole.SEER):
         return False
     
     # Verificar que no ha usado su habilidad esta noche
-    if player_role.has_used_vision_tonight:
+    if index.get_player(player_id).has_used_vision_tonight:
         return False
     
     return True
 
 
+@game_mutation
 def seer_vision(game_id: str, seer_id: str, target_id: str) -> Optional[Game]:
     """
     Permite a la vidente investigar el rol de otro jugador.
@@ -499,6 +458,7 @@ def seer_vision(game_id: str, seer_id: str, target_id: str) -> Optional[Game]:
     
     # Guardar la partida
     save_game(game)
+    pending_actions_service.record_action(game, seer_id, "seer_vision")
     return game
 
 
@@ -559,28 +519,11 @@ def get_seer_eligible_targets(game_id: str, seer_id: str) -> List[Dict[str, str]
     Returns:
         Lista de jugadores vivos (excluyendo a la vidente)
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    eligible_targets = []
-    
-    for player in game.players:
-        # Excluir a la propia vidente
-        if player == seer_id:
-            continue
-        # Solo incluir jugadores vivos
-        if player in game.roles:
-            role_info = game.roles[player]
-            if role_info.is_alive:
-                eligible_targets.append({
-                    "id": player,
-                    "username": UserService.get_username_by_id(player)
-                })
-    
-    return eligible_targets
+    # Jugadores vivos, excluyendo a la propia vidente
+    return eligible_targets_service.get_targets(game_id, exclude=seer_id)
 
 
+@game_mutation
 def reset_seer_night_actions(game_id: str) -> bool:
     """
     Reinicia las acciones nocturnas de la vidente para una nueva noche.
@@ -618,15 +561,11 @@ def is_sheriff(game_id: str, player_id: str) -> bool:
     Returns:
         True si es el alguacil, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    if player_id not in game.roles:
-        return False
-    
-    player_role = game.roles[player_id]
-    return player_role.role == GameRole.SHERIFF and player_role.is_alive
+    return index.is_alive_with_role(player_id, GameRole.SHERIFF)
 
 
 def can_sheriff_break_tie(game_id: str, sheriff_id: str) -> bool:
@@ -640,16 +579,16 @@ def can_sheriff_break_tie(game_id: str, sheriff_id: str) -> bool:
     Returns:
         True si puede desempatar, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # Verificar que es alguacil
-    if not is_sheriff(game_id, sheriff_id):
+    if not index.is_alive_with_role(sheriff_id, GameRole.SHERIFF):
         return False
     
     # Verificar que la partida esté en fase de día (cuando se votan linchamientos)
-    if game.status != GameStatus.DAY:
+    if index.status != GameStatus.DAY:
         return False
     
     # Verificar si hay empate en la votación diurna
@@ -666,28 +605,15 @@ def has_day_vote_tie(game_id: str) -> bool:
     Returns:
         True si hay empate, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    tally = _get_day_tally(game_id)
+    if tally is None:
         return False
     
-    # Contar votos por jugador
-    vote_counts = {}
-    for voter_id, target_id in game.day_votes.items():
-        if target_id in vote_counts:
-            vote_counts[target_id] += 1
-        else:
-            vote_counts[target_id] = 1
-    
-    if not vote_counts:
-        return False
-    
-    # Verificar si hay empate (al menos dos jugadores con el máximo de votos)
-    max_votes = max(vote_counts.values())
-    tied_players = [player_id for player_id, votes in vote_counts.items() if votes == max_votes]
-    
-    return len(tied_players) > 1
+    # Empate: al menos dos jugadores con el máximo de votos (mantenido por el recuento)
+    return tally.is_tie
 
 
+@game_mutation
 def sheriff_break_tie(game_id: str, sheriff_id: str, chosen_target_id: str) -> Optional[Game]:
     """
     Permite al alguacil desempatar una votación eligiendo quién será eliminado.
@@ -721,14 +647,19 @@ def sheriff_break_tie(game_id: str, sheriff_id: str, chosen_target_id: str) -> O
     if not target_role.is_alive:
         return None
     
-    # Marcar al jugador como eliminado
-    target_role.is_alive = False
+    # Eliminar al jugador y resolver en memoria las consecuencias encadenadas
+    index = game_index_service.get(game).copy()
+    cascade = resolve_death_cascade(game, [(chosen_target_id, "lynching")], index=index)
     
     # Limpiar votos diurnos
     game.day_votes.clear()
     
     # Guardar la partida
     save_game(game)
+    game_index_service.commit(game_id, index, game)
+    voting_service.discard_session(game_id, VoteType.DAY_VOTE)
+    for dead_id in cascade.deaths:
+        pending_actions_service.remove_player(game_id, dead_id)
     return game
 
 
@@ -742,26 +673,11 @@ def get_tied_players(game_id: str) -> List[str]:
     Returns:
         Lista de IDs de jugadores empatados
     """
-    game = load_game(game_id)
-    if not game:
+    tally = _get_day_tally(game_id)
+    if tally is None or not tally.is_tie:
         return []
     
-    # Contar votos por jugador
-    vote_counts = {}
-    for voter_id, target_id in game.day_votes.items():
-        if target_id in vote_counts:
-            vote_counts[target_id] += 1
-        else:
-            vote_counts[target_id] = 1
-    
-    if not vote_counts:
-        return []
-    
-    # Encontrar jugadores con el máximo de votos
-    max_votes = max(vote_counts.values())
-    tied_players = [player_id for player_id, votes in vote_counts.items() if votes == max_votes]
-    
-    return tied_players if len(tied_players) > 1 else []
+    return sorted(tally.leaders)
 
 
 def can_sheriff_choose_successor(game_id: str, sheriff_id: str) -> bool:
@@ -775,23 +691,16 @@ def can_sheriff_choose_successor(game_id: str, sheriff_id: str) -> bool:
     Returns:
         True si puede elegir sucesor, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
-        return False
-    
-    # Verificar que es alguacil
-    if sheriff_id not in game.roles:
-        return False
-    
-    sheriff_role = game.roles[sheriff_id]
-    if sheriff_role.role != GameRole.SHERIFF:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # El alguacil puede elegir sucesor si está vivo pero será eliminado
     # (en la práctica, esto se llamará cuando esté a punto de morir)
-    return sheriff_role.is_alive
+    return index.is_alive_with_role(sheriff_id, GameRole.SHERIFF)
 
 
+@game_mutation
 def sheriff_choose_successor(game_id: str, sheriff_id: str, successor_id: str) -> Optional[Game]:
     """
     Permite al alguacil elegir a su sucesor antes de morir.
@@ -835,6 +744,7 @@ def sheriff_choose_successor(game_id: str, sheriff_id: str, successor_id: str) -
     return game
 
 
+@game_mutation
 def promote_sheriff_successor(game_id: str, deceased_sheriff_id: str) -> Optional[Game]:
     """
     Promueve al sucesor del alguacil cuando el alguacil actual muere.
@@ -888,27 +798,8 @@ def get_sheriff_eligible_successors(game_id: str, sheriff_id: str) -> List[Dict[
     Returns:
         Lista de jugadores vivos (excluyendo al alguacil)
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    eligible_successors = []
-    
-    for player in game.players:
-        # Excluir al propio alguacil
-        if player == sheriff_id:
-            continue
-        
-        # Solo incluir jugadores vivos
-        if player in game.roles:
-            role_info = game.roles[player]
-            if role_info.is_alive:
-                eligible_successors.append({
-                    "id": player,
-                    "username": UserService.get_username_by_id(player)
-                })
-    
-    return eligible_successors
+    # Jugadores vivos, excluyendo al propio alguacil
+    return eligible_targets_service.get_targets(game_id, exclude=sheriff_id)
 
 
 def get_tied_players_info(game_id: str) -> List[Dict[str, str]]:
@@ -951,15 +842,11 @@ def is_hunter(game_id: str, player_id: str) -> bool:
     Returns:
         True si es el cazador, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    if player_id not in game.roles:
-        return False
-    
-    player_role = game.roles[player_id]
-    return player_role.role == GameRole.HUNTER
+    return index.has_role(player_id, GameRole.HUNTER)
 
 
 def can_hunter_revenge(game_id: str, hunter_id: str) -> bool:
@@ -973,29 +860,26 @@ def can_hunter_revenge(game_id: str, hunter_id: str) -> bool:
     Returns:
         True si puede usar venganza, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
-        return False
-    
-    # Verificar que el jugador existe y es cazador
-    if hunter_id not in game.roles:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    hunter_role = game.roles[hunter_id]
-    if hunter_role.role != GameRole.HUNTER:
+    # Verificar que el jugador es cazador
+    if not index.has_role(hunter_id, GameRole.HUNTER):
         return False
     
     # El cazador puede vengarse si está muerto pero no ha usado su venganza
-    if hunter_role.is_alive:
+    if index.is_alive(hunter_id):
         return False
     
     # Verificar que no ha usado ya su habilidad de venganza
-    if hunter_role.has_used_revenge:
+    if index.get_player(hunter_id).has_used_revenge:
         return False
     
     return True
 
 
+@game_mutation
 def hunter_revenge_kill(game_id: str, hunter_id: str, target_id: str) -> Optional[Game]:
     """
     Permite al cazador llevarse a otro jugador cuando muere.
@@ -1028,19 +912,24 @@ def hunter_revenge_kill(game_id: str, hunter_id: str, target_id: str) -> Optiona
     if hunter_id == target_id:
         return None
     
-    # Marcar al objetivo como muerto
-    target_role.is_alive = False
-    
     # Marcar que el cazador ya usó su venganza
     hunter_role = game.roles[hunter_id]
     hunter_role.has_used_revenge = True
     hunter_role.target_player_id = target_id
     
+    # Matar al objetivo y resolver en memoria las consecuencias encadenadas
+    index = game_index_service.get(game).copy()
+    cascade = resolve_death_cascade(game, [(target_id, "hunter_revenge")], index=index)
+    
     # Guardar la partida
     save_game(game)
+    game_index_service.commit(game_id, index, game)
+    for dead_id in cascade.deaths:
+        pending_actions_service.remove_player(game_id, dead_id)
     return game
 
 
+@game_mutation
 def mark_hunter_as_eliminated(game_id: str, hunter_id: str, eliminated_by: str = "unknown") -> Optional[Game]:
     """
     Marca al cazador como eliminado y activa su habilidad de venganza.
@@ -1085,27 +974,8 @@ def get_hunter_revenge_targets(game_id: str, hunter_id: str) -> List[Dict[str, s
     Returns:
         Lista de jugadores vivos que pueden ser objetivo de venganza
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    eligible_targets = []
-    
-    for player in game.players:
-        # Excluir al propio cazador
-        if player == hunter_id:
-            continue
-        
-        # Solo incluir jugadores vivos
-        if player in game.roles:
-            role_info = game.roles[player]
-            if role_info.is_alive:
-                eligible_targets.append({
-                    "id": player,
-                    "username": UserService.get_username_by_id(player)
-                })
-    
-    return eligible_targets
+    # Jugadores vivos, excluyendo al propio cazador
+    return eligible_targets_service.get_targets(game_id, exclude=hunter_id)
 
 
 def check_hunter_death_triggers(game_id: str) -> List[str]:
@@ -1170,6 +1040,7 @@ def auto_eliminate_hunter_target(game_id: str, hunter_id: str) -> Optional[Dict[
     return None
 
 
+@game_mutation
 def reset_hunter_revenge_state(game_id: str, hunter_id: str) -> bool:
     """
     Reinicia el estado de venganza del cazador (para casos especiales).
@@ -1214,15 +1085,11 @@ def is_witch(game_id: str, player_id: str) -> bool:
     Returns:
         True si es la bruja, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
-        return False
-    
-    if player_id not in game.roles:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    player_role = game.roles[player_id]
-    return player_role.role == GameRole.WITCH and player_role.is_alive
+    return index.is_alive_with_role(player_id, GameRole.WITCH)
 
 
 def can_witch_heal(game_id: str, witch_id: str) -> bool:
@@ -1236,22 +1103,20 @@ def can_witch_heal(game_id: str, witch_id: str) -> bool:
     Returns:
         True si puede curar, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # Verificar que la partida esté en fase nocturna
-    if game.status != GameStatus.NIGHT:
+    if index.status != GameStatus.NIGHT:
         return False
     
     # Verificar que es bruja y está viva
-    if not is_witch(game_id, witch_id):
+    if not index.is_alive_with_role(witch_id, GameRole.WITCH):
         return False
     
-    witch_role = game.roles[witch_id]
-    
     # Verificar que aún tiene la poción de curación
-    if not witch_role.has_healing_potion:
+    if not index.get_player(witch_id).has_healing_potion:
         return False
     
     return True
@@ -1268,22 +1133,20 @@ def can_witch_poison(game_id: str, witch_id: str) -> bool:
     Returns:
         True si puede envenenar, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # Verificar que la partida esté en fase nocturna
-    if game.status != GameStatus.NIGHT:
+    if index.status != GameStatus.NIGHT:
         return False
     
     # Verificar que es bruja y está viva
-    if not is_witch(game_id, witch_id):
+    if not index.is_alive_with_role(witch_id, GameRole.WITCH):
         return False
     
-    witch_role = game.roles[witch_id]
-    
     # Verificar que aún tiene la poción de veneno
-    if not witch_role.has_poison_potion:
+    if not index.get_player(witch_id).has_poison_potion:
         return False
     
     return True
@@ -1302,6 +1165,7 @@ def get_warewolf_attack_victim(game_id: str) -> Optional[str]:
     return get_warewolf_attack_consensus(game_id)
 
 
+@game_mutation
 def witch_heal_victim(game_id: str, witch_id: str, victim_id: str) -> Optional[Game]:
     """
     Permite a la bruja usar su poción de curación para salvar a la víctima de los lobos.
@@ -1341,9 +1205,11 @@ def witch_heal_victim(game_id: str, witch_id: str, victim_id: str) -> Optional[G
     game.night_actions["witch_heal"][witch_id] = victim_id
     
     save_game(game)
+    pending_actions_service.record_action(game, witch_id, "witch_actions")
     return game
 
 
+@game_mutation
 def witch_poison_player(game_id: str, witch_id: str, target_id: str) -> Optional[Game]:
     """
     Permite a la bruja usar su poción de veneno para eliminar a un jugador.
@@ -1385,6 +1251,7 @@ def witch_poison_player(game_id: str, witch_id: str, target_id: str) -> Optional
     game.night_actions["witch_poison"][witch_id] = target_id
     
     save_game(game)
+    pending_actions_service.record_action(game, witch_id, "witch_actions")
     return game
 
 
@@ -1440,25 +1307,11 @@ def get_witch_poison_targets(game_id: str, witch_id: str) -> List[Dict[str, str]
     Returns:
         Lista de jugadores vivos que pueden ser envenenados
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    eligible_targets = []
-    
-    for player in game.players:
-        # Incluir todos los jugadores vivos (incluso la bruja puede envenenarse)
-        if player in game.roles:
-            role_info = game.roles[player]
-            if role_info.is_alive:
-                eligible_targets.append({
-                    "id": player,
-                    "username": UserService.get_username_by_id(player)
-                })
-    
-    return eligible_targets
+    # Incluir todos los jugadores vivos (incluso la bruja puede envenenarse)
+    return eligible_targets_service.get_targets(game_id)
 
 
+@game_mutation
 def process_witch_night_actions(game_id: str) -> Dict[str, List[str]]:
     """
     Procesa las acciones nocturnas de la bruja y devuelve los resultados.
@@ -1497,6 +1350,7 @@ def process_witch_night_actions(game_id: str) -> Dict[str, List[str]]:
     }
 
 
+@game_mutation
 def reset_witch_night_actions(game_id: str) -> bool:
     """
     Reinicia las acciones nocturnas de la bruja para una nueva noche.
@@ -1521,6 +1375,7 @@ def reset_witch_night_actions(game_id: str) -> bool:
     return True
 
 
+@game_mutation
 def initialize_witch_potions(game_id: str, witch_id: str) -> bool:
     """
     Inicializa las pociones de la bruja al comienzo del juego.
@@ -1564,15 +1419,11 @@ def is_wild_child(game_id: str, player_id: str) -> bool:
     Returns:
         True si es el Niño Salvaje, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    if player_id not in game.roles:
-        return False
-    
-    player_role = game.roles[player_id]
-    return player_role.role == GameRole.WILD_CHILD and player_role.is_alive
+    return index.is_alive_with_role(player_id, GameRole.WILD_CHILD)
 
 
 def can_wild_child_choose_model(game_id: str, wild_child_id: str) -> bool:
@@ -1586,22 +1437,20 @@ def can_wild_child_choose_model(game_id: str, wild_child_id: str) -> bool:
     Returns:
         True si puede elegir modelo, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
     # Verificar que es Niño Salvaje y está vivo
-    if not is_wild_child(game_id, wild_child_id):
+    if not index.is_alive_with_role(wild_child_id, GameRole.WILD_CHILD):
         return False
     
-    wild_child_role = game.roles[wild_child_id]
-    
     # Solo puede elegir modelo si no ha elegido uno aún
-    if wild_child_role.model_player_id:
+    if index.get_player(wild_child_id).model_player_id:
         return False
     
     # Solo puede elegir en la primera noche
-    return game.current_round <= 1 and game.status == GameStatus.NIGHT
+    return index.game.current_round <= 1 and index.status == GameStatus.NIGHT
 
 
 def get_available_models_for_wild_child(game_id: str, wild_child_id: str) -> List[Dict[str, str]]:
@@ -1615,25 +1464,11 @@ def get_available_models_for_wild_child(game_id: str, wild_child_id: str) -> Lis
     Returns:
         Lista de jugadores que pueden ser modelo
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    available_models = []
-    
-    for player in game.players:
-        # El modelo puede ser cualquier jugador vivo excepto él mismo
-        if player != wild_child_id and player in game.roles:
-            role_info = game.roles[player]
-            if role_info.is_alive:
-                available_models.append({
-                    "id": player,
-                    "username": UserService.get_username_by_id(player)
-                })
-    
-    return available_models
+    # El modelo puede ser cualquier jugador vivo excepto él mismo
+    return eligible_targets_service.get_targets(game_id, exclude=wild_child_id)
 
 
+@game_mutation
 def wild_child_choose_model(game_id: str, wild_child_id: str, model_player_id: str) -> Optional[Game]:
     """
     Permite al Niño Salvaje elegir su jugador modelo.
@@ -1677,6 +1512,7 @@ def wild_child_choose_model(game_id: str, wild_child_id: str, model_player_id: s
     game.night_actions["wild_child_model"][wild_child_id] = model_player_id
     
     save_game(game)
+    pending_actions_service.record_action(game, wild_child_id, "wild_child_model")
     return game
 
 
@@ -1722,6 +1558,7 @@ def get_wild_child_status(game_id: str, wild_child_id: str) -> Dict[str, Any]:
     }
 
 
+@game_mutation
 def check_wild_child_transformation(game_id: str, dead_player_id: str) -> List[Dict[str, Any]]:
     """
     Verifica si algún Niño Salvaje debe transformarse debido a la muerte de su modelo.
@@ -1842,6 +1679,7 @@ def get_wild_child_transformation_info(game_id: str, wild_child_id: str) -> Dict
     }
 
 
+@game_mutation
 def reset_wild_child_night_actions(game_id: str) -> bool:
     """
     Reinicia las acciones nocturnas del Niño Salvaje para una nueva noche.
@@ -1864,6 +1702,7 @@ def reset_wild_child_night_actions(game_id: str) -> bool:
     return True
 
 
+@game_mutation
 def initialize_wild_child(game_id: str, wild_child_id: str) -> bool:
     """
     Inicializa al Niño Salvaje al comienzo del juego.
@@ -1894,6 +1733,7 @@ def initialize_wild_child(game_id: str, wild_child_id: str) -> bool:
     return True
 
 
+@game_mutation
 def process_wild_child_death_check(game_id: str) -> List[Dict[str, Any]]:
     """
     Procesa todas las muertes para verificar transformaciones de Niños Salvajes.
@@ -1921,6 +1761,7 @@ def process_wild_child_death_check(game_id: str) -> List[Dict[str, Any]]:
     return all_transformations
 
 
+@game_mutation
 def simulate_player_death(game_id: str, player_id: str) -> bool:
     """
     Marca a un jugador como muerto (función auxiliar para testing y procesamiento de muertes).
@@ -1941,6 +1782,7 @@ def simulate_player_death(game_id: str, player_id: str) -> bool:
     
     game.roles[player_id].is_alive = False
     save_game(game)
+    pending_actions_service.remove_player(game_id, player_id)
     return True
 
 
@@ -1957,14 +1799,11 @@ def is_cupid(game_id: str, player_id: str) -> bool:
     Returns:
         True si es Cupido, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
-        return False
-    
-    if player_id not in game.roles:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    return game.roles[player_id].role == GameRole.CUPID
+    return index.has_role(player_id, GameRole.CUPID)
 
 
 def can_cupid_choose_lovers(game_id: str, cupid_id: str) -> bool:
@@ -1978,32 +1817,20 @@ def can_cupid_choose_lovers(game_id: str, cupid_id: str) -> bool:
     Returns:
         True si puede elegir, False en caso contrario
     """
-    game = load_game(game_id)
-    if not game:
+    index = game_index_service.get_by_id(game_id)
+    if not index:
         return False
     
-    # Verificar que es Cupido
-    if not is_cupid(game_id, cupid_id):
-        return False
-    
-    # Verificar que está vivo
-    if not game.roles[cupid_id].is_alive:
+    # Verificar que es Cupido y está vivo
+    if not index.is_alive_with_role(cupid_id, GameRole.CUPID):
         return False
     
     # Solo puede elegir en la primera noche
-    if game.current_round != 1:
-        return False
-    
-    # Verificar que la partida está en fase de noche
-    if game.status != GameStatus.NIGHT:
+    if index.game.current_round != 1 or index.status != GameStatus.NIGHT:
         return False
     
     # Verificar que no ha elegido enamorados ya
-    cupid_actions = game.night_actions.get("cupid_lovers", {})
-    if cupid_id in cupid_actions:
-        return False
-    
-    return True
+    return cupid_id not in index.game.night_actions.get("cupid_lovers", {})
 
 
 def get_cupid_available_targets(game_id: str, cupid_id: str) -> List[Dict[str, str]]:
@@ -2017,24 +1844,11 @@ def get_cupid_available_targets(game_id: str, cupid_id: str) -> List[Dict[str, s
     Returns:
         Lista de jugadores disponibles
     """
-    game = load_game(game_id)
-    if not game:
-        return []
-    
-    available_targets = []
-    
     # Todos los jugadores vivos pueden ser enamorados
-    for player in game.players:
-        if (player in game.roles and 
-            game.roles[player].is_alive):
-            available_targets.append({
-                "id": player,
-                "username": UserService.get_username_by_id(player)
-            })
-    
-    return available_targets
+    return eligible_targets_service.get_targets(game_id)
 
 
+@game_mutation
 def cupid_choose_lovers(game_id: str, cupid_id: str, lover1_id: str, lover2_id: str) -> Optional[Game]:
     """
     Permite a Cupido elegir a dos jugadores como enamorados.
@@ -2084,6 +1898,7 @@ def cupid_choose_lovers(game_id: str, cupid_id: str, lover1_id: str, lover2_id:
     game.night_actions["cupid_lovers"][cupid_id] = f"{lover1_id}:{lover2_id}"
     
     save_game(game)
+    pending_actions_service.record_action(game, cupid_id, "cupid_lovers")
     return game
 
 
@@ -2201,6 +2016,7 @@ def get_lovers_status(game_id: str, player_id: str) -> Dict[str, Any]:
     }
 
 
+@game_mutation
 def check_lovers_death(game_id: str, dead_player_id: str) -> List[str]:
     """
     Verifica si un enamorado debe morir cuando muere su pareja.
@@ -2290,6 +2106,7 @@ def check_lovers_victory_condition(game_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+@game_mutation
 def initialize_cupid_night_actions(game_id: str, cupid_id: str) -> bool:
     """
     Inicializa las acciones nocturnas de Cupido.
@@ -2320,6 +2137,7 @@ def initialize_cupid_night_actions(game_id: str, cupid_id: str) -> bool:
     return True
 
 
+@game_mutation
 def reset_cupid_night_actions(game_id: str) -> bool:
     """
     Reinicia las acciones nocturnas de Cupido.
@@ -0,0 +1,251 @@
+"""
+Player View Service
+Vista consolidada de una partida para un jugador: todo lo que puede ver en la fase actual
+(su rol, jugadores, objetivos de sus acciones, pociones, voto y temporizador) en una sola
+respuesta, en lugar de una petición por dato.
+
+La vista se calcula una vez por (versión de la partida, jugador) con una única carga de la
+partida y una única consulta de nombres, y se reutiliza hasta que la partida cambia. El
+temporizador, el voto diurno y las acciones pendientes no forman parte de la caché: cambian
+sin tocar la partida guardada y se añaden en cada lectura desde sus registros en memoria.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+from app.database import game_transaction, get_game_version, in_game_transaction, load_game
+from app.models.game_and_roles import Game, GameRole, GameStatus
+from app.services import player_action_service
+from app.services.game_index_service import GameIndex, game_index_service
+from app.services.game_phases_service import phase_manager
+from app.services.pending_actions_service import pending_actions_service
+from app.services.user_service import UserService
+
+ViewKey = Tuple[str, str]
+
+
+class PlayerViewService:
+    """Vistas por jugador cacheadas por versión de la partida"""
+
+    def __init__(self):
+        self._cache: Dict[ViewKey, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+
+    def get_view(self, game_id: str, player_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Vista de la partida para un jugador.
+
+        Returns:
+            Diccionario con la vista, o None si la partida no existe o el jugador no participa
+        """
+        # La versión se lee antes de cargar: si la partida cambia mientras tanto, la vista
+        # guardada es más reciente que su clave y se recalcula en la siguiente lectura
+        version = get_game_version(game_id)
+        key = (game_id, player_id)
+        # Dentro de una transacción sobre la partida la vista se calcula sin caché
+        cacheable = not in_game_transaction(game_id)
+
+        with self._lock:
+            cached = self._cache.get(key) if cacheable else None
+            if cached and cached[0] == version:
+                self.hits += 1
+                view = cached[1]
+            else:
+                self.misses += 1
+                view = None
+
+        if view is None:
+            # Todas las consultas auxiliares comparten la misma copia de la partida
+            with game_transaction(game_id):
+                game = load_game(game_id)
+                view = self._build_view(game, player_id) if game else None
+            if view is None:
+                return None
+            if cacheable:
+                with self._lock:
+                    self._cache[key] = (version, view)
+
+        live = {
+            "timer": self._get_timer(game_id),
+            "pending_actions": [
+                item for item in pending_actions_service.get_pending(game_id, view["status"]) or []
+                if item["player_id"] == player_id
+            ]
+        }
+        if view["status"] == GameStatus.DAY.value:
+            live["vote"] = self._get_vote(game_id, player_id)
+        return {**view, **live}
+
+    def forget(self, game_id: str):
+        """Descartar las vistas cacheadas de una partida"""
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == game_id]:
+                del self._cache[key]
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"cached_views": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    # --- Construcción de la vista ---
+
+    def _build_view(self, game: Game, player_id: str) -> Optional[Dict[str, Any]]:
+        me = game.roles.get(player_id)
+        if me is None and player_id not in game.players:
+            return None
+
+        index = game_index_service.get(game)
+        usernames = UserService.get_usernames_by_ids(game.players)
+        is_werewolf = me is not None and me.role == GameRole.WAREWOLF
+
+        view: Dict[str, Any] = {
+            "game_id": game.id,
+            "version": index.version,
+            "status": game.status.value,
+            "round": game.current_round,
+            "is_first_night": game.is_first_night,
+            "me": self._build_me(game, player_id, usernames),
+            "players": [
+                {
+                    "id": other_id,
+                    "username": usernames.get(other_id, "unknown name"),
+                    "is_alive": other_id not in game.roles or game.roles[other_id].is_alive,
+                    "role": self._visible_role(game, player_id, other_id, is_werewolf)
+                }
+                for other_id in game.players
+            ],
+            "available_actions": [],
+            "targets": {}
+        }
+
+        if me is None:
+            return view
+
+        self._add_actions(view, game, index, player_id, usernames)
+        self._add_role_specific(view, game, player_id, usernames)
+        return view
+
+    def _build_me(self, game: Game, player_id: str, usernames: Dict[str, str]) -> Dict[str, Any]:
+        me = game.roles.get(player_id)
+        info: Dict[str, Any] = {
+            "player_id": player_id,
+            "username": usernames.get(player_id, "unknown name"),
+            "role": me.role.value if me else None,
+            "is_alive": me.is_alive if me else True,
+            "is_lover": bool(me and me.is_lover)
+        }
+        if me and me.is_lover and me.lover_partner_id:
+            partner = game.roles.get(me.lover_partner_id)
+            info["lover"] = {
+                "partner_id": me.lover_partner_id,
+                "partner_username": usernames.get(me.lover_partner_id),
+                "both_alive": bool(me.is_alive and partner and partner.is_alive)
+            }
+        return info
+
+    def _visible_role(self, game: Game, viewer_id: str, player_id: str, viewer_is_werewolf: bool) -> Optional[str]:
+        """Rol de otro jugador solo si el observador puede conocerlo"""
+        info = game.roles.get(player_id)
+        if info is None:
+            return None
+        if (
+            player_id == viewer_id
+            or info.is_revealed
+            or game.status == GameStatus.FINISHED
+            or (viewer_is_werewolf and info.role == GameRole.WAREWOLF)
+        ):
+            return info.role.value
+        return None
+
+    def _targets(self, index: GameIndex, usernames: Dict[str, str], exclude: Optional[str] = None,
+                 exclude_role: Optional[GameRole] = None) -> List[Dict[str, str]]:
+        return [
+            {"id": player_id, "username": usernames.get(player_id, "unknown name")}
+            for player_id in index.get_alive_players(exclude=exclude)
+            if exclude_role is None or not index.has_role(player_id, exclude_role)
+        ]
+
+    def _add_actions(self, view: Dict[str, Any], game: Game, index: GameIndex, player_id: str, usernames: Dict[str, str]):
+        """Acciones disponibles y sus objetivos (mismas reglas que los endpoints de cada rol)"""
+        game_id = game.id
+        actions: List[str] = view["available_actions"]
+        targets: Dict[str, Any] = view["targets"]
+
+        if player_action_service.can_warewolf_act(game_id, player_id):
+            actions.append("warewolf_attack")
+            targets["warewolf_attack"] = self._targets(index, usernames, exclude_role=GameRole.WAREWOLF)
+        if player_action_service.can_seer_act(game_id, player_id):
+            actions.append("seer_vision")
+            targets["seer_vision"] = self._targets(index, usernames, exclude=player_id)
+        if player_action_service.can_witch_heal(game_id, player_id):
+            actions.append("witch_heal")
+        if player_action_service.can_witch_poison(game_id, player_id):
+            actions.append("witch_poison")
+            targets["witch_poison"] = self._targets(index, usernames)
+        if player_action_service.can_cupid_choose_lovers(game_id, player_id):
+            actions.append("cupid_choose_lovers")
+            targets["cupid_choose_lovers"] = self._targets(index, usernames)
+        if player_action_service.can_wild_child_choose_model(game_id, player_id):
+            actions.append("wild_child_choose_model")
+            targets["wild_child_choose_model"] = self._targets(index, usernames, exclude=player_id)
+        if player_action_service.can_hunter_revenge(game_id, player_id):
+            actions.append("hunter_revenge")
+            targets["hunter_revenge"] = self._targets(index, usernames, exclude=player_id)
+        if player_action_service.can_player_vote(game_id, player_id):
+            actions.append("day_vote")
+            targets["day_vote"] = self._targets(index, usernames)
+
+    def _add_role_specific(self, view: Dict[str, Any], game: Game, player_id: str, usernames: Dict[str, str]):
+        me = game.roles[player_id]
+        game_id = game.id
+
+        if me.role == GameRole.WAREWOLF and game.status == GameStatus.NIGHT:
+            view["werewolves"] = {
+                "attack_votes": dict(game.night_actions.get("warewolf_attacks", {})),
+                "consensus_target": player_action_service.get_warewolf_attack_consensus(game_id)
+            }
+        elif me.role == GameRole.SEER:
+            view["role_specific"] = {"has_used_vision_tonight": me.has_used_vision_tonight or False}
+        elif me.role == GameRole.WITCH:
+            view["role_specific"] = player_action_service.get_witch_night_info(game_id, player_id)
+        elif me.role == GameRole.CUPID:
+            view["role_specific"] = player_action_service.get_cupid_status(game_id, player_id)
+        elif me.role == GameRole.WILD_CHILD:
+            view["role_specific"] = player_action_service.get_wild_child_status(game_id, player_id)
+        elif me.role == GameRole.SHERIFF:
+            view["role_specific"] = {
+                "has_double_vote": me.has_double_vote or False,
+                "can_break_ties": me.can_break_ties or False,
+                "successor_id": me.successor_id
+            }
+        elif me.role == GameRole.HUNTER:
+            view["role_specific"] = {
+                "can_revenge_kill": me.can_revenge_kill or False,
+                "has_used_revenge": me.has_used_revenge or False
+            }
+
+    def _get_vote(self, game_id: str, player_id: str) -> Dict[str, Any]:
+        """Voto y recuento diurnos (sin cachear: el motor de votaciones no cambia la versión de la partida)"""
+        return {
+            "my_vote": player_action_service.get_player_vote(game_id, player_id),
+            "counts": player_action_service.get_day_vote_counts(game_id)
+        }
+
+    def _get_timer(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """Fase y deadline del controlador de fases (sin cachear: cambia sin tocar la partida)"""
+        controller = phase_manager.game_controllers.get(game_id)
+        if controller is None:
+            return None
+        info = controller.get_phase_info()
+        return {
+            "phase": info["phase"],
+            "deadline": info["deadline"],
+            "duration": info["duration"],
+            "time_remaining": info["time_remaining"],
+            "server_time": info["server_time"]
+        }
+
+
+# Instancia global de vistas por jugador
+player_view_service = PlayerViewService()
@@ -0,0 +1,204 @@
+"""
+Presence Service
+Presencia en vivo de los usuarios (quién está conectado y a qué partidas) mantenida en memoria
+a partir de las conexiones WebSocket que registra el ConnectionManager.
+
+Las consultas de presencia se responden sin tocar la base de datos. El estado duradero de la
+tabla users solo cambia en las transiciones con significado:
+- sin conexiones -> primera conexión: 'in_game' (cada WebSocket pertenece a una partida);
+- última conexión cerrada y sin reconectar durante PRESENCE_OFFLINE_GRACE_SECONDS: 'connected'.
+
+Abrir más pestañas, cambiar de partida o reconectar dentro del margen no genera escrituras ni
+notificaciones. Los listeners reciben (user_id, estado nuevo) y escriben a través del buffer
+de estados de usuario, que agrupa las escrituras en lotes periódicos.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import logging
+import os
+import threading
+
+from app.models.user import UserStatus
+from app.services.phase_scheduler_service import phase_scheduler
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_OFFLINE_GRACE_SECONDS = float(os.getenv("PRESENCE_OFFLINE_GRACE_SECONDS", "10"))
+
+PresenceListener = Callable[[str, UserStatus], Awaitable[None]]
+
+
+class PresenceService:
+    """Conexiones por usuario y usuarios por partida, con transiciones de estado diferidas"""
+
+    def __init__(self, offline_grace_seconds: float = PRESENCE_OFFLINE_GRACE_SECONDS):
+        self.offline_grace_seconds = offline_grace_seconds
+        self._connections: Dict[str, Dict[str, Optional[str]]] = {}  # user_id -> {connection_id: game_id}
+        self._connection_users: Dict[str, str] = {}                  # connection_id -> user_id
+        self._games: Dict[str, Set[str]] = {}                        # game_id -> user_ids conectados
+        self._announced: Set[str] = set()  # Usuarios cuya llegada ya se notificó (incluye los que están en el margen)
+        self._listeners: List[PresenceListener] = []
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.connects_total = 0
+        self.disconnects_total = 0
+        self.transitions_total = 0
+        self.reconnects_absorbed = 0
+
+    def add_listener(self, listener: PresenceListener):
+        """Registrar una corrutina a la que se notifica cada transición (user_id, nuevo estado)"""
+        self._listeners.append(listener)
+
+    # --- Eventos del ConnectionManager ---
+
+    async def connect(self, user_id: str, connection_id: str, game_id: Optional[str] = None):
+        """Registrar una conexión; notifica la llegada si el usuario no estaba presente"""
+        with self._lock:
+            self.connects_total += 1
+            self._connection_users[connection_id] = user_id
+            self._connections.setdefault(user_id, {})[connection_id] = game_id
+            if game_id:
+                self._games.setdefault(game_id, set()).add(user_id)
+            arrived = user_id not in self._announced
+            self._announced.add(user_id)
+
+        if phase_scheduler.cancel(self._offline_key(user_id)):
+            self.reconnects_absorbed += 1
+        if arrived:
+            await self._notify(user_id, UserStatus.IN_GAME)
+
+    async def disconnect(self, connection_id: str):
+        """Quitar una conexión; si era la última, la salida se notifica pasado el margen"""
+        with self._lock:
+            user_id = self._connection_users.pop(connection_id, None)
+            if user_id is None:
+                return
+            self.disconnects_total += 1
+            connections = self._connections.get(user_id, {})
+            game_id = connections.pop(connection_id, None)
+            if game_id:
+                self._discard_from_game(user_id, game_id)
+            gone = not connections
+            if gone:
+                self._connections.pop(user_id, None)
+
+        if gone:
+            phase_scheduler.schedule(
+                self._offline_key(user_id), self.offline_grace_seconds, lambda: self._expire(user_id)
+            )
+
+    def join_game(self, connection_id: str, game_id: str):
+        """Asociar una conexión existente a una partida"""
+        with self._lock:
+            user_id = self._connection_users.get(connection_id)
+            if user_id is None:
+                return
+            connections = self._connections[user_id]
+            previous = connections.get(connection_id)
+            if previous == game_id:
+                return
+            connections[connection_id] = game_id
+            if previous:
+                self._discard_from_game(user_id, previous)
+            self._games.setdefault(game_id, set()).add(user_id)
+
+    def leave_game(self, connection_id: str, game_id: str):
+        """Desasociar una conexión de una partida (la conexión sigue abierta)"""
+        with self._lock:
+            user_id = self._connection_users.get(connection_id)
+            if user_id is None:
+                return
+            connections = self._connections[user_id]
+            if connections.get(connection_id) != game_id:
+                return
+            connections[connection_id] = None
+            self._discard_from_game(user_id, game_id)
+
+    # --- Consultas (sin base de datos) ---
+
+    def is_online(self, user_id: str, game_id: Optional[str] = None) -> bool:
+        """El usuario tiene alguna conexión abierta (en la partida indicada, si se indica)"""
+        with self._lock:
+            if game_id is not None:
+                return user_id in self._games.get(game_id, ())
+            return user_id in self._connections
+
+    def get_online_users(self) -> List[str]:
+        with self._lock:
+            return list(self._connections)
+
+    def get_game_users(self, game_id: str) -> List[str]:
+        with self._lock:
+            return list(self._games.get(game_id, ()))
+
+    def get_presence(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Presencia de un usuario conectado, o None si no tiene conexiones"""
+        with self._lock:
+            connections = self._connections.get(user_id)
+            if not connections:
+                return None
+            return self._describe(user_id, connections)
+
+    def get_all_presence(self, game_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Presencia de todos los usuarios conectados (o solo de los de una partida)"""
+        with self._lock:
+            user_ids = self._games.get(game_id, set()) if game_id is not None else self._connections.keys()
+            return [self._describe(user_id, self._connections[user_id]) for user_id in user_ids]
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "online_users": len(self._connections),
+                "connections": len(self._connection_users),
+                "games": len(self._games),
+                "pending_offline": len(self._announced) - len(self._connections),
+                "connects_total": self.connects_total,
+                "disconnects_total": self.disconnects_total,
+                "transitions_total": self.transitions_total,
+                "reconnects_absorbed": self.reconnects_absorbed
+            }
+
+    # --- Internos ---
+
+    @staticmethod
+    def _offline_key(user_id: str) -> str:
+        return f"presence-offline:{user_id}"
+
+    @staticmethod
+    def _describe(user_id: str, connections: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "status": UserStatus.IN_GAME.value,
+            "game_ids": sorted({game_id for game_id in connections.values() if game_id}),
+            "connections": len(connections)
+        }
+
+    def _discard_from_game(self, user_id: str, game_id: str):
+        """Quitar al usuario de la partida si ya no le queda ninguna conexión en ella (con el lock tomado)"""
+        if game_id in self._connections.get(user_id, {}).values():
+            return
+        members = self._games.get(game_id)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self._games[game_id]
+
+    async def _expire(self, user_id: str):
+        """Fin del margen de reconexión: notificar la salida si sigue sin conexiones"""
+        with self._lock:
+            if user_id in self._connections or user_id not in self._announced:
+                return
+            self._announced.discard(user_id)
+        await self._notify(user_id, UserStatus.CONNECTED)
+
+    async def _notify(self, user_id: str, status: UserStatus):
+        self.transitions_total += 1
+        for listener in self._listeners:
+            try:
+                await listener(user_id, status)
+            except Exception as e:
+                logger.error(f"Error notificando la presencia de {user_id}: {e}")
+
+
+# Instancia global de presencia
+presence_service = PresenceService()
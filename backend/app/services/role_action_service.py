@@ -0,0 +1,277 @@
+"""
+Role Action Service
+Tabla de despacho de las acciones de rol (ataque de hombre lobo, visión de la vidente,
+pociones de la bruja, enamorados de Cupido, venganza del cazador y modelo del Niño Salvaje).
+
+Cada acción comprueba permisos y aplica la mutación dentro del actor de la partida, de modo
+que la validación y el cambio se serializan juntos. Lo usan los mensajes WebSocket de
+acciones de rol, que evitan una petición HTTP (con su autenticación) por acción, y los
+lotes de acciones (REST y WebSocket), que se aplican atómicamente en una transacción.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import os
+
+from app.database import game_transaction, load_game
+from app.models.game_and_roles import Game
+from app.services import player_action_service
+from app.services.game_actor_service import game_mutation
+from app.services.pending_actions_service import pending_actions_service
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ACTIONS = int(os.getenv("ROLE_ACTION_MAX_BATCH", "10"))
+
+
+@dataclass
+class RoleActionResult:
+    """Resultado de una acción de rol"""
+    success: bool
+    message: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self, action: str) -> Dict[str, Any]:
+        return {"action": action, "success": self.success, "message": self.message, "data": self.data}
+
+
+class RoleActionError(Exception):
+    """La acción no se puede realizar (permisos, fase o parámetros)"""
+    pass
+
+
+def _require(params: Dict[str, Any], name: str) -> str:
+    value = params.get(name)
+    if not value or not isinstance(value, str):
+        raise RoleActionError(f"Parámetro requerido: {name}")
+    return value
+
+
+def _username(game: Optional[Game], player_id: str) -> Optional[str]:
+    """Nombre de un jugador de la partida (players solo guarda IDs)"""
+    if game and player_id in game.players:
+        return UserService.get_username_by_id(player_id)
+    return None
+
+
+def _warewolf_attack(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    target_id = _require(params, "target_id")
+    if not player_action_service.can_warewolf_act(game_id, player_id):
+        raise RoleActionError("No puedes realizar esta acción en este momento")
+    if not player_action_service.warewolf_attack(game_id, player_id, target_id):
+        raise RoleActionError("No se pudo realizar el ataque. Verifica que el objetivo sea válido.")
+
+    consensus_target = player_action_service.get_warewolf_attack_consensus(game_id)
+    message = "Tu voto de ataque ha sido registrado correctamente"
+    if consensus_target:
+        message += ". Los hombres lobo han llegado a un consenso."
+    return RoleActionResult(True, message, {"target_id": target_id, "consensus_target": consensus_target})
+
+
+def _seer_vision(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    target_id = _require(params, "target_id")
+    if not player_action_service.can_seer_act(game_id, player_id):
+        raise RoleActionError("No puedes usar tu visión en este momento")
+    if not player_action_service.seer_vision(game_id, player_id, target_id):
+        raise RoleActionError("No se pudo realizar la investigación. Verifica que el objetivo sea válido.")
+
+    vision = player_action_service.get_seer_vision_result(game_id, player_id, target_id)
+    if not vision:
+        raise RoleActionError("No se pudo obtener el resultado de la investigación")
+    return RoleActionResult(True, f"Has investigado a {vision['username']}", {
+        "target_id": target_id,
+        "target_role": vision["role"],
+        "target_username": vision["username"]
+    })
+
+
+def _witch_heal(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    target_id = _require(params, "target_id")
+    if not player_action_service.can_witch_heal(game_id, player_id):
+        raise RoleActionError("No puedes usar la poción de curación en este momento")
+    if player_action_service.get_warewolf_attack_victim(game_id) != target_id:
+        raise RoleActionError("Solo puedes curar a la víctima del ataque de los hombres lobo")
+
+    updated_game = player_action_service.witch_heal_victim(game_id, player_id, target_id)
+    if not updated_game:
+        raise RoleActionError("No se pudo realizar la curación")
+    username = _username(updated_game, target_id) or target_id
+    return RoleActionResult(True, f"Has usado tu poción de curación para salvar a {username}", {
+        "healed_player_id": target_id,
+        "healed_username": username
+    })
+
+
+def _witch_poison(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    target_id = _require(params, "target_id")
+    if not player_action_service.can_witch_poison(game_id, player_id):
+        raise RoleActionError("No puedes usar la poción de veneno en este momento")
+
+    updated_game = player_action_service.witch_poison_player(game_id, player_id, target_id)
+    if not updated_game:
+        raise RoleActionError("No se pudo realizar el envenenamiento")
+    username = _username(updated_game, target_id) or target_id
+    return RoleActionResult(True, f"Has envenenado a {username}", {
+        "poisoned_player_id": target_id,
+        "poisoned_username": username
+    })
+
+
+def _cupid_choose_lovers(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    lover1_id = _require(params, "lover1_id")
+    lover2_id = _require(params, "lover2_id")
+    if not player_action_service.is_cupid(game_id, player_id):
+        raise RoleActionError("Solo Cupido puede elegir enamorados")
+    if not player_action_service.can_cupid_choose_lovers(game_id, player_id):
+        raise RoleActionError("No puedes elegir enamorados en este momento")
+
+    updated_game = player_action_service.cupid_choose_lovers(game_id, player_id, lover1_id, lover2_id)
+    if not updated_game:
+        raise RoleActionError("No se pudo realizar la elección de enamorados")
+    return RoleActionResult(True, "Enamorados elegidos exitosamente", {
+        "lover1_id": lover1_id,
+        "lover1_username": _username(updated_game, lover1_id) or "Desconocido",
+        "lover2_id": lover2_id,
+        "lover2_username": _username(updated_game, lover2_id) or "Desconocido"
+    })
+
+
+def _hunter_revenge(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    target_id = _require(params, "target_id")
+    if not player_action_service.can_hunter_revenge(game_id, player_id):
+        raise RoleActionError("No puedes usar tu habilidad de venganza en este momento")
+
+    updated_game = player_action_service.hunter_revenge_kill(game_id, player_id, target_id)
+    if not updated_game:
+        raise RoleActionError("No se pudo ejecutar la venganza. Verifica que el objetivo sea válido.")
+    username = _username(updated_game, target_id)
+    if not username:
+        raise RoleActionError("No se pudo encontrar información del objetivo")
+    return RoleActionResult(True, f"Te has llevado a {username} contigo en tu venganza final.", {
+        "target_id": target_id,
+        "target_username": username
+    })
+
+
+def _wild_child_choose_model(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    model_player_id = _require(params, "model_player_id")
+    if not player_action_service.can_wild_child_choose_model(game_id, player_id):
+        raise RoleActionError("No puedes elegir un modelo en este momento")
+
+    updated_game = player_action_service.wild_child_choose_model(game_id, player_id, model_player_id)
+    if not updated_game:
+        raise RoleActionError("No se pudo elegir el modelo")
+    username = _username(updated_game, model_player_id) or model_player_id
+    return RoleActionResult(True, f"Has elegido a {username} como tu modelo a seguir", {
+        "model_player_id": model_player_id,
+        "model_username": username
+    })
+
+
+def _witch_night_info(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    if not player_action_service.is_witch(game_id, player_id):
+        raise RoleActionError("Solo la bruja puede acceder a esta información")
+    return RoleActionResult(True, "Información nocturna de la bruja", {
+        **player_action_service.get_witch_night_info(game_id, player_id),
+        "poison_targets": player_action_service.get_witch_poison_targets(game_id, player_id)
+    })
+
+
+def _cupid_status(game_id: str, player_id: str, params: Dict[str, Any]) -> RoleActionResult:
+    if not player_action_service.is_cupid(game_id, player_id):
+        raise RoleActionError("Solo Cupido puede ver este estado")
+    return RoleActionResult(True, "Estado de Cupido", player_action_service.get_cupid_status(game_id, player_id))
+
+
+# Acción -> función (game_id, player_id, params) que valida y aplica la acción.
+# Las consultas (*_info, *_status) no modifican la partida: en un lote ven el estado
+# resultante de las acciones anteriores.
+ROLE_ACTIONS: Dict[str, Callable[[str, str, Dict[str, Any]], RoleActionResult]] = {
+    "warewolf_attack": _warewolf_attack,
+    "seer_vision": _seer_vision,
+    "witch_heal": _witch_heal,
+    "witch_poison": _witch_poison,
+    "cupid_choose_lovers": _cupid_choose_lovers,
+    "hunter_revenge": _hunter_revenge,
+    "wild_child_choose_model": _wild_child_choose_model,
+    "witch_night_info": _witch_night_info,
+    "cupid_status": _cupid_status,
+}
+
+
+@game_mutation
+def perform_role_action(game_id: str, player_id: str, action: str, params: Dict[str, Any]) -> RoleActionResult:
+    """
+    Validar y aplicar una acción de rol en el actor de la partida.
+
+    Args:
+        game_id: ID de la partida
+        player_id: Jugador que realiza la acción
+        action: Clave de ROLE_ACTIONS
+        params: Parámetros de la acción (target_id, lover1_id, ...)
+
+    Returns:
+        Resultado de la acción; los rechazos se devuelven con success=False
+    """
+    return _run_action(game_id, player_id, action, params)
+
+
+@game_mutation
+def perform_role_actions(game_id: str, player_id: str, actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aplicar en orden una lista de acciones de un mismo jugador de forma atómica.
+
+    Todas se ejecutan sobre una única carga de la partida en memoria y se guardan con una
+    sola escritura; si alguna falla no se guarda ninguna y las posteriores no se intentan.
+
+    Args:
+        game_id: ID de la partida
+        player_id: Jugador que realiza las acciones
+        actions: Lista de {"action": ..., <parámetros>}
+
+    Returns:
+        {"success": bool, "results": [resultado por acción, en orden]}
+    """
+    if not actions:
+        return {"success": False, "results": [], "message": "No se han indicado acciones"}
+    if len(actions) > MAX_BATCH_ACTIONS:
+        return {"success": False, "results": [], "message": f"Máximo {MAX_BATCH_ACTIONS} acciones por lote"}
+
+    results: List[Dict[str, Any]] = []
+    with game_transaction(game_id) as transaction:
+        for item in actions:
+            action = item.get("action")
+            result = _run_action(game_id, player_id, action, item)
+            results.append(result.to_dict(action))
+            if not result.success:
+                transaction.rollback()
+                break
+
+    if transaction.rolled_back:
+        # Las acciones ya aplicadas se descartan: rehacer el seguimiento de pendientes desde la BD
+        game = load_game(game_id)
+        if game:
+            pending_actions_service.start_phase(game)
+        for skipped in actions[len(results):]:
+            results.append(RoleActionResult(False, "No aplicada: una acción anterior del lote falló").to_dict(skipped.get("action")))
+        for result in results:
+            if result["success"]:
+                result["success"] = False
+                result["message"] = "Revertida: una acción posterior del lote falló"
+        return {"success": False, "results": results, "message": "El lote no se ha aplicado"}
+
+    return {"success": True, "results": results, "message": f"{len(results)} acciones aplicadas"}
+
+
+def _run_action(game_id: str, player_id: str, action: Optional[str], params: Dict[str, Any]) -> RoleActionResult:
+    handler = ROLE_ACTIONS.get(action)
+    if handler is None:
+        return RoleActionResult(False, f"Acción de rol no soportada: {action}")
+    try:
+        return handler(game_id, player_id, params or {})
+    except RoleActionError as e:
+        return RoleActionResult(False, str(e))
+    except Exception as e:
+        logger.error(f"Error en acción de rol {action} de {player_id} en {game_id}: {e}")
+        return RoleActionResult(False, "Error procesando la acción")
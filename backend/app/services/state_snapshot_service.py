@@ -0,0 +1,149 @@
+"""
+State Snapshot Service
+Persiste periódicamente (y al apagar) el estado vivo en memoria en un fichero local
+compacto, y lo rehidrata al arrancar para que las partidas en curso sobrevivan a un
+reinicio o despliegue.
+
+El snapshot incluye, por partida residente: fase y deadline (en epoch), jugadores
+conectados, votos y eliminados del GameStateManager. Las sesiones de votación son
+durables por sí mismas (VotingService las persiste por lotes en base de datos).
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+
+from app.database import DB_DIR
+from app.services.game_state_service import GameState, game_state_manager
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.getenv("STATE_SNAPSHOT_PATH", os.path.join(DB_DIR, "live_state.json.gz"))
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("STATE_SNAPSHOT_INTERVAL_SECONDS", "30"))
+SNAPSHOT_VERSION = 1
+
+
+class StateSnapshotService:
+    """Snapshots periódicos del estado en memoria y rehidratación al arrancar"""
+
+    def __init__(self, path: str = SNAPSHOT_PATH, interval_seconds: int = SNAPSHOT_INTERVAL_SECONDS):
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.snapshot_task: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.last_snapshot_at: Optional[float] = None
+        self.last_snapshot_ms = 0.0
+        self.last_snapshot_games = 0
+        self.last_restore_ms = 0.0
+        self.last_restore_games = 0
+
+    async def start(self):
+        """Arrancar el snapshot periódico"""
+        if not self.snapshot_task:
+            self.snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        """Detener el snapshot periódico y guardar un último snapshot"""
+        if self.snapshot_task:
+            self.snapshot_task.cancel()
+            try:
+                await self.snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self.snapshot_task = None
+        await self.save()
+
+    def build_snapshot(self) -> Dict[str, Any]:
+        """Capturar el estado en memoria (síncrono: se ejecuta entero dentro del loop)"""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "games": game_state_manager.to_snapshot()
+        }
+
+    async def save(self) -> bool:
+        """Guardar un snapshot; la escritura a disco se hace fuera del loop"""
+        started = time.perf_counter()
+        try:
+            snapshot = self.build_snapshot()
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            logger.error(f"Error guardando snapshot de estado: {e}")
+            return False
+
+        self.last_snapshot_at = time.time()
+        self.last_snapshot_ms = (time.perf_counter() - started) * 1000
+        self.last_snapshot_games = len(snapshot["games"])
+        return True
+
+    async def restore(self) -> List[GameState]:
+        """Rehidratar partidas desde el último snapshot, si existe"""
+        started = time.perf_counter()
+        snapshot = await asyncio.to_thread(self._read)
+        if not snapshot:
+            return []
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"Snapshot de estado con versión desconocida: {snapshot.get('version')}")
+            return []
+
+        # Un snapshot más antiguo que el TTL de inactividad solo contendría partidas a desalojar
+        age = time.time() - snapshot.get("saved_at", 0)
+        if age > game_state_manager.idle_ttl_seconds:
+            logger.info(f"Snapshot de estado descartado por antigüedad ({int(age)}s)")
+            return []
+
+        restored = await game_state_manager.restore_snapshot(snapshot.get("games", []))
+
+        self.last_restore_ms = (time.perf_counter() - started) * 1000
+        self.last_restore_games = len(restored)
+        logger.info(f"Rehidratadas {len(restored)} partidas en {self.last_restore_ms:.1f}ms")
+        return restored
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Obtener métricas de snapshots y rehidratación"""
+        return {
+            "path": self.path,
+            "interval_seconds": self.interval_seconds,
+            "last_snapshot_at": self.last_snapshot_at,
+            "last_snapshot_ms": round(self.last_snapshot_ms, 3),
+            "last_snapshot_games": self.last_snapshot_games,
+            "last_restore_ms": round(self.last_restore_ms, 3),
+            "last_restore_games": self.last_restore_games
+        }
+
+    async def _snapshot_loop(self):
+        """Loop de snapshots periódicos"""
+        while True:
+            try:
+                await asyncio.sleep(self.interval_seconds)
+                await self.save()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error en loop de snapshots: {e}")
+
+    def _write(self, snapshot: Dict[str, Any]):
+        """Escritura atómica: fichero temporal + rename"""
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error leyendo snapshot de estado {self.path}: {e}")
+            return None
+
+
+# Instancia global del servicio de snapshots
+state_snapshot_service = StateSnapshotService()
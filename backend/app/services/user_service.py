@@ -3,9 +3,11 @@ Módulo de servicios para la gestión de usuarios.
 Incluye funciones para crear, obtener, actualizar y listar usuarios usando la base de datos JSON.
 """
 
-from app.database import save_user, load_user, load_all_users, delete_user as db_delete_user
+from app.database import (
+    save_user, load_user, load_all_users, count_users, load_usernames, find_user_by_username, delete_user as db_delete_user
+)
 from app.models.user import User, UserUpdate, UserAccessRole, UserStatus, UserStatusUpdate
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List
 from datetime import datetime, UTC
 from app.core.security import hash_password
 
@@ -16,8 +18,7 @@ class UserService:
     @staticmethod
     def create_user(user: User) -> None:
         """Crea un nuevo usuario en la base de datos."""
-        users = load_all_users()
-        if not users:
+        if count_users() == 0:
             user.role = UserAccessRole.ADMIN  # Primer usuario es admin
         user.created_at = datetime.now(UTC)
         user.updated_at = datetime.now(UTC)
@@ -76,10 +77,14 @@ class UserService:
             # Si no se encuentra el usuario, retornar un nombre genérico o None
             return "unknown name"
 
+    @staticmethod
+    def get_usernames_by_ids(user_ids: Iterable[str]) -> Dict[str, str]:
+        """Obtiene los nombres de usuario de varios IDs con una única consulta."""
+        return load_usernames(user_ids)
+
 # Funciones existentes mantenidas para compatibilidad durante la refactorización
 def create_user(user: User) -> None:
-    users = load_all_users()
-    if not users:
+    if count_users() == 0:
         user.role = UserAccessRole.ADMIN  # Primer usuario es admin
     user.created_at = datetime.now(UTC)
     user.updated_at = datetime.now(UTC)
@@ -100,6 +105,16 @@ def update_user(user: User, update: UserUpdate) -> User:
 def get_user(user_id: str) -> Optional[User]:
     return load_user(user_id)
 
+def get_user_by_username(username: str) -> Optional[User]:
+    return find_user_by_username(username)
+
+def update_password_hash(user: User, hashed_password: str) -> User:
+    """Sustituye el hash de la contraseña (p. ej. al regenerarlo con otro coste en el login)."""
+    user.hashed_password = hashed_password
+    user.updated_at = datetime.now(UTC)
+    save_user(user)
+    return user
+
 def get_all_users() -> List[User]:
     return load_all_users()
 
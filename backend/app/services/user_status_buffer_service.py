@@ -0,0 +1,170 @@
+"""
+User Status Buffer Service
+Buffer de escritura de los cambios automáticos de estado de usuario (conexión y desconexión
+del WebSocket, inicio de partida, muerte de un jugador).
+
+Cada cambio se aplica al instante en memoria y se anota como pendiente; varios cambios del
+mismo usuario se colapsan en el último. Cada poco tiempo los pendientes se escriben en lote
+con un UPDATE ... WHERE id IN (...) por estado, fuera del loop, en lugar de una carga y un
+guardado completo del usuario por cambio. Los estados se conocen en memoria tras la primera
+lectura (una consulta de la columna status para todos los usuarios que falten).
+
+Los cambios explícitos (UPDATE_USER_STATUS, rutas de administración) siguen escribiéndose al
+momento; los automáticos nunca sacan a un usuario del estado baneado.
+"""
+from typing import Dict, Iterable, Optional, Set
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.database import add_user_change_listener, load_user_statuses, reset_user_statuses, update_user_statuses
+from app.models.user import UserStatus
+from app.services.phase_scheduler_service import phase_scheduler
+
+logger = logging.getLogger(__name__)
+
+USER_STATUS_FLUSH_INTERVAL_SECONDS = float(os.getenv("USER_STATUS_FLUSH_INTERVAL_SECONDS", "1.0"))
+
+
+def _parse_status(value: str) -> UserStatus:
+    """Estado almacenado; los valores obsoletos (p. ej. 'active') cuentan como desconectado"""
+    try:
+        return UserStatus(value)
+    except ValueError:
+        return UserStatus.DISCONNECTED
+
+
+class UserStatusBuffer:
+    """Estados de usuario en memoria con escritura diferida y colapsada por usuario"""
+
+    def __init__(self, flush_interval_seconds: float = USER_STATUS_FLUSH_INTERVAL_SECONDS):
+        self.flush_interval_seconds = flush_interval_seconds
+        self._known: Dict[str, UserStatus] = {}    # Último estado conocido (escrito o pendiente)
+        self._pending: Dict[str, UserStatus] = {}  # Cambios aún no escritos
+        self._writing: Set[str] = set()            # Usuarios del lote que se está escribiendo
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_scheduled = False
+
+        # Métricas
+        self.changes_total = 0
+        self.collapsed_total = 0
+        self.flushes_total = 0
+        self.last_flush_size = 0
+        self.last_flush_ms = 0.0
+
+    async def set_status(self, user_id: str, status: UserStatus) -> Optional[UserStatus]:
+        """
+        Cambiar el estado de un usuario.
+
+        Returns:
+            Estado anterior, o None si el usuario no existe o el estado no cambia
+        """
+        return (await self.set_statuses([user_id], status)).get(user_id)
+
+    async def set_statuses(self, user_ids: Iterable[str], status: UserStatus) -> Dict[str, UserStatus]:
+        """
+        Cambiar el estado de varios usuarios.
+
+        Returns:
+            {user_id: estado anterior} solo de los usuarios cuyo estado ha cambiado
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        with self._lock:
+            missing = [user_id for user_id in user_ids if user_id not in self._known]
+        if missing:
+            loaded = await asyncio.to_thread(load_user_statuses, missing)
+            with self._lock:
+                for user_id, value in loaded.items():
+                    self._known.setdefault(user_id, _parse_status(value))
+
+        changed: Dict[str, UserStatus] = {}
+        with self._lock:
+            for user_id in user_ids:
+                old_status = self._known.get(user_id)
+                if old_status is None or old_status == status or old_status == UserStatus.BANNED:
+                    continue
+                self._known[user_id] = status
+                if user_id in self._pending:
+                    self.collapsed_total += 1
+                self._pending[user_id] = status
+                changed[user_id] = old_status
+            self.changes_total += len(changed)
+            if changed:
+                self._schedule_flush()
+        return changed
+
+    async def flush(self):
+        """Escribir los cambios pendientes en lote, fuera del loop"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            with self._lock:
+                self._flush_scheduled = False
+                batch, self._pending = self._pending, {}
+                self._writing = set(batch)
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(update_user_statuses, {user_id: status.value for user_id, status in batch.items()})
+            except Exception as e:
+                logger.error(f"Error guardando {len(batch)} estados de usuario: {e}")
+                with self._lock:
+                    # Los cambios llegados mientras tanto son más recientes y prevalecen
+                    for user_id, status in batch.items():
+                        self._pending.setdefault(user_id, status)
+                    self._schedule_flush()
+                return
+            finally:
+                with self._lock:
+                    self._writing = set()
+
+            self.flushes_total += 1
+            self.last_flush_size = len(batch)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    async def reset_all(self, status: UserStatus = UserStatus.DISCONNECTED) -> int:
+        """Poner a todos los usuarios no baneados en un estado con una sola sentencia (al arrancar)"""
+        with self._lock:
+            self._known.clear()
+            self._pending.clear()
+        updated = await asyncio.to_thread(reset_user_statuses, status.value)
+        logger.info(f"Estado de {updated} usuarios restablecido a '{status.value}'")
+        return updated
+
+    def on_user_changed(self, user_id: str):
+        """
+        Olvidar un usuario guardado por otra vía (listener de database): un cambio explícito
+        prevalece sobre el automático pendiente, y el estado se vuelve a leer cuando haga falta.
+        """
+        with self._lock:
+            if user_id not in self._writing:
+                self._known.pop(user_id, None)
+                self._pending.pop(user_id, None)
+
+    def get_metrics(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "known_users": len(self._known),
+                "pending": len(self._pending),
+                "changes_total": self.changes_total,
+                "collapsed_total": self.collapsed_total,
+                "flushes_total": self.flushes_total,
+                "last_flush_size": self.last_flush_size,
+                "last_flush_ms": round(self.last_flush_ms, 2)
+            }
+
+    def _schedule_flush(self):
+        """Programar la escritura del lote (con el lock tomado)"""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            phase_scheduler.schedule_threadsafe("user-status-flush", self.flush_interval_seconds, self.flush)
+
+
+# Instancia global del buffer de estados de usuario
+user_status_buffer = UserStatusBuffer()
+add_user_change_listener(user_status_buffer.on_user_changed)
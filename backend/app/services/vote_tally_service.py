@@ -0,0 +1,208 @@
+"""
+Vote Tally Service
+Recuento incremental de votos: cuentas por objetivo actualizadas en cada voto o cambio
+de voto (con peso, p. ej. el voto doble del alguacil), más el líder y el conjunto de
+empatados mantenidos en O(1), de modo que las consultas de estado no recuentan ni
+ordenan todos los votos.
+
+Cada cambio del recuento produce un delta compacto (solo los objetivos afectados y el
+nuevo líder) para difundir a los clientes en lugar del estado completo.
+"""
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import threading
+
+from app.database import get_game_version, in_game_transaction, load_game
+from app.models.game_and_roles import Game
+from app.services.day_resolution_service import get_vote_weight
+
+
+class VoteTally:
+    """Recuento incremental con seguimiento del líder y de los empates"""
+
+    def __init__(self):
+        self.votes: Dict[str, Tuple[str, int]] = {}  # voter_id -> (target_id, peso)
+        self.counts: Dict[str, int] = {}  # target_id -> votos ponderados
+        self.buckets: Dict[int, Set[str]] = {}  # votos -> objetivos con ese recuento
+        self.max_count = 0
+        self.version = 0  # Se incrementa con cada cambio del recuento
+        self._sorted_cache: Optional[Tuple[int, List[Tuple[str, int]]]] = None
+
+    @classmethod
+    def from_votes(cls, votes: Dict[str, str], weight_fn: Callable[[str], int] = lambda voter_id: 1) -> "VoteTally":
+        """Construir un recuento a partir de un mapa voter_id -> target_id"""
+        tally = cls()
+        for voter_id, target_id in votes.items():
+            tally.cast(voter_id, target_id, weight_fn(voter_id))
+        return tally
+
+    def copy(self) -> "VoteTally":
+        tally = VoteTally()
+        tally.votes = dict(self.votes)
+        tally.counts = dict(self.counts)
+        tally.buckets = {count: set(targets) for count, targets in self.buckets.items()}
+        tally.max_count = self.max_count
+        tally.version = self.version
+        return tally
+
+    # --- Consultas O(1) ---
+
+    @property
+    def total_votes(self) -> int:
+        return len(self.votes)
+
+    @property
+    def leaders(self) -> Set[str]:
+        """Objetivos con el máximo de votos (más de uno si hay empate)"""
+        return self.buckets.get(self.max_count, set()) if self.max_count > 0 else set()
+
+    @property
+    def is_tie(self) -> bool:
+        return len(self.leaders) > 1
+
+    def get_winner(self) -> Optional[str]:
+        """Ganador claro, o None si no hay votos o hay empate"""
+        leaders = self.leaders
+        return next(iter(leaders)) if len(leaders) == 1 else None
+
+    def get_target(self, voter_id: str) -> Optional[str]:
+        vote = self.votes.get(voter_id)
+        return vote[0] if vote else None
+
+    def get_sorted_candidates(self) -> List[Tuple[str, int]]:
+        """Candidatos ordenados por votos y por ID; se ordena una vez por versión"""
+        if self._sorted_cache is None or self._sorted_cache[0] != self.version:
+            ordered = sorted(self.counts.items(), key=lambda x: (-x[1], x[0]))
+            self._sorted_cache = (self.version, ordered)
+        return self._sorted_cache[1]
+
+    # --- Cambios ---
+
+    def cast(self, voter_id: str, target_id: str, weight: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        Registrar un voto o cambio de voto.
+
+        Returns:
+            Delta compacto del recuento, o None si el voto no cambia nada
+        """
+        previous = self.votes.get(voter_id)
+        if previous == (target_id, weight):
+            return None
+
+        changes: Dict[str, int] = {}
+        if previous:
+            self._add(previous[0], -previous[1])
+            changes[previous[0]] = self.counts.get(previous[0], 0)
+        self.votes[voter_id] = (target_id, weight)
+        self._add(target_id, weight)
+        changes[target_id] = self.counts[target_id]
+
+        return self._delta(voter_id, previous[0] if previous else None, target_id, changes)
+
+    def retract(self, voter_id: str) -> Optional[Dict[str, Any]]:
+        """Retirar el voto de un jugador (p. ej. porque ha muerto)"""
+        previous = self.votes.pop(voter_id, None)
+        if not previous:
+            return None
+        self._add(previous[0], -previous[1])
+        return self._delta(voter_id, previous[0], None, {previous[0]: self.counts.get(previous[0], 0)})
+
+    def _add(self, target_id: str, amount: int):
+        """Mover un objetivo de cubeta y mantener el máximo"""
+        old_count = self.counts.get(target_id, 0)
+        new_count = old_count + amount
+
+        if old_count > 0:
+            bucket = self.buckets[old_count]
+            bucket.discard(target_id)
+            if not bucket:
+                del self.buckets[old_count]
+        if new_count > 0:
+            self.counts[target_id] = new_count
+            self.buckets.setdefault(new_count, set()).add(target_id)
+        else:
+            self.counts.pop(target_id, None)
+
+        if new_count > self.max_count:
+            self.max_count = new_count
+        elif old_count == self.max_count and self.max_count not in self.buckets:
+            # El máximo solo puede bajar tanto como el peso del voto retirado
+            while self.max_count > 0 and self.max_count not in self.buckets:
+                self.max_count -= 1
+
+        self.version += 1
+
+    def _delta(self, voter_id: str, previous_target: Optional[str], target_id: Optional[str], changes: Dict[str, int]) -> Dict[str, Any]:
+        return {
+            "voter_id": voter_id,
+            "previous_target": previous_target,
+            "target_id": target_id,
+            "changes": changes,
+            "leaders": sorted(self.leaders),
+            "is_tie": self.is_tie,
+            "total_votes": self.total_votes
+        }
+
+
+class DayVoteTallyService:
+    """
+    Recuentos de los votos diurnos persistidos en game.day_votes (ruta REST), con el
+    mismo criterio que la resolución del día: votantes y objetivos vivos y voto doble
+    del alguacil. Validados contra la versión en memoria de la partida.
+    """
+
+    def __init__(self):
+        self._tallies: Dict[str, Tuple[int, VoteTally]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, game: Game, version: Optional[int] = None) -> VoteTally:
+        """Recuento vigente de una partida ya cargada"""
+        if in_game_transaction(game.id):
+            return self.build(game)
+        if version is None:
+            version = get_game_version(game.id)
+        with self._lock:
+            cached = self._tallies.get(game.id)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        tally = self.build(game)
+        with self._lock:
+            self._tallies[game.id] = (version, tally)
+        return tally
+
+    def get_by_id(self, game_id: str) -> Optional[VoteTally]:
+        """Recuento vigente por ID; solo carga la partida si el recuento está desactualizado"""
+        version = get_game_version(game_id)
+        if not in_game_transaction(game_id):
+            with self._lock:
+                cached = self._tallies.get(game_id)
+                if cached and cached[0] == version:
+                    return cached[1]
+
+        game = load_game(game_id)
+        return self.get(game, version) if game else None
+
+    def commit(self, game_id: str, tally: VoteTally):
+        """Adoptar un recuento mantenido incrementalmente tras guardar la partida"""
+        if in_game_transaction(game_id):
+            return
+        with self._lock:
+            self._tallies[game_id] = (get_game_version(game_id), tally)
+
+    def discard(self, game_id: str):
+        with self._lock:
+            self._tallies.pop(game_id, None)
+
+    @staticmethod
+    def build(game: Game) -> VoteTally:
+        """Construir el recuento desde game.day_votes"""
+        valid_votes = {
+            voter_id: target_id for voter_id, target_id in game.day_votes.items()
+            if voter_id in game.roles and game.roles[voter_id].is_alive
+            and target_id in game.roles and game.roles[target_id].is_alive
+        }
+        return VoteTally.from_votes(valid_votes, lambda voter_id: get_vote_weight(game, voter_id))
+
+
+# Instancia global de recuentos diurnos
+day_vote_tally_service = DayVoteTallyService()
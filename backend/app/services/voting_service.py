@@ -1,15 +1,30 @@
 """
 Sistema de Votaciones para el juego Hombres Lobo
 Maneja votaciones diurnas, conteo de votos, empates y eliminaciones
+
+Motor único de votaciones para REST y WebSocket: las sesiones se identifican por
+(game_id, vote_type), de modo que una partida puede tener varias votaciones a la vez
+(p. ej. elección de alguacil y desempate). Los votos se aplican en memoria y las
+sesiones modificadas se persisten por lotes en la tabla voting_sessions.
 """
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
 from enum import Enum
+import asyncio
 import logging
+import os
+import threading
 from dataclasses import dataclass, field
+from app.database import delete_voting_sessions, load_voting_sessions, save_voting_sessions
+from app.services.pending_actions_service import PHASE_VOTING, pending_actions_service
+from app.services.phase_scheduler_service import phase_scheduler
+from app.services.game_event_service import game_event_service
+from app.services.vote_tally_service import VoteTally
 
 logger = logging.getLogger(__name__)
 
+VOTE_FLUSH_INTERVAL_SECONDS = float(os.getenv("VOTE_FLUSH_INTERVAL_SECONDS", "2"))
+
 class VoteType(str, Enum):
     """Tipos de votación"""
     DAY_VOTE = "day_vote"           # Votación diurna general
@@ -46,57 +61,104 @@ class VotingSession:
     duration_seconds: int = 120  # 2 minutos por defecto
     result: Optional[str] = None  # ID del jugador eliminado
     is_tie: bool = False
+    tally: VoteTally = field(default_factory=VoteTally)  # Recuento incremental de los votos
     
     def get_vote_counts(self) -> Dict[str, int]:
         """Obtener conteo de votos por target"""
-        counts = {}
-        for vote in self.votes.values():
-            target = vote.target_id
-            counts[target] = counts.get(target, 0) + vote.vote_weight
-        return counts
+        return dict(self.tally.counts)
     
     def get_leading_candidates(self) -> List[Tuple[str, int]]:
-        """Obtener candidatos con más votos (ordenados)"""
-        counts = self.get_vote_counts()
-        if not counts:
-            return []
-        
-        # Ordenar por votos (descendente) y luego por ID (para consistencia)
-        sorted_candidates = sorted(
-            counts.items(),
-            key=lambda x: (-x[1], x[0])
+        """Obtener candidatos con más votos (ordenados por votos y luego por ID)"""
+        return self.tally.get_sorted_candidates()
+    
+    def get_tied_candidates(self) -> List[str]:
+        """Candidatos empatados en cabeza"""
+        return sorted(self.tally.leaders) if self.tally.is_tie else []
+    
+    @property
+    def session_id(self) -> str:
+        return f"{self.game_id}:{self.vote_type.value}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializar la sesión para su persistencia"""
+        return {
+            "game_id": self.game_id,
+            "vote_type": self.vote_type.value,
+            "status": self.status.value,
+            "eligible_voters": list(self.eligible_voters),
+            "vote_targets": list(self.vote_targets),
+            "votes": [
+                [vote.voter_id, vote.target_id, vote.timestamp.isoformat(), vote.vote_weight]
+                for vote in self.votes.values()
+            ],
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "duration_seconds": self.duration_seconds,
+            "result": self.result,
+            "is_tie": self.is_tie
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VotingSession":
+        """Reconstruir una sesión persistida, incluido su recuento"""
+        session = cls(
+            game_id=data["game_id"],
+            vote_type=VoteType(data["vote_type"]),
+            status=VoteStatus(data["status"]),
+            eligible_voters=set(data["eligible_voters"]),
+            vote_targets=set(data["vote_targets"]),
+            start_time=datetime.fromisoformat(data["start_time"]) if data.get("start_time") else None,
+            end_time=datetime.fromisoformat(data["end_time"]) if data.get("end_time") else None,
+            duration_seconds=data["duration_seconds"],
+            result=data.get("result"),
+            is_tie=data.get("is_tie", False)
         )
-        return sorted_candidates
+        for voter_id, target_id, timestamp, vote_weight in data["votes"]:
+            session.votes[voter_id] = Vote(
+                voter_id=voter_id,
+                target_id=target_id,
+                timestamp=datetime.fromisoformat(timestamp),
+                vote_weight=vote_weight
+            )
+            session.tally.cast(voter_id, target_id, vote_weight)
+        return session
     
     def get_winner(self) -> Optional[str]:
         """Determinar ganador de la votación"""
-        candidates = self.get_leading_candidates()
-        if not candidates:
-            return None
-        
-        # Verificar si hay empate
-        top_votes = candidates[0][1]
-        tied_candidates = [c for c, v in candidates if v == top_votes]
-        
-        if len(tied_candidates) > 1:
-            self.is_tie = True
+        # Verificar si hay empate (el líder y los empatados los mantiene el recuento)
+        self.is_tie = self.tally.is_tie
+        if self.is_tie:
             return None  # Empate, necesita resolución
         
-        self.is_tie = False
-        return candidates[0][0]  # Ganador claro
+        return self.tally.get_winner()  # Ganador claro (o None sin votos)
+
+SessionKey = Tuple[str, VoteType]
 
 class VotingService:
     """Servicio principal de votaciones"""
     
-    def __init__(self):
-        # game_id -> VotingSession
-        self.active_sessions: Dict[str, VotingSession] = {}
+    def __init__(self, flush_interval_seconds: float = VOTE_FLUSH_INTERVAL_SECONDS):
+        # (game_id, vote_type) -> VotingSession
+        self.active_sessions: Dict[SessionKey, VotingSession] = {}
         # Para callbacks de eventos
         self.vote_callbacks: List = []
         self.result_callbacks: List = []
+        # (game_id, vote_type) -> ((versión del recuento, estado), estado serializado)
+        self._status_cache: Dict[SessionKey, Tuple[Tuple, Dict]] = {}
+        
+        # Las rutas REST síncronas votan desde el threadpool
+        self._lock = threading.RLock()
+        
+        # Persistencia por lotes
+        self.flush_interval_seconds = flush_interval_seconds
+        self._dirty: Set[SessionKey] = set()
+        self._deleted: Set[str] = set()
+        self._flush_scheduled = False
+        self.flushes_total = 0
+        self.sessions_written_total = 0
     
     def add_vote_callback(self, callback):
-        """Agregar callback para cuando se emite un voto"""
+        """Agregar callback async (game_id, vote_type, voter_id, target_id, voto anterior, delta) para cuando se emite un voto"""
         self.vote_callbacks.append(callback)
     
     def add_result_callback(self, callback):
@@ -111,97 +173,86 @@ class VotingService:
         vote_targets: List[str],
         duration_seconds: int = 120
     ) -> VotingSession:
-        """Crear nueva sesión de votación"""
-        logger.info(f"Creando sesión de votación {vote_type} para juego {game_id}")
-        
-        session = VotingSession(
-            game_id=game_id,
-            vote_type=vote_type,
-            eligible_voters=set(eligible_voters),
-            vote_targets=set(vote_targets),
-            duration_seconds=duration_seconds
-        )
-        
-        self.active_sessions[game_id] = session
-        return session
+        """
+        Crear nueva sesión de votación. Sustituye a una anterior del mismo tipo ya resuelta,
+        pero nunca a una activa (se devuelve esa, con sus votos).
+        """
+        with self._lock:
+            session = self.active_sessions.get((game_id, vote_type))
+            if session and session.status == VoteStatus.ACTIVE:
+                logger.warning(f"Ya hay una votación {vote_type.value} activa para juego {game_id}; se conserva")
+                return session
+            logger.info(f"Creando sesión de votación {vote_type} para juego {game_id}")
+            return self._create_session(game_id, vote_type, eligible_voters, vote_targets, duration_seconds)
     
-    async def start_voting_session(self, game_id: str) -> bool:
+    async def start_voting_session(self, game_id: str, vote_type: VoteType = VoteType.DAY_VOTE) -> bool:
         """Iniciar sesión de votación"""
-        if game_id not in self.active_sessions:
-            logger.error(f"No hay sesión de votación para juego {game_id}")
-            return False
-        
-        session = self.active_sessions[game_id]
-        if session.status != VoteStatus.PENDING:
-            logger.error(f"Sesión de votación {game_id} no está en estado PENDING")
-            return False
-        
-        session.status = VoteStatus.ACTIVE
-        session.start_time = datetime.now()
-        
-        logger.info(f"Votación iniciada para juego {game_id} - Duración: {session.duration_seconds}s")
-        return True
+        return self._start_session(game_id, vote_type)
+    
+    def ensure_active_session(
+        self,
+        game_id: str,
+        vote_type: VoteType,
+        eligible_voters: Iterable[str],
+        vote_targets: Iterable[str],
+        duration_seconds: int = 120
+    ) -> VotingSession:
+        """Obtener la sesión activa de un tipo, creándola e iniciándola si no existe (ruta REST)"""
+        with self._lock:
+            session = self.active_sessions.get((game_id, vote_type))
+            if session and session.status == VoteStatus.ACTIVE:
+                return session
+            session = self._create_session(game_id, vote_type, list(eligible_voters), list(vote_targets), duration_seconds)
+            self._start_session(game_id, vote_type)
+            return session
     
     async def cast_vote(
         self,
         game_id: str,
         voter_id: str,
         target_id: str,
-        vote_weight: int = 1
+        vote_weight: int = 1,
+        vote_type: VoteType = VoteType.DAY_VOTE
     ) -> Tuple[bool, str]:
         """Emitir un voto"""
-        if game_id not in self.active_sessions:
-            return False, "No hay votación activa"
-        
-        session = self.active_sessions[game_id]
-        
-        # Validaciones
-        if session.status != VoteStatus.ACTIVE:
-            return False, "La votación no está activa"
-        
-        if voter_id not in session.eligible_voters:
-            return False, "No tienes derecho a voto"
-        
-        if target_id not in session.vote_targets:
-            return False, "Objetivo de voto inválido"
-        
-        # Registrar voto (sobreescribe voto anterior si existe)
-        vote = Vote(
-            voter_id=voter_id,
-            target_id=target_id,
-            vote_weight=vote_weight
-        )
-        
-        old_vote = session.votes.get(voter_id)
-        session.votes[voter_id] = vote
-        
-        # Notificar callbacks
-        for callback in self.vote_callbacks:
-            try:
-                if hasattr(callback, '__call__'):
-                    await callback(game_id, voter_id, target_id, old_vote)
-            except Exception as e:
-                logger.error(f"Error en vote callback: {e}")
-        
-        logger.info(f"Voto registrado: {voter_id} -> {target_id} en juego {game_id}")
-        return True, "Voto registrado"
+        success, message, old_vote, delta = self._apply_vote(game_id, vote_type, voter_id, target_id, vote_weight)
+        if success:
+            await self._notify_vote(game_id, vote_type, voter_id, target_id, old_vote, delta)
+        return success, message
     
-    async def close_voting_session(self, game_id: str) -> bool:
+    def cast_vote_sync(
+        self,
+        game_id: str,
+        voter_id: str,
+        target_id: str,
+        vote_weight: int = 1,
+        vote_type: VoteType = VoteType.DAY_VOTE
+    ) -> Tuple[bool, str]:
+        """Emitir un voto desde código síncrono (rutas REST); la notificación se despacha al loop"""
+        success, message, old_vote, delta = self._apply_vote(game_id, vote_type, voter_id, target_id, vote_weight)
+        if success:
+            phase_scheduler.call_soon_threadsafe(
+                f"vote-notify:{game_id}", lambda: self._notify_vote(game_id, vote_type, voter_id, target_id, old_vote, delta)
+            )
+        return success, message
+    
+    async def close_voting_session(self, game_id: str, vote_type: VoteType = VoteType.DAY_VOTE) -> bool:
         """Cerrar sesión de votación y calcular resultado"""
-        if game_id not in self.active_sessions:
-            return False
-        
-        session = self.active_sessions[game_id]
-        if session.status != VoteStatus.ACTIVE:
-            return False
-        
-        session.status = VoteStatus.CLOSED
-        session.end_time = datetime.now()
-        
-        # Calcular resultado
-        winner = session.get_winner()
-        session.result = winner
-        session.status = VoteStatus.FINISHED
+        with self._lock:
+            session = self.active_sessions.get((game_id, vote_type))
+            if not session or session.status != VoteStatus.ACTIVE:
+                return False
+            
+            session.status = VoteStatus.CLOSED
+            session.end_time = datetime.now()
+            if vote_type == VoteType.DAY_VOTE:
+                pending_actions_service.clear_phase(game_id, PHASE_VOTING)
+            
+            # Calcular resultado
+            winner = session.get_winner()
+            session.result = winner
+            session.status = VoteStatus.FINISHED
+            self._mark_dirty((game_id, vote_type))
         
         # Notificar callbacks
         for callback in self.result_callbacks:
@@ -211,21 +262,48 @@ class VotingService:
             except Exception as e:
                 logger.error(f"Error en result callback: {e}")
         
-        logger.info(f"Votación cerrada para juego {game_id} - Resultado: {winner} (Empate: {session.is_tie})")
+        logger.info(f"Votación {vote_type.value} cerrada para juego {game_id} - Resultado: {winner} (Empate: {session.is_tie})")
         return True
     
-    def get_voting_session(self, game_id: str) -> Optional[VotingSession]:
-        """Obtener sesión de votación activa"""
-        return self.active_sessions.get(game_id)
+    def get_voting_session(self, game_id: str, vote_type: VoteType = VoteType.DAY_VOTE) -> Optional[VotingSession]:
+        """Obtener sesión de votación de un tipo"""
+        return self.active_sessions.get((game_id, vote_type))
+    
+    def get_game_sessions(self, game_id: str) -> List[VotingSession]:
+        """Obtener todas las sesiones de votación de una partida"""
+        with self._lock:
+            return [session for (session_game_id, _), session in self.active_sessions.items() if session_game_id == game_id]
+    
+    def get_votes(self, game_id: str, vote_type: VoteType = VoteType.DAY_VOTE) -> Dict[str, str]:
+        """Votos actuales de una sesión como voter_id -> target_id"""
+        session = self.get_voting_session(game_id, vote_type)
+        if not session:
+            return {}
+        with self._lock:
+            return {voter_id: vote.target_id for voter_id, vote in session.votes.items()}
     
-    def get_voting_status(self, game_id: str) -> Dict:
+    def get_voting_status(self, game_id: str, vote_type: VoteType = VoteType.DAY_VOTE) -> Dict:
         """Obtener estado de la votación para cliente"""
-        session = self.get_voting_session(game_id)
+        session = self.get_voting_session(game_id, vote_type)
         if not session:
             return {"status": "no_voting", "message": "No hay votación activa"}
         
-        vote_counts = session.get_vote_counts()
-        leading_candidates = session.get_leading_candidates()
+        # El estado solo se reconstruye cuando cambia el recuento o la sesión
+        with self._lock:
+            key = (session.tally.version, session.status, session.result, session.is_tie)
+            cached = self._status_cache.get((game_id, vote_type))
+            if not cached or cached[0] != key:
+                cached = (key, {
+                    "status": session.status.value,
+                    "vote_type": session.vote_type.value,
+                    "vote_counts": session.get_vote_counts(),
+                    "leading_candidates": session.get_leading_candidates(),
+                    "total_votes": session.tally.total_votes,
+                    "eligible_voters": len(session.eligible_voters),
+                    "is_tie": session.is_tie,
+                    "result": session.result
+                })
+                self._status_cache[(game_id, vote_type)] = cached
         
         # Tiempo restante
         time_remaining = None
@@ -233,23 +311,212 @@ class VotingService:
             elapsed = (datetime.now() - session.start_time).total_seconds()
             time_remaining = max(0, session.duration_seconds - elapsed)
         
+        return {**cached[1], "time_remaining": time_remaining}
+    
+    def discard_session(self, game_id: str, vote_type: VoteType = VoteType.DAY_VOTE):
+        """Descartar una sesión ya resuelta (p. ej. tras linchar) y borrarla del almacenamiento"""
+        with self._lock:
+            session = self.active_sessions.pop((game_id, vote_type), None)
+            self._status_cache.pop((game_id, vote_type), None)
+            self._dirty.discard((game_id, vote_type))
+            if session:
+                self._deleted.add(session.session_id)
+                self._schedule_flush()
+        if session and vote_type == VoteType.DAY_VOTE:
+            pending_actions_service.clear_phase(game_id, PHASE_VOTING)
+    
+    async def cleanup_session(self, game_id: str):
+        """Limpiar todas las sesiones de votación de una partida"""
+        for session in self.get_game_sessions(game_id):
+            self.discard_session(game_id, session.vote_type)
+            logger.info(f"Sesión de votación {session.session_id} eliminada")
+    
+    # --- Persistencia por lotes ---
+    
+    async def flush(self):
+        """Persistir en una única transacción las sesiones modificadas y las borradas"""
+        with self._lock:
+            self._flush_scheduled = False
+            dirty = [self.active_sessions[key].to_dict() for key in self._dirty if key in self.active_sessions]
+            deleted = list(self._deleted)
+            self._dirty.clear()
+            self._deleted.clear()
+        
+        if not dirty and not deleted:
+            return
+        try:
+            await asyncio.to_thread(self._write, dirty, deleted)
+        except Exception as e:
+            logger.error(f"Error persistiendo sesiones de votación: {e}")
+            # Reintentar en el siguiente lote
+            with self._lock:
+                self._dirty.update(
+                    (data["game_id"], VoteType(data["vote_type"])) for data in dirty
+                    if (data["game_id"], VoteType(data["vote_type"])) in self.active_sessions
+                )
+                self._deleted.update(deleted)
+                self._schedule_flush()
+            return
+        
+        self.flushes_total += 1
+        self.sessions_written_total += len(dirty)
+    
+    async def restore(self) -> int:
+        """
+        Cargar las sesiones persistidas aún abiertas al arrancar y reconstruir sus votantes
+        pendientes. Las ya resueltas no se recuperan y se borran del almacenamiento.
+        """
+        sessions = await asyncio.to_thread(load_voting_sessions)
+        restored = 0
+        with self._lock:
+            for data in sessions:
+                session = VotingSession.from_dict(data)
+                if session.status not in (VoteStatus.PENDING, VoteStatus.ACTIVE):
+                    self._deleted.add(session.session_id)
+                    continue
+                self.active_sessions[(session.game_id, session.vote_type)] = session
+                restored += 1
+                
+                if session.status == VoteStatus.ACTIVE and session.vote_type == VoteType.DAY_VOTE:
+                    pending_actions_service.start_custom_phase(
+                        session.game_id, PHASE_VOTING, 0,
+                        {(voter_id, "day_vote") for voter_id in session.eligible_voters - set(session.votes)}
+                    )
+            if self._deleted:
+                self._schedule_flush()
+        logger.info(f"Restauradas {restored} sesiones de votación ({len(sessions) - restored} resueltas descartadas)")
+        return restored
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métricas del motor de votaciones"""
         return {
-            "status": session.status.value,
-            "vote_type": session.vote_type.value,
-            "vote_counts": vote_counts,
-            "leading_candidates": leading_candidates,
-            "total_votes": len(session.votes),
-            "eligible_voters": len(session.eligible_voters),
-            "time_remaining": time_remaining,
-            "is_tie": session.is_tie,
-            "result": session.result
+            "sessions": len(self.active_sessions),
+            "pending_writes": len(self._dirty) + len(self._deleted),
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "flushes_total": self.flushes_total,
+            "sessions_written_total": self.sessions_written_total
         }
     
-    async def cleanup_session(self, game_id: str):
-        """Limpiar sesión de votación terminada"""
-        if game_id in self.active_sessions:
-            del self.active_sessions[game_id]
-            logger.info(f"Sesión de votación {game_id} eliminada")
+    # --- Internos ---
+    
+    def _create_session(
+        self,
+        game_id: str,
+        vote_type: VoteType,
+        eligible_voters: List[str],
+        vote_targets: List[str],
+        duration_seconds: int
+    ) -> VotingSession:
+        session = VotingSession(
+            game_id=game_id,
+            vote_type=vote_type,
+            eligible_voters=set(eligible_voters),
+            vote_targets=set(vote_targets),
+            duration_seconds=duration_seconds
+        )
+        with self._lock:
+            self.active_sessions[(game_id, vote_type)] = session
+            self._status_cache.pop((game_id, vote_type), None)
+            self._mark_dirty((game_id, vote_type))
+        return session
+    
+    def _start_session(self, game_id: str, vote_type: VoteType) -> bool:
+        with self._lock:
+            session = self.active_sessions.get((game_id, vote_type))
+            if not session:
+                logger.error(f"No hay sesión de votación {vote_type.value} para juego {game_id}")
+                return False
+            
+            if session.status != VoteStatus.PENDING:
+                logger.error(f"Sesión de votación {session.session_id} no está en estado PENDING")
+                return False
+            
+            session.status = VoteStatus.ACTIVE
+            session.start_time = datetime.now()
+            self._mark_dirty((game_id, vote_type))
+        
+        # Seguimiento de votantes pendientes para cerrar la fase en cuanto voten todos
+        if vote_type == VoteType.DAY_VOTE:
+            pending_actions_service.start_custom_phase(
+                game_id, PHASE_VOTING, 0, {(voter_id, "day_vote") for voter_id in session.eligible_voters}
+            )
+        
+        logger.info(f"Votación {vote_type.value} iniciada para juego {game_id} - Duración: {session.duration_seconds}s")
+        return True
+    
+    def _apply_vote(
+        self,
+        game_id: str,
+        vote_type: VoteType,
+        voter_id: str,
+        target_id: str,
+        vote_weight: int
+    ) -> Tuple[bool, str, Optional[Vote], Optional[Dict[str, Any]]]:
+        """Validar y aplicar un voto en memoria; devuelve (éxito, mensaje, voto anterior, delta)"""
+        with self._lock:
+            session = self.active_sessions.get((game_id, vote_type))
+            if not session:
+                return False, "No hay votación activa", None, None
+            
+            # Validaciones
+            if session.status != VoteStatus.ACTIVE:
+                return False, "La votación no está activa", None, None
+            
+            if voter_id not in session.eligible_voters:
+                return False, "No tienes derecho a voto", None, None
+            
+            if target_id not in session.vote_targets:
+                return False, "Objetivo de voto inválido", None, None
+            
+            # Registrar voto (sobreescribe voto anterior si existe)
+            vote = Vote(
+                voter_id=voter_id,
+                target_id=target_id,
+                vote_weight=vote_weight
+            )
+            
+            old_vote = session.votes.get(voter_id)
+            session.votes[voter_id] = vote
+            delta = session.tally.cast(voter_id, target_id, vote_weight)
+            self._mark_dirty((game_id, vote_type))
+        
+        if vote_type == VoteType.DAY_VOTE:
+            pending_actions_service.mark_done(game_id, PHASE_VOTING, voter_id, "day_vote")
+        game_event_service.record(game_id, "vote_cast", {
+            "vote_type": vote_type.value,
+            "voter_id": voter_id,
+            "target_id": target_id,
+            "vote_weight": vote_weight
+        })
+        logger.info(f"Voto registrado: {voter_id} -> {target_id} ({vote_type.value}) en juego {game_id}")
+        return True, "Voto registrado", old_vote, delta
+    
+    async def _notify_vote(
+        self, game_id: str, vote_type: VoteType, voter_id: str, target_id: str, old_vote: Optional[Vote], delta
+    ):
+        """Notificar callbacks con el delta compacto del recuento"""
+        for callback in self.vote_callbacks:
+            try:
+                if hasattr(callback, '__call__'):
+                    await callback(game_id, vote_type, voter_id, target_id, old_vote, delta)
+            except Exception as e:
+                logger.error(f"Error en vote callback: {e}")
+    
+    def _mark_dirty(self, key: SessionKey):
+        """Marcar una sesión para el siguiente lote de escritura (con el lock tomado)"""
+        self._dirty.add(key)
+        self._deleted.discard(f"{key[0]}:{key[1].value}")
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            phase_scheduler.schedule_threadsafe("voting-flush", self.flush_interval_seconds, self.flush)
+    
+    @staticmethod
+    def _write(sessions: List[Dict[str, Any]], deleted: List[str]):
+        delete_voting_sessions(deleted)
+        save_voting_sessions(sessions)
 
 # Instancia global del servicio de votaciones
 voting_service = VotingService()
@@ -0,0 +1,147 @@
+"""
+Werewolf Consensus Service
+Seguimiento incremental del voto de ataque de los hombres lobo: un recuento vivo
+(VoteTally) con los votos de los lobos vivos, de modo que saber si ya han votado todos
+y si existe un único objetivo con más votos es O(1), sin recargar la partida.
+
+Cuando el consenso se forma, se notifica a los callbacks registrados (la capa
+WebSocket lo envía como consensus_reached solo a las conexiones de los hombres lobo).
+Dentro de una transacción sobre la partida el recuento no se registra y la notificación
+espera al commit (database.run_after_commit), de modo que un voto revertido no se anuncia.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+import logging
+import threading
+
+from app.database import get_game_version, in_game_transaction, run_after_commit
+from app.models.game_and_roles import Game, GameRole
+from app.services.game_index_service import game_index_service
+from app.services.phase_scheduler_service import phase_scheduler
+from app.services.vote_tally_service import VoteTally
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WerewolfConsensus:
+    """Recuento del ataque nocturno de una ronda"""
+    game_id: str
+    round: int
+    version: int
+    alive_werewolves: Set[str] = field(default_factory=set)
+    tally: VoteTally = field(default_factory=VoteTally)
+
+    @classmethod
+    def from_game(cls, game: Game, version: int) -> "WerewolfConsensus":
+        """Construir el recuento desde los votos de ataque ya registrados"""
+        consensus = cls(game_id=game.id, round=game.current_round, version=version)
+        consensus.alive_werewolves = {
+            player_id for player_id, role_info in game.roles.items()
+            if role_info.role == GameRole.WAREWOLF and role_info.is_alive
+        }
+        attack_votes = game.night_actions.get("warewolf_attacks", {})
+        for werewolf_id in consensus.alive_werewolves:
+            if werewolf_id in attack_votes:
+                consensus.tally.cast(werewolf_id, attack_votes[werewolf_id])
+        return consensus
+
+    def copy(self) -> "WerewolfConsensus":
+        return WerewolfConsensus(
+            game_id=self.game_id,
+            round=self.round,
+            version=self.version,
+            alive_werewolves=set(self.alive_werewolves),
+            tally=self.tally.copy()
+        )
+
+    @property
+    def all_voted(self) -> bool:
+        """Todos los lobos vivos han votado (solo cuentan los votos de lobos vivos)"""
+        return bool(self.alive_werewolves) and self.tally.total_votes == len(self.alive_werewolves)
+
+    @property
+    def target(self) -> Optional[str]:
+        """Objetivo del consenso, o None si falta algún voto o hay empate"""
+        return self.tally.get_winner() if self.all_voted else None
+
+    def cast(self, werewolf_id: str, target_id: str):
+        if werewolf_id in self.alive_werewolves:
+            self.tally.cast(werewolf_id, target_id)
+
+
+class WerewolfConsensusService:
+    """Recuentos de ataque por partida, validados contra la versión en memoria de la partida"""
+
+    def __init__(self):
+        self._trackers: Dict[str, WerewolfConsensus] = {}
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable] = []
+        self.consensus_events_total = 0
+
+    def add_consensus_callback(self, callback: Callable):
+        """Registrar callback async (game_id, werewolf_ids, target_id, round) para cuando se forma el consenso"""
+        self._callbacks.append(callback)
+
+    def get(self, game: Game) -> WerewolfConsensus:
+        """Recuento vigente de una partida ya cargada"""
+        version = get_game_version(game.id)
+        if in_game_transaction(game.id):
+            return WerewolfConsensus.from_game(game, version)
+        with self._lock:
+            tracker = self._trackers.get(game.id)
+            if tracker is None or tracker.version != version:
+                tracker = WerewolfConsensus.from_game(game, version)
+                self._trackers[game.id] = tracker
+            return tracker
+
+    def get_by_id(self, game_id: str) -> Optional[WerewolfConsensus]:
+        """Recuento vigente por ID, reutilizando la partida del índice si está al día"""
+        if not in_game_transaction(game_id):
+            with self._lock:
+                tracker = self._trackers.get(game_id)
+                if tracker is not None and tracker.version == get_game_version(game_id):
+                    return tracker
+
+        index = game_index_service.get_by_id(game_id)
+        return self.get(index.game) if index else None
+
+    def get_consensus(self, game_id: str) -> Optional[str]:
+        tracker = self.get_by_id(game_id)
+        return tracker.target if tracker else None
+
+    def begin_attack(self, game: Game) -> WerewolfConsensus:
+        """Copia del recuento vigente para aplicar un voto antes de guardar la partida"""
+        return self.get(game).copy()
+
+    def commit_attack(self, game_id: str, tracker: WerewolfConsensus, previous_target: Optional[str]):
+        """Adoptar el recuento tras guardar la partida y notificar si el consenso acaba de formarse"""
+        if not in_game_transaction(game_id):
+            with self._lock:
+                tracker.version = get_game_version(game_id)
+                self._trackers[game_id] = tracker
+
+        target = tracker.target
+        if target and target != previous_target:
+            werewolf_ids = sorted(tracker.alive_werewolves)
+            run_after_commit(game_id, lambda: self._notify(game_id, werewolf_ids, target, tracker.round))
+
+    def clear_game(self, game_id: str):
+        with self._lock:
+            self._trackers.pop(game_id, None)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"tracked_games": len(self._trackers), "consensus_events_total": self.consensus_events_total}
+
+    def _notify(self, game_id: str, werewolf_ids: List[str], target_id: str, round_number: int):
+        """Despachar los callbacks al loop (los votos llegan desde rutas síncronas)"""
+        self.consensus_events_total += 1
+        logger.info(f"Consenso de los hombres lobo en juego {game_id}: {target_id}")
+        for callback in self._callbacks:
+            phase_scheduler.call_soon_threadsafe(
+                f"werewolf-consensus:{game_id}", lambda cb=callback: cb(game_id, werewolf_ids, target_id, round_number)
+            )
+
+
+# Instancia global del seguimiento de consenso
+werewolf_consensus_service = WerewolfConsensusService()
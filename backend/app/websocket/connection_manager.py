@@ -9,6 +9,7 @@ import asyncio
 import uuid
 from datetime import datetime
 import logging
+from app.services.presence_service import presence_service
 
 class ConnectionManager:
     def __init__(self):
@@ -55,7 +56,8 @@ class ConnectionManager:
         if len(self.active_connections) == 1 and not self.heartbeat_task:
             self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         
-        # Notificar cambio de estado a conectado (se llama desde websocket_endpoint)
+        # Registrar presencia (notifica el cambio de estado si es la primera conexión del usuario)
+        await presence_service.connect(user_id, connection_id, game_id)
         return connection_id
 
     async def disconnect(self, connection_id: str):
@@ -82,6 +84,9 @@ class ConnectionManager:
             del self.connection_info[connection_id]
             if connection_id in self.connection_users:
                 del self.connection_users[connection_id]
+            
+            # La salida del usuario se notifica si no reconecta dentro del margen de presencia
+            await presence_service.disconnect(connection_id)
         
         # Retornar user_id para llamadas externas de actualización de estado
         return user_id
@@ -103,6 +108,7 @@ class ConnectionManager:
         # Actualizar info de conexión
         if connection_id in self.connection_info:
             self.connection_info[connection_id]["game_id"] = game_id
+        presence_service.join_game(connection_id, game_id)
         
         # Notificar a otros en la room
         user_id = self.connection_users.get(connection_id)
@@ -117,6 +123,7 @@ class ConnectionManager:
         """Salir de room de juego"""
         if game_id in self.game_rooms and connection_id in self.game_rooms[game_id]:
             self.game_rooms[game_id].remove(connection_id)
+            presence_service.leave_game(connection_id, game_id)
             
             # Notificar salida
             user_id = self.connection_users.get(connection_id)
@@ -127,6 +134,18 @@ class ConnectionManager:
                     "timestamp": datetime.now().isoformat()
                 })
 
+    def release_game_room(self, game_id: str) -> bool:
+        """Liberar la room de un juego desalojado si ya no tiene conexiones vivas"""
+        room = self.game_rooms.get(game_id)
+        if room is None:
+            return False
+
+        if any(connection_id in self.active_connections for connection_id in room):
+            return False
+
+        del self.game_rooms[game_id]
+        return True
+
     async def send_personal_message(self, connection_id: str, message):
         """Enviar mensaje a conexión específica"""
         if connection_id in self.active_connections:
@@ -215,6 +234,13 @@ class ConnectionManager:
                 print(f"Error enviando mensaje personal a {connection_id}: {e}")
                 await self.disconnect(connection_id)
 
+    async def send_to_users(self, game_id: str, user_ids, message):
+        """Enviar mensaje solo a las conexiones de ciertos usuarios dentro de un juego"""
+        user_ids = set(user_ids)
+        for connection_id in self.get_game_connections(game_id):
+            if self.connection_users.get(connection_id) in user_ids:
+                await self.send_personal_message(connection_id, message)
+
     async def broadcast_to_game(self, game_id: str, message, exclude_connection: str | None = None):
         """Broadcast mensaje a todos en un juego"""
         if game_id not in self.game_rooms:
@@ -393,14 +419,8 @@ class ConnectionManager:
         return self.connection_info.get(connection_id, {})
 
     def is_user_connected(self, user_id: str, game_id: str | None = None) -> bool:
-        """Verificar si un usuario está conectado"""
-        for conn_id, conn_user_id in self.connection_users.items():
-            if conn_user_id == user_id:
-                if game_id:
-                    conn_info = self.connection_info.get(conn_id, {})
-                    return conn_info.get("game_id") == game_id
-                return True
-        return False
+        """Verificar si un usuario está conectado (a un juego concreto, si se indica)"""
+        return presence_service.is_online(user_id, game_id)
 
     async def _heartbeat_loop(self):
         """Loop de heartbeat para mantener conexiones vivas"""
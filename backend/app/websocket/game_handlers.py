@@ -4,13 +4,18 @@ Maneja eventos específicos del juego: iniciar, unirse, fases, etc.
 """
 from app.websocket.connection_manager import connection_manager
 from app.websocket.messages import (
-    MessageType, GameStartedMessage, PhaseChangedMessage
+    MessageType, GameStartedMessage, PhaseChangedMessage, PhaseTimerMessage, ConsensusReachedMessage
 )
 from app.services.game_state_service import game_state_manager, GameState
 from app.services.game_phases_service import GamePhase
 from app.services.voting_service import voting_service, VoteType
+from app.services.game_index_service import game_index_service
+from app.services.werewolf_consensus_service import werewolf_consensus_service
 from app.services.game_service import join_game, get_game
+from app.services.game_actor_service import game_actor_service
+from app.services.player_view_service import player_view_service
 from app.services.user_service import get_user
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +23,10 @@ logger = logging.getLogger(__name__)
 class GameHandler:
     """Manejador de eventos específicos del juego"""
     
+    def __init__(self):
+        # Avisar a los hombres lobo en cuanto se forma su consenso
+        werewolf_consensus_service.add_consensus_callback(self._on_werewolf_consensus)
+    
     async def handle_join_game(self, connection_id: str, message_data: dict):
         """Manejar unión a juego"""
         try:
@@ -47,7 +56,7 @@ class GameHandler:
                     user = get_user(user_id)
                     if user:
                         # Intentar añadir el usuario al juego en la base de datos
-                        result = join_game(game_id, user_id)
+                        result = await game_actor_service.call(game_id, join_game, game_id, user_id)
                         if result:
                             # Recargar el estado del juego para incluir el nuevo jugador
                             game_state = await game_state_manager.get_or_create_game_state(game_id)
@@ -131,13 +140,7 @@ class GameHandler:
                 logger.warning(f"Error actualizando estados de jugadores al iniciar juego: {e}")
             
             # Configurar callbacks para eventos de fase
-            game_state.phase_controller.add_phase_change_callback(
-                lambda old_phase, new_phase: self._on_phase_changed(game_id, old_phase, new_phase)
-            )
-            
-            game_state.phase_controller.add_phase_timer_callback(
-                lambda phase, time_remaining: self._on_phase_timer(game_id, phase, time_remaining)
-            )
+            self.attach_phase_callbacks(game_id, game_state)
             
             # Notificar inicio de juego
             start_message = GameStartedMessage(
@@ -173,13 +176,7 @@ class GameHandler:
                 logger.warning(f"Error actualizando estados de jugadores al auto-iniciar juego: {e}")
             
             # Configurar callbacks para eventos de fase
-            game_state.phase_controller.add_phase_change_callback(
-                lambda old_phase, new_phase: self._on_phase_changed(game_id, old_phase, new_phase)
-            )
-            
-            game_state.phase_controller.add_phase_timer_callback(
-                lambda phase, time_remaining: self._on_phase_timer(game_id, phase, time_remaining)
-            )
+            self.attach_phase_callbacks(game_id, game_state)
             
             # Notificar inicio automático de juego
             start_message = GameStartedMessage(
@@ -341,6 +338,16 @@ class GameHandler:
             logger.error(f"Error en force_next_phase: {e}")
             await self._send_error(connection_id, "FORCE_PHASE_ERROR", "Error forzando cambio de fase")
     
+    def attach_phase_callbacks(self, game_id: str, game_state: GameState):
+        """Registrar los callbacks de cambio de fase y timer (inicio de juego o rehidratación)"""
+        game_state.phase_controller.add_phase_change_callback(
+            lambda old_phase, new_phase: self._on_phase_changed(game_id, old_phase, new_phase)
+        )
+        
+        game_state.phase_controller.add_phase_timer_callback(
+            lambda phase, time_remaining: self._on_phase_timer(game_id, phase, time_remaining)
+        )
+    
     async def _on_phase_changed(self, game_id: str, old_phase: GamePhase, new_phase: GamePhase):
         """Callback cuando cambia la fase del juego"""
         try:
@@ -351,10 +358,13 @@ class GameHandler:
                 
             phase_info = game_state.phase_controller.get_phase_info()
             
-            # Crear mensaje de cambio de fase
+            # Crear mensaje de cambio de fase con el deadline absoluto
             phase_message = PhaseChangedMessage(
                 phase=new_phase.value,
-                duration=phase_info["duration"]
+                previous_phase=old_phase.value,
+                duration=phase_info["duration"],
+                deadline=phase_info["deadline"],
+                server_time=phase_info["server_time"]
             )
             
             # Broadcast a todos los jugadores
@@ -364,63 +374,84 @@ class GameHandler:
             )
             
             # *** INTEGRACIÓN CON SISTEMA DE VOTACIONES ***
+            # Al salir de VOTING (por tiempo o porque ya votaron todos), cerrar la votación
+            if old_phase == GamePhase.VOTING:
+                await voting_service.close_voting_session(game_id)
+            
             # Si entramos en fase de VOTING, iniciar votación automáticamente
             if new_phase == GamePhase.VOTING:
                 await self._start_day_voting(game_id, game_state)
             
+            # Partida terminada: programar el desalojo de su estado en memoria
+            if new_phase == GamePhase.FINISHED:
+                game_state_manager.mark_finished(game_id)
+            
+            # Cada jugador recibe su vista de la nueva fase sin tener que pedirla
+            await self.push_player_views(game_id)
+            
             logger.info(f"Juego {game_id}: Fase cambiada de {old_phase.value} a {new_phase.value}")
             
         except Exception as e:
             logger.error(f"Error en callback de cambio de fase: {e}")
     
     async def _start_day_voting(self, game_id: str, game_state):
-        """Iniciar votación diurna automáticamente"""
+        """
+        Abrir la votación diurna automáticamente.
+
+        Usa la misma sesión DAY_VOTE que los votos REST: si ya hay una activa (alguien votó
+        por REST antes de llegar a VOTING) se conserva con sus votos.
+        """
         try:
-            # Obtener jugadores vivos (por ahora todos los conectados)
-            eligible_voters = list(game_state.connected_players)
-            vote_targets = list(game_state.connected_players)
-            
-            # Crear sesión de votación
-            await voting_service.create_voting_session(
-                game_id=game_id,
-                vote_type=VoteType.DAY_VOTE,
-                eligible_voters=eligible_voters,
-                vote_targets=vote_targets,
-                duration_seconds=120  # 2 minutos
+            # Votantes y objetivos: los jugadores vivos de la partida, estén o no conectados
+            index = await asyncio.to_thread(game_index_service.get_by_id, game_id)
+            if not index:
+                logger.error(f"No se puede iniciar la votación: partida {game_id} no encontrada")
+                return
+            alive_players = index.get_alive_players()
+            
+            session = voting_service.ensure_active_session(
+                game_id, VoteType.DAY_VOTE, alive_players, alive_players, duration_seconds=120  # 2 minutos
             )
             
-            # Iniciar votación
-            success = await voting_service.start_voting_session(game_id)
+            # Notificar inicio de votación
+            voting_message = {
+                "type": MessageType.VOTING_STARTED.value,
+                "vote_type": VoteType.DAY_VOTE.value,
+                "duration": session.duration_seconds,
+                "eligible_voters": sorted(session.eligible_voters),
+                "vote_targets": sorted(session.vote_targets),
+                "game_id": game_id
+            }
             
-            if success:
-                # Notificar inicio de votación
-                voting_message = {
-                    "type": MessageType.VOTING_STARTED.value,
-                    "vote_type": "day_vote",
-                    "duration": 120,
-                    "eligible_voters": eligible_voters,
-                    "vote_targets": vote_targets,
-                    "game_id": game_id
-                }
-                
-                await connection_manager.broadcast_to_game(game_id, voting_message)
-                logger.info(f"Votación diurna iniciada para juego {game_id}")
-            else:
-                logger.error(f"Error iniciando votación para juego {game_id}")
+            await connection_manager.broadcast_to_game(game_id, voting_message)
+            logger.info(f"Votación diurna iniciada para juego {game_id}")
                 
         except Exception as e:
             logger.error(f"Error iniciando votación diurna: {e}")
     
+    async def _on_werewolf_consensus(self, game_id: str, werewolf_ids, target_id: str, round_number: int):
+        """Callback cuando los hombres lobo alcanzan consenso: solo a sus conexiones"""
+        try:
+            await connection_manager.send_to_users(
+                game_id,
+                werewolf_ids,
+                ConsensusReachedMessage(target_id=target_id, round=round_number, werewolves=list(werewolf_ids))
+            )
+        except Exception as e:
+            logger.error(f"Error enviando consenso de hombres lobo: {e}")
+    
     async def _on_phase_timer(self, game_id: str, phase: GamePhase, time_remaining: int):
         """Callback para updates de timer de fase"""
         try:
-            # Enviar update de timer
-            timer_message = {
-                "type": MessageType.PHASE_TIMER.value,
-                "phase": phase.value,
-                "time_remaining": time_remaining,
-                "game_id": game_id
-            }
+            # Enviar update de timer (solo si el controlador tiene ticks configurados)
+            game_state = game_state_manager.active_games.get(game_id)
+            deadline = game_state.phase_controller.get_phase_info()["deadline"] if game_state else None
+            
+            timer_message = PhaseTimerMessage(
+                phase=phase.value,
+                time_remaining=time_remaining,
+                deadline=deadline
+            )
             
             await connection_manager.broadcast_to_game(game_id, timer_message)
             
@@ -448,6 +479,42 @@ class GameHandler:
             logger.error(f"Error en get_game_status: {e}")
             await self._send_error(connection_id, "STATUS_ERROR", "Error obteniendo estado")
     
+    async def handle_get_player_view(self, connection_id: str, message_data: dict):
+        """Enviar al solicitante su vista consolidada de la fase actual"""
+        try:
+            conn_info = connection_manager.get_connection_info(connection_id)
+            if not conn_info:
+                return
+            
+            game_id = conn_info["game_id"]
+            view = await asyncio.to_thread(player_view_service.get_view, game_id, conn_info["user_id"])
+            if view is None:
+                await self._send_error(connection_id, "NOT_IN_GAME", "No participas en esta partida")
+                return
+            
+            await connection_manager.send_personal_message(connection_id, {
+                "type": MessageType.PLAYER_VIEW.value,
+                "view": view
+            })
+            
+        except Exception as e:
+            logger.error(f"Error en get_player_view: {e}")
+            await self._send_error(connection_id, "VIEW_ERROR", "Error obteniendo la vista del jugador")
+    
+    async def push_player_views(self, game_id: str, user_ids=None):
+        """Enviar a cada jugador conectado (o solo a user_ids) su propia vista"""
+        targets = set(user_ids) if user_ids is not None else set(connection_manager.get_game_users(game_id))
+        for user_id in targets:
+            try:
+                view = await asyncio.to_thread(player_view_service.get_view, game_id, user_id)
+                if view is not None:
+                    await connection_manager.send_to_users(game_id, [user_id], {
+                        "type": MessageType.PLAYER_VIEW.value,
+                        "view": view
+                    })
+            except Exception as e:
+                logger.error(f"Error enviando la vista de {user_id} en {game_id}: {e}")
+    
     async def _send_game_status(self, game_id: str, game_state):
         """Enviar estado del juego a todos los conectados"""
         from app.database import load_user
@@ -476,7 +543,8 @@ class GameHandler:
                 "connected_players": list(game_state.connected_players),
                 "living_players": game_state.get_living_players(),
                 "dead_players": game_state.get_dead_players(),
-                "time_remaining": game_state.get_phase_time_remaining()
+                "time_remaining": game_state.get_phase_time_remaining(),
+                "phase_deadline": game_state.phase_controller.get_phase_info()["deadline"]
             }
         }
 
@@ -512,7 +580,8 @@ class GameHandler:
                 "connected_players": list(game_state.connected_players),
                 "living_players": game_state.get_living_players(),
                 "dead_players": game_state.get_dead_players(),
-                "time_remaining": game_state.get_phase_time_remaining()
+                "time_remaining": game_state.get_phase_time_remaining(),
+                "phase_deadline": game_state.phase_controller.get_phase_info()["deadline"]
             }
         }
 
@@ -520,9 +589,12 @@ class GameHandler:
     
     async def _send_phase_change(self, game_id: str, game_state):
         """Enviar cambio de fase"""
+        phase_info = game_state.phase_controller.get_phase_info()
         phase_message = PhaseChangedMessage(
             phase=game_state.phase.value,
-            duration=int(game_state.phase_duration.total_seconds())
+            duration=phase_info["duration"],
+            deadline=phase_info["deadline"],
+            server_time=phase_info["server_time"]
         )
         
         await connection_manager.broadcast_to_game(
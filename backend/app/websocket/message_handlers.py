@@ -9,8 +9,10 @@ from app.websocket.messages import (
 )
 from app.websocket.game_handlers import game_handler
 from app.websocket.voting_handlers import voting_handler
+from app.websocket.role_action_handlers import role_action_handler
 from app.websocket.user_status_handlers import user_status_handler
-from app.core.security import verify_access_token
+from app.services.game_state_service import game_state_manager
+from app.services.auth_cache_service import auth_cache_service
 import json
 import logging
 
@@ -30,9 +32,14 @@ class MessageHandler:
             MessageType.RESTART_GAME: game_handler.handle_restart_game,
             MessageType.GET_GAME_STATUS: game_handler.handle_get_game_status,
             MessageType.FORCE_NEXT_PHASE: game_handler.handle_force_next_phase,
+            MessageType.GET_PLAYER_VIEW: game_handler.handle_get_player_view,
             # Voting handlers
             MessageType.CAST_VOTE: voting_handler.handle_cast_vote,
             MessageType.GET_VOTING_STATUS: voting_handler.handle_get_voting_status,
+            # Role action handlers
+            MessageType.ROLE_ACTION: role_action_handler.handle_role_action,
+            MessageType.NIGHT_ACTION: role_action_handler.handle_role_action,
+            MessageType.ROLE_ACTION_BATCH: role_action_handler.handle_role_action_batch,
         }
     
     async def handle_message(self, connection_id: str, message_data: dict):
@@ -47,6 +54,11 @@ class MessageHandler:
             
             message_type = MessageType(message_data["type"])
             
+            # Registrar actividad en la partida de la conexión
+            conn_info = connection_manager.get_connection_info(connection_id)
+            if conn_info and conn_info.get("game_id"):
+                game_state_manager.touch(conn_info["game_id"])
+            
             # Buscar handler específico
             if message_type in self.handlers:
                 await self.handlers[message_type](connection_id, message_data)
@@ -117,7 +129,7 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, token: str) ->
         logger.info(f"Token recibido: {token[:50]}...")
         
         # Verificar token de autenticación
-        payload = verify_access_token(token)
+        payload = auth_cache_service.verify_token(token)
         logger.info(f"Payload del token: {payload}")
         
         if not payload:
@@ -143,16 +155,10 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, token: str) ->
                 pass  # Si ya está cerrado, ignorar el error
             return
         
-        # Conectar usuario
+        # Conectar usuario (la presencia actualiza su estado si es su primera conexión)
         connection_id = await connection_manager.connect(websocket, user_id, game_id)
         logger.info(f"Usuario {user_id} conectado al juego {game_id} con conexión {connection_id}")
         
-        # Actualizar estado del usuario a 'connected' automáticamente
-        try:
-            await user_status_handler.auto_update_status_on_connect(user_id)
-        except Exception as e:
-            logger.warning(f"Error actualizando estado a conectado para {user_id}: {e}")
-        
         # Enviar mensaje de bienvenida
         welcome_message = SystemMessage(
             message=f"Conectado al juego {game_id}",
@@ -205,14 +211,8 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, token: str) ->
     finally:
         # Limpiar conexión y actualizar estado
         if connection_id:
-            user_id = await connection_manager.disconnect(connection_id)
-            
-            # Actualizar estado del usuario a 'disconnected' automáticamente
-            if user_id:
-                try:
-                    await user_status_handler.auto_update_status_on_disconnect(user_id)
-                except Exception as e:
-                    logger.warning(f"Error actualizando estado a desconectado para {user_id}: {e}")
+            # La presencia marca la salida del usuario si no reconecta dentro del margen
+            await connection_manager.disconnect(connection_id)
             
             # Limpiar recursos finales
             await connection_manager.cleanup_after_disconnect()
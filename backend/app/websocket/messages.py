@@ -40,10 +40,17 @@ class MessageType(str, Enum):
     VOTING_STARTED = "voting_started"
     VOTING_ENDED = "voting_ended"
     VOTING_RESULTS = "voting_results"
+    VOTE_TALLY_UPDATE = "vote_tally_update"
     
     # Acciones de roles
     ROLE_ACTION = "role_action"
     NIGHT_ACTION = "night_action"
+    ROLE_ACTION_BATCH = "role_action_batch"
+    
+    # Vista del jugador
+    GET_PLAYER_VIEW = "get_player_view"
+    PLAYER_VIEW = "player_view"
+    CONSENSUS_REACHED = "consensus_reached"
     
     # Eventos del juego
     PLAYER_ELIMINATED = "player_eliminated"
@@ -83,17 +90,21 @@ class PlayerConnectionMessage(BaseWebSocketMessage):
     timestamp: datetime = Field(default_factory=datetime.now)
 
 class PhaseChangedMessage(BaseWebSocketMessage):
-    """Mensaje de cambio de fase"""
+    """Mensaje de cambio de fase (único envío del deadline; el cliente calcula la cuenta atrás)"""
     type: MessageType = MessageType.PHASE_CHANGED
     phase: str  # night, day, voting, trial, execution
+    previous_phase: str | None = None
     duration: int  # segundos
+    deadline: float | None = None  # epoch (segundos) de fin de fase, None si no avanza sola
+    server_time: float | None = None  # epoch (segundos) del servidor para corregir desfase de reloj
     timestamp: datetime = Field(default_factory=datetime.now)
 
 class PhaseTimerMessage(BaseWebSocketMessage):
-    """Mensaje de timer de fase"""
+    """Mensaje de timer de fase (opcional, solo si hay ticks configurados)"""
     type: MessageType = MessageType.PHASE_TIMER
     phase: str
     time_remaining: int  # segundos
+    deadline: float | None = None
     timestamp: datetime = Field(default_factory=datetime.now)
 
 class ForceNextPhaseMessage(BaseWebSocketMessage):
@@ -118,6 +129,27 @@ class VotingResultsMessage(BaseWebSocketMessage):
     is_tie: bool = False
     timestamp: datetime = Field(default_factory=datetime.now)
 
+class VoteTallyUpdateMessage(BaseWebSocketMessage):
+    """Delta compacto del recuento tras un voto"""
+    type: MessageType = MessageType.VOTE_TALLY_UPDATE
+    vote_type: str
+    voter_id: str
+    previous_target: str | None = None
+    target_id: str | None = None
+    changes: Dict[str, int]  # target_id -> nuevo recuento, solo los afectados
+    leaders: List[str] = []
+    is_tie: bool = False
+    total_votes: int = 0
+    timestamp: datetime = Field(default_factory=datetime.now)
+
+class ConsensusReachedMessage(BaseWebSocketMessage):
+    """Consenso de los hombres lobo sobre la víctima (solo para hombres lobo)"""
+    type: MessageType = MessageType.CONSENSUS_REACHED
+    target_id: str
+    round: int
+    werewolves: List[str] = []
+    timestamp: datetime = Field(default_factory=datetime.now)
+
 class SystemMessage(BaseWebSocketMessage):
     """Mensaje del sistema"""
     type: MessageType = MessageType.SYSTEM_MESSAGE
@@ -0,0 +1,130 @@
+"""
+Role Action Handlers para WebSocket
+Acciones de rol (ROLE_ACTION / NIGHT_ACTION) sobre la conexión ya autenticada de la partida:
+un frame por acción en lugar de una petición HTTP con su autenticación y carga de usuario.
+ROLE_ACTION_BATCH aplica varias acciones del jugador de forma atómica y responde una sola vez.
+"""
+from app.websocket.connection_manager import connection_manager
+from app.websocket.messages import MessageType
+from app.websocket.game_handlers import game_handler
+from app.services.game_actor_service import game_actor_service
+from app.services.role_action_service import MAX_BATCH_ACTIONS, ROLE_ACTIONS, perform_role_action, perform_role_actions
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RoleActionHandler:
+    """Manejador de acciones de rol"""
+
+    async def handle_role_action(self, connection_id: str, message_data: dict):
+        """
+        Manejar una acción de rol y devolver el resultado por la misma conexión.
+
+        Formato: {"type": "role_action", "action": "witch_heal", "target_id": "...", "request_id": "..."}
+        Los parámetros pueden ir en el propio mensaje o dentro de "data".
+        """
+        try:
+            conn_info = connection_manager.get_connection_info(connection_id)
+            if not conn_info:
+                await self._send_error(connection_id, "CONNECTION_ERROR", "Información de conexión no encontrada")
+                return
+
+            game_id = conn_info["game_id"]
+            user_id = conn_info["user_id"]
+            action = message_data.get("action")
+            request_id = message_data.get("request_id")
+
+            if action not in ROLE_ACTIONS:
+                await self._send_error(
+                    connection_id, "INVALID_ACTION", f"Acción de rol no soportada: {action}",
+                    {"action": action, "request_id": request_id}
+                )
+                return
+
+            params = {**message_data, **(message_data.get("data") or {})}
+            result = await game_actor_service.call(game_id, perform_role_action, game_id, user_id, action, params)
+
+            if result.success:
+                await connection_manager.send_personal_message(connection_id, {
+                    "type": MessageType.SUCCESS.value,
+                    "action": action,
+                    "message": result.message,
+                    "data": {**result.data, "request_id": request_id}
+                })
+                await game_handler.push_player_views(game_id, [user_id])
+            else:
+                await self._send_error(
+                    connection_id, "ROLE_ACTION_FAILED", result.message,
+                    {"action": action, "request_id": request_id}
+                )
+
+            logger.info(f"Acción de rol {action} de {user_id} en {game_id}: {result.message}")
+
+        except Exception as e:
+            logger.error(f"Error en role_action: {e}")
+            await self._send_error(connection_id, "ROLE_ACTION_ERROR", "Error procesando la acción de rol")
+
+    async def handle_role_action_batch(self, connection_id: str, message_data: dict):
+        """
+        Manejar un lote ordenado de acciones de rol, aplicado atómicamente.
+
+        Formato: {"type": "role_action_batch", "actions": [{"action": "witch_heal", "target_id": "..."}, ...],
+                  "request_id": "..."}
+        Responde con un único mensaje con el resultado de cada acción.
+        """
+        try:
+            conn_info = connection_manager.get_connection_info(connection_id)
+            if not conn_info:
+                await self._send_error(connection_id, "CONNECTION_ERROR", "Información de conexión no encontrada")
+                return
+
+            game_id = conn_info["game_id"]
+            user_id = conn_info["user_id"]
+            actions = message_data.get("actions")
+            request_id = message_data.get("request_id")
+
+            if not isinstance(actions, list) or not actions or not all(isinstance(a, dict) for a in actions):
+                await self._send_error(
+                    connection_id, "INVALID_BATCH", "Se requiere una lista de acciones", {"request_id": request_id}
+                )
+                return
+            if len(actions) > MAX_BATCH_ACTIONS:
+                await self._send_error(
+                    connection_id, "INVALID_BATCH", f"Máximo {MAX_BATCH_ACTIONS} acciones por lote",
+                    {"request_id": request_id}
+                )
+                return
+
+            outcome = await game_actor_service.call(game_id, perform_role_actions, game_id, user_id, actions)
+
+            if outcome["success"]:
+                await connection_manager.send_personal_message(connection_id, {
+                    "type": MessageType.SUCCESS.value,
+                    "action": "role_action_batch",
+                    "message": outcome["message"],
+                    "data": {"results": outcome["results"], "request_id": request_id}
+                })
+                await game_handler.push_player_views(game_id, [user_id])
+            else:
+                await self._send_error(
+                    connection_id, "ROLE_ACTION_BATCH_FAILED", outcome["message"],
+                    {"results": outcome["results"], "request_id": request_id}
+                )
+
+            logger.info(f"Lote de {len(actions)} acciones de {user_id} en {game_id}: {outcome['message']}")
+
+        except Exception as e:
+            logger.error(f"Error en role_action_batch: {e}")
+            await self._send_error(connection_id, "ROLE_ACTION_ERROR", "Error procesando el lote de acciones")
+
+    async def _send_error(self, connection_id: str, error_code: str, message: str, details: dict | None = None):
+        """Enviar mensaje de error"""
+        await connection_manager.send_personal_message(connection_id, {
+            "type": MessageType.ERROR.value,
+            "error_code": error_code,
+            "message": message,
+            "details": details or {}
+        })
+
+# Instancia global del role action handler
+role_action_handler = RoleActionHandler()
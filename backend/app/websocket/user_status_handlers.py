@@ -1,12 +1,16 @@
 """
 Handlers para gestión de estado de usuarios via WebSocket
 Maneja cambios de estado automáticos y notificaciones en tiempo real
+Los cambios automáticos pasan por user_status_buffer y se escriben en lote; los de
+conexión y desconexión los decide el servicio de presencia
 """
 from app.websocket.connection_manager import connection_manager
 from app.websocket.messages import (
     UserStatusChangedMessage, ErrorMessage, SuccessMessage
 )
 from app.services.user_service import update_user_status
+from app.services.user_status_buffer_service import user_status_buffer
+from app.services.presence_service import presence_service
 from app.models.user import UserStatusUpdate, UserStatus
 import logging
 
@@ -91,49 +95,25 @@ class UserStatusHandler:
             logger.error(f"Error actualizando estado de usuario para {connection_id}: {e}")
             await self.send_error(connection_id, "INTERNAL_ERROR", "Error interno del servidor")
     
-    async def auto_update_status_on_connect(self, user_id: str):
-        """Actualizar automáticamente el estado a 'connected' cuando se conecta"""
+    async def on_presence_changed(self, user_id: str, status: UserStatus):
+        """
+        Listener del servicio de presencia: primera conexión del usuario ('in_game') o
+        salida sin reconectar dentro del margen ('connected', como antes al desconectar).
+        """
         try:
-            # Nuevo comportamiento: al conectar al websocket, marcar como IN_GAME
-            status_update = UserStatusUpdate(status=UserStatus.IN_GAME)
-            updated_user, old_status = update_user_status(user_id, status_update)
+            old_status = await user_status_buffer.set_status(user_id, status)
 
-            if updated_user and old_status:
+            if old_status:
                 # Notificar cambio de estado a otros usuarios
+                new_status = "in_game" if status == UserStatus.IN_GAME else "active"
                 await self.broadcast_status_change(
                     user_id,
                     old_status.value,
-                    "in_game"
+                    new_status
                 )
-                logger.info(f"Usuario {user_id} automáticamente marcado como 'in_game' al conectar")
+                logger.info(f"Usuario {user_id} automáticamente marcado como '{new_status}' por su presencia")
         except Exception as e:
-            logger.error(f"Error actualizando estado automático de conexión para {user_id}: {e}")
-    
-    async def auto_update_status_on_disconnect(self, user_id: str):
-        """Actualizar automáticamente el estado a 'disconnected' cuando se desconecta"""
-        try:
-            # Verificar si el usuario tiene otras conexiones activas
-            user_connections = [
-                conn_id for conn_id, conn_user_id in connection_manager.connection_users.items()
-                if conn_user_id == user_id
-            ]
-            
-            # Solo actualizar a disconnected si no hay otras conexiones del mismo usuario
-            if len(user_connections) <= 1:  # <= 1 porque la conexión actual aún no se ha removido
-                # Nuevo comportamiento: al desconectar del websocket, marcar como CONNECTED
-                status_update = UserStatusUpdate(status=UserStatus.CONNECTED)
-                updated_user, old_status = update_user_status(user_id, status_update)
-
-                if updated_user and old_status:
-                    # Notificar cambio de estado a otros usuarios
-                    await self.broadcast_status_change(
-                        user_id,
-                        old_status.value,
-                        "active"
-                    )
-                    logger.info(f"Usuario {user_id} automáticamente marcado como 'active' al desconectar")
-        except Exception as e:
-            logger.error(f"Error actualizando estado automático de desconexión para {user_id}: {e}")
+            logger.error(f"Error actualizando estado por presencia para {user_id}: {e}")
     
     async def auto_update_status_on_join(self, connection_id: str, message_data: dict):
         """Actualizar automáticamente el estado a 'in_game' cuando se une a una partida"""
@@ -156,10 +136,9 @@ class UserStatusHandler:
                 return
             
             # Actualizar estado a 'in_game'
-            status_update = UserStatusUpdate(status=UserStatus.IN_GAME)
-            updated_user, old_status = update_user_status(user_id, status_update)
+            old_status = await user_status_buffer.set_status(user_id, UserStatus.IN_GAME)
             
-            if updated_user and old_status:
+            if old_status:
                 # Notificar cambio de estado a otros usuarios
                 await self.broadcast_status_change(
                     user_id, 
@@ -167,8 +146,6 @@ class UserStatusHandler:
                     "in_game"
                 )
                 logger.info(f"Usuario {user_id} automáticamente marcado como 'in_game' al unirse a partida {game_id}")
-            else:
-                logger.warning(f"No se pudo actualizar estado para usuario {user_id}")
                 
         except Exception as e:
             logger.error(f"Error actualizando estado automático al unirse a partida para {connection_id}: {e}")
@@ -177,10 +154,9 @@ class UserStatusHandler:
         """Actualizar automáticamente el estado a 'connected' cuando sale de una partida"""
         try:
             # Actualizar estado de 'in_game' de vuelta a 'connected'
-            status_update = UserStatusUpdate(status=UserStatus.CONNECTED)
-            updated_user, old_status = update_user_status(user_id, status_update)
+            old_status = await user_status_buffer.set_status(user_id, UserStatus.CONNECTED)
             
-            if updated_user and old_status:
+            if old_status:
                 # Notificar cambio de estado a otros usuarios
                 await self.broadcast_status_change(
                     user_id, 
@@ -188,8 +164,6 @@ class UserStatusHandler:
                     "connected"
                 )
                 logger.info(f"Usuario {user_id} automáticamente marcado como 'connected' al salir de la partida")
-            else:
-                logger.warning(f"No se pudo actualizar estado para usuario {user_id} al salir de partida")
                 
         except Exception as e:
             logger.error(f"Error actualizando estado automático al salir de partida para {user_id}: {e}")
@@ -197,21 +171,18 @@ class UserStatusHandler:
     async def auto_update_status_on_game_start(self, user_ids: list[str]):
         """Actualizar automáticamente el estado a 'in_game' cuando inicia la partida"""
         try:
-            for user_id in user_ids:
-                # Actualizar estado a 'in_game'
-                status_update = UserStatusUpdate(status=UserStatus.IN_GAME)
-                updated_user, old_status = update_user_status(user_id, status_update)
-                
-                if updated_user and old_status:
-                    # Notificar cambio de estado a otros usuarios
-                    await self.broadcast_status_change(
-                        user_id, 
-                        old_status.value, 
-                        "in_game"
-                    )
-                    logger.info(f"Usuario {user_id} automáticamente marcado como 'in_game' al iniciar partida")
-                else:
-                    logger.warning(f"No se pudo actualizar estado para usuario {user_id} al iniciar partida")
+            # Un único cambio para todos los jugadores (una sola lectura de los estados desconocidos)
+            old_statuses = await user_status_buffer.set_statuses(user_ids, UserStatus.IN_GAME)
+            
+            for user_id, old_status in old_statuses.items():
+                # Notificar cambio de estado a otros usuarios
+                await self.broadcast_status_change(
+                    user_id, 
+                    old_status.value, 
+                    "in_game"
+                )
+            if old_statuses:
+                logger.info(f"{len(old_statuses)} usuarios automáticamente marcados como 'in_game' al iniciar partida")
                     
         except Exception as e:
             logger.error(f"Error actualizando estados automáticos al iniciar partida: {e}")
@@ -220,10 +191,9 @@ class UserStatusHandler:
         """Actualizar automáticamente el estado a 'in_game' cuando un jugador muere"""
         try:
             # Actualizar estado de 'alive_in_game' a 'in_game' (muerto pero observando)
-            status_update = UserStatusUpdate(status=UserStatus.IN_GAME)
-            updated_user, old_status = update_user_status(user_id, status_update)
+            old_status = await user_status_buffer.set_status(user_id, UserStatus.IN_GAME)
             
-            if updated_user and old_status:
+            if old_status:
                 # Notificar cambio de estado a otros usuarios
                 await self.broadcast_status_change(
                     user_id, 
@@ -231,8 +201,6 @@ class UserStatusHandler:
                     "in_game"
                 )
                 logger.info(f"Usuario {user_id} automáticamente marcado como 'in_game' (muerto) en la partida")
-            else:
-                logger.warning(f"No se pudo actualizar estado para usuario {user_id} al morir")
                 
         except Exception as e:
             logger.error(f"Error actualizando estado automático al morir jugador {user_id}: {e}")
@@ -249,7 +217,7 @@ class UserStatusHandler:
             )
             
             # Enviar a todas las conexiones activas (excluyendo la especificada)
-            for conn_id, websocket in connection_manager.active_connections.items():
+            for conn_id in list(connection_manager.active_connections):
                 if exclude_connection and conn_id == exclude_connection:
                     continue
                 
@@ -270,3 +238,4 @@ class UserStatusHandler:
 
 # Instancia global del handler
 user_status_handler = UserStatusHandler()
+presence_service.add_listener(user_status_handler.on_presence_changed)
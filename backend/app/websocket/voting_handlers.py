@@ -5,9 +5,9 @@ Maneja eventos de votación en tiempo real
 from datetime import datetime
 from app.websocket.connection_manager import connection_manager
 from app.websocket.messages import (
-    MessageType, VoteMessage, VotingResultsMessage, SystemMessage, ErrorMessage
+    MessageType, VoteMessage, VoteTallyUpdateMessage, VotingResultsMessage, SystemMessage, ErrorMessage
 )
-from app.services.voting_service import voting_service
+from app.services.voting_service import VoteType, voting_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,8 +38,13 @@ class VotingHandler:
                 await self._send_error(connection_id, "INVALID_TARGET", "ID de objetivo requerido")
                 return
             
-            # Emitir voto
-            success, message = await voting_service.cast_vote(game_id, user_id, target_id)
+            vote_type = self._parse_vote_type(message_data)
+            if vote_type is None:
+                await self._send_error(connection_id, "INVALID_VOTE_TYPE", "Tipo de votación no válido")
+                return
+            
+            # Emitir voto en la sesión de ese tipo (puede haber varias a la vez en la partida)
+            success, message = await voting_service.cast_vote(game_id, user_id, target_id, vote_type=vote_type)
             
             if success:
                 # Voto exitoso - se notificará via callback
@@ -47,7 +52,7 @@ class VotingHandler:
             else:
                 await self._send_error(connection_id, "VOTE_FAILED", message)
             
-            logger.info(f"Voto procesado: {user_id} -> {target_id} en {game_id}: {message}")
+            logger.info(f"Voto procesado: {user_id} -> {target_id} ({vote_type.value}) en {game_id}: {message}")
             
         except Exception as e:
             logger.error(f"Error en cast_vote: {e}")
@@ -61,8 +66,13 @@ class VotingHandler:
                 await self._send_error(connection_id, "CONNECTION_ERROR", "Información de conexión no encontrada")
                 return
             
+            vote_type = self._parse_vote_type(message_data)
+            if vote_type is None:
+                await self._send_error(connection_id, "INVALID_VOTE_TYPE", "Tipo de votación no válido")
+                return
+            
             game_id = conn_info["game_id"]
-            status = voting_service.get_voting_status(game_id)
+            status = voting_service.get_voting_status(game_id, vote_type)
             
             # Enviar estado de votación
             await connection_manager.send_personal_message(
@@ -79,14 +89,14 @@ class VotingHandler:
             logger.error(f"Error en get_voting_status: {e}")
             await self._send_error(connection_id, "STATUS_ERROR", "Error obteniendo estado de votación")
     
-    async def _on_vote_cast(self, game_id: str, voter_id: str, target_id: str, old_vote):
+    async def _on_vote_cast(self, game_id: str, vote_type: VoteType, voter_id: str, target_id: str, old_vote, delta):
         """Callback cuando se emite un voto"""
         try:
             # Crear mensaje de voto
             vote_message = VoteMessage(
                 voter_id=voter_id,
                 target_id=target_id,
-                vote_type="day_vote"
+                vote_type=vote_type.value
             )
             
             # Broadcast a todos en el juego
@@ -95,16 +105,12 @@ class VotingHandler:
                 vote_message
             )
             
-            # También enviar estado actualizado
-            status = voting_service.get_voting_status(game_id)
-            await connection_manager.broadcast_to_game(
-                game_id,
-                {
-                    "type": MessageType.VOTING_STARTED,  # Reutilizamos para updates
-                    "voting_status": status,
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
+            # Enviar solo el delta del recuento (el estado completo se pide con get_voting_status)
+            if delta:
+                await connection_manager.broadcast_to_game(
+                    game_id,
+                    VoteTallyUpdateMessage(vote_type=vote_type.value, **delta)
+                )
             
         except Exception as e:
             logger.error(f"Error en callback de voto: {e}")
@@ -139,7 +145,7 @@ class VotingHandler:
                 system_message = SystemMessage(
                     message="Votación terminó en empate",
                     message_key="voting_tie",
-                    params={"tied_players": [p for p, v in session.get_leading_candidates() if v == session.get_leading_candidates()[0][1]]}
+                    params={"tied_players": session.get_tied_candidates()}
                 )
             
             await connection_manager.broadcast_to_game(
@@ -150,6 +156,14 @@ class VotingHandler:
         except Exception as e:
             logger.error(f"Error en callback de resultado: {e}")
     
+    @staticmethod
+    def _parse_vote_type(message_data: dict):
+        """Tipo de votación del mensaje (day_vote si no se indica), o None si no es válido"""
+        try:
+            return VoteType(message_data.get("vote_type") or VoteType.DAY_VOTE.value)
+        except ValueError:
+            return None
+    
     async def _send_error(self, connection_id: str, error_code: str, message: str):
         """Enviar mensaje de error"""
         error_message = ErrorMessage(
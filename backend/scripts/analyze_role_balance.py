@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""Análisis Monte Carlo del equilibrio de roles.
+
+Simula cientos de miles de partidas por configuración (jugadores, hombres lobo y roles
+especiales) repartidas en un pool de procesos, y agrega las tasas de victoria por
+bando, por rol (según el bando del rol inicial) y por número de jugadores, junto con la
+supervivencia por rol, en un informe.
+
+Para alcanzar ese volumen las partidas se juegan en memoria: los bots de
+scripts.simulate_games deciden las acciones y las resuelven las mismas funciones puras
+del motor (resolve_night, resolve_day, resolve_death_cascade), sin base de datos ni
+servicios con estado. La distribución de roles sale de
+game_flow_service.build_role_list, la misma que usa assign_roles.
+
+Uso (desde backend/):
+    python -m scripts.analyze_role_balance --games 200000 --players 10 12 14 16 18 \\
+        --werewolves auto 3 4 --specials seer,witch,hunter,cupid seer,witch --json balance.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.simulate_games import DEFAULT_MAX_ROUNDS, STRATEGIES, Bot, BotStrategy  # noqa: E402
+from app.models.game_and_roles import Game, GameRole, GameStatus  # noqa: E402
+from app.services.day_resolution_service import resolve_day  # noqa: E402
+from app.services.death_cascade_service import resolve_death_cascade  # noqa: E402
+from app.services.game_flow_service import DEFAULT_SPECIAL_ROLES, build_role_list, create_player_info  # noqa: E402
+from app.services.game_index_service import GameIndex, get_faction  # noqa: E402
+from app.services.night_resolution_service import check_victory, get_werewolf_consensus, resolve_night  # noqa: E402
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class RoleConfig:
+    """Configuración de reparto a evaluar"""
+    players: int
+    werewolves: Optional[int]  # None: la regla por defecto de assign_roles
+    special_roles: Tuple[GameRole, ...]
+
+    @property
+    def label(self) -> str:
+        werewolves = "auto" if self.werewolves is None else str(self.werewolves)
+        specials = ",".join(role.value for role in self.special_roles) or "-"
+        return f"players={self.players} werewolves={werewolves} specials={specials}"
+
+    def build_roles(self) -> List[GameRole]:
+        return build_role_list(self.players, self.werewolves, list(self.special_roles))
+
+
+@dataclass
+class BalanceStats:
+    """Agregado de resultados de una configuración (combinable entre shards)"""
+    games: int = 0
+    rounds: int = 0
+    victories: Counter = field(default_factory=Counter)  # victory_type -> partidas
+    role_players: Counter = field(default_factory=Counter)  # rol inicial -> jugadores
+    role_wins: Counter = field(default_factory=Counter)  # rol inicial -> jugadores de su bando ganador (vivos o no)
+    role_survivors: Counter = field(default_factory=Counter)  # rol inicial -> jugadores vivos al terminar
+
+    def merge(self, other: "BalanceStats"):
+        self.games += other.games
+        self.rounds += other.rounds
+        self.victories.update(other.victories)
+        self.role_players.update(other.role_players)
+        self.role_wins.update(other.role_wins)
+        self.role_survivors.update(other.role_survivors)
+
+    def to_dict(self) -> Dict:
+        return {
+            "games": self.games,
+            "avg_rounds": round(self.rounds / self.games, 3) if self.games else 0.0,
+            "win_rates": {victory: count / self.games for victory, count in sorted(self.victories.items())},
+            "role_win_rates": {
+                role: self.role_wins[role] / players
+                for role, players in sorted(self.role_players.items())
+            },
+            "role_survival_rates": {
+                role: self.role_survivors[role] / players
+                for role, players in sorted(self.role_players.items())
+            }
+        }
+
+
+def play_game(
+    config: RoleConfig,
+    seed: int,
+    strategy: BotStrategy,
+    werewolf_strategy: BotStrategy,
+    max_rounds: int = DEFAULT_MAX_ROUNDS
+) -> Tuple[Optional[Dict], Game, Dict[str, GameRole]]:
+    """
+    Jugar una partida completa en memoria.
+
+    Returns:
+        (victoria o None si se alcanzó el límite de rondas, partida final, roles iniciales)
+    """
+    rng = random.Random(seed)
+    roles = config.build_roles()
+    rng.shuffle(roles)
+    player_ids = [f"bot-{i:02d}" for i in range(config.players)]
+    initial_roles = dict(zip(player_ids, roles))
+
+    game = Game(
+        id=f"mc-{seed}",
+        name="Monte Carlo",
+        creator_id=player_ids[0],
+        max_players=config.players,
+        players=player_ids,
+        roles={player_id: create_player_info(role) for player_id, role in initial_roles.items()},
+        status=GameStatus.NIGHT,
+        current_round=1
+    )
+    bots = {
+        player_id: Bot(
+            player_id=player_id,
+            role=role,
+            strategy=werewolf_strategy if role == GameRole.WAREWOLF else strategy,
+            rng=random.Random(rng.getrandbits(64))
+        )
+        for player_id, role in initial_roles.items()
+    }
+
+    victory = None
+    while victory is None and game.current_round <= max_rounds:
+        if game.status == GameStatus.NIGHT:
+            _play_night(game, bots)
+            index = GameIndex.from_game(game)
+            resolution = resolve_night(game, index=index)
+        else:
+            index = GameIndex.from_game(game)
+            _play_day(game, index, bots)
+            resolution = resolve_day(game, index=index)
+
+        game = resolution.game
+        index.game = game
+        victory = resolution.victory
+        if victory is None and _play_hunter_revenge(game, index, bots):
+            victory = check_victory(game, index)
+
+    return victory, game, initial_roles
+
+
+def _play_night(game: Game, bots: Dict[str, Bot]):
+    """Acciones nocturnas aplicadas sobre la partida, con las mismas reglas que los servicios"""
+    index = GameIndex.from_game(game)
+    alive_bots = [bots[player_id] for player_id in index.get_alive_players()]
+    actions = game.night_actions
+
+    if game.current_round == 1:
+        for bot in alive_bots:
+            if index.has_role(bot.player_id, GameRole.CUPID):
+                lovers = bot.strategy.choose_lovers(bot, index)
+                if lovers:
+                    lover1_id, lover2_id = lovers
+                    game.roles[lover1_id].is_lover = True
+                    game.roles[lover1_id].lover_partner_id = lover2_id
+                    game.roles[lover2_id].is_lover = True
+                    game.roles[lover2_id].lover_partner_id = lover1_id
+                    actions.setdefault("cupid_lovers", {})[bot.player_id] = f"{lover1_id}:{lover2_id}"
+            elif index.has_role(bot.player_id, GameRole.WILD_CHILD):
+                model_id = bot.strategy.choose_model(bot, index)
+                if model_id:
+                    game.roles[bot.player_id].model_player_id = model_id
+                    game.roles[bot.player_id].has_transformed = False
+                    actions.setdefault("wild_child_model", {})[bot.player_id] = model_id
+
+    for bot in alive_bots:
+        if index.has_role(bot.player_id, GameRole.WAREWOLF):
+            target_id = bot.strategy.choose_attack(bot, index)
+            if target_id:
+                actions.setdefault("warewolf_attacks", {})[bot.player_id] = target_id
+        elif index.has_role(bot.player_id, GameRole.SEER):
+            target_id = bot.strategy.choose_vision(bot, index)
+            if target_id:
+                bot.known_roles[target_id] = game.roles[target_id].role
+
+    for bot in alive_bots:
+        if not index.has_role(bot.player_id, GameRole.WITCH):
+            continue
+        witch = game.roles[bot.player_id]
+        victim_id = get_werewolf_consensus(game, actions)
+        if victim_id and witch.has_healing_potion and bot.strategy.choose_heal(bot, index, victim_id):
+            witch.has_healing_potion = False
+            actions.setdefault("witch_heal", {})[bot.player_id] = victim_id
+        if witch.has_poison_potion:
+            target_id = bot.strategy.choose_poison(bot, index)
+            if target_id:
+                witch.has_poison_potion = False
+                actions.setdefault("witch_poison", {})[bot.player_id] = target_id
+
+
+def _play_day(game: Game, index: GameIndex, bots: Dict[str, Bot]):
+    """Votos diurnos de los jugadores vivos, en orden, viendo los votos ya emitidos"""
+    for player_id in index.get_alive_players():
+        bot = bots[player_id]
+        target_id = bot.strategy.choose_day_vote(bot, index, game.day_votes)
+        if target_id and target_id != player_id:
+            game.day_votes[player_id] = target_id
+
+
+def _play_hunter_revenge(game: Game, index: GameIndex, bots: Dict[str, Bot]) -> bool:
+    """Venganza pendiente de los cazadores muertos; devuelve True si alguien murió"""
+    killed = False
+    for hunter_id in sorted(index.role_ids.get(GameRole.HUNTER, ())):
+        hunter = game.roles[hunter_id]
+        if hunter.is_alive or hunter.has_used_revenge:
+            continue
+        bot = bots[hunter_id]
+        target_id = bot.strategy.choose_revenge(bot, index)
+        if target_id:
+            hunter.has_used_revenge = True
+            hunter.target_player_id = target_id
+            resolve_death_cascade(game, [(target_id, "hunter_revenge")], index=index)
+            killed = True
+    return killed
+
+
+def get_role_winners(game: Game, initial_roles: Dict[str, GameRole], victory_type: str) -> List[str]:
+    """
+    Jugadores que ganan la partida, hayan sobrevivido o no: los del bando ganador según su
+    rol inicial o, en la victoria de los enamorados, la pareja. (get_winner_ids solo
+    devuelve a los supervivientes, que es lo que se anuncia al terminar.)
+    """
+    if victory_type == "lovers":
+        return [player_id for player_id, role_info in game.roles.items() if role_info.is_lover]
+    return [player_id for player_id, role in initial_roles.items() if get_faction(role) == victory_type]
+
+
+def run_shard(
+    config: RoleConfig,
+    first_seed: int,
+    games: int,
+    strategy: str,
+    werewolf_strategy: str,
+    max_rounds: int
+) -> Tuple[RoleConfig, BalanceStats]:
+    """Tarea de un proceso del pool: simular un bloque de semillas consecutivas"""
+    villager_strategy = STRATEGIES[strategy]()
+    wolf_strategy = STRATEGIES[werewolf_strategy]()
+    stats = BalanceStats()
+
+    for seed in range(first_seed, first_seed + games):
+        victory, game, initial_roles = play_game(config, seed, villager_strategy, wolf_strategy, max_rounds)
+        stats.games += 1
+        stats.rounds += game.current_round
+        stats.role_players.update(role.value for role in initial_roles.values())
+        stats.role_survivors.update(
+            initial_roles[player_id].value for player_id, role_info in game.roles.items() if role_info.is_alive
+        )
+        if victory is None:
+            stats.victories["unfinished"] += 1
+            continue
+        stats.victories[victory["victory_type"]] += 1
+        stats.role_wins.update(
+            initial_roles[player_id].value
+            for player_id in get_role_winners(game, initial_roles, victory["victory_type"])
+        )
+
+    return config, stats
+
+
+def parse_configs(players: List[int], werewolves: List[str], specials: List[str]) -> List[RoleConfig]:
+    """Producto cartesiano de las opciones de la línea de comandos"""
+    special_sets = [
+        tuple(GameRole(role) for role in option.split(",") if role) if option != "none" else ()
+        for option in specials
+    ]
+    return [
+        RoleConfig(num_players, None if wolves == "auto" else int(wolves), special_roles)
+        for num_players, wolves, special_roles in itertools.product(players, werewolves, special_sets)
+    ]
+
+
+def print_report(results: Dict[RoleConfig, BalanceStats], elapsed: float):
+    """Tablas por configuración y resumen por número de jugadores"""
+    total_games = sum(stats.games for stats in results.values())
+    print(f"Partidas simuladas: {total_games} en {elapsed:.1f}s ({total_games / elapsed:.0f} partidas/s)\n")
+
+    for config in sorted(results, key=lambda c: (c.players, c.label)):
+        summary = results[config].to_dict()
+        factions = "  ".join(f"{victory}: {rate:.1%}" for victory, rate in summary["win_rates"].items())
+        roles = "  ".join(f"{role}: {rate:.1%}" for role, rate in summary["role_win_rates"].items())
+        survival = "  ".join(f"{role}: {rate:.1%}" for role, rate in summary["role_survival_rates"].items())
+        print(config.label)
+        print(f"  partidas: {summary['games']}  rondas medias: {summary['avg_rounds']}")
+        print(f"  victorias por bando: {factions}")
+        print(f"  victorias por rol:   {roles}")
+        print(f"  supervivencia por rol: {survival}")
+
+    print("\nPor número de jugadores:")
+    by_players: Dict[int, BalanceStats] = {}
+    for config, stats in results.items():
+        by_players.setdefault(config.players, BalanceStats()).merge(stats)
+    for players, stats in sorted(by_players.items()):
+        rates = stats.to_dict()["win_rates"]
+        print(f"  {players} jugadores: " + "  ".join(f"{victory}: {rate:.1%}" for victory, rate in rates.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Análisis Monte Carlo del equilibrio de roles")
+    parser.add_argument("--games", type=int, default=100000, help="Partidas por configuración")
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 12, 14, 16, 18], help="Números de jugadores")
+    parser.add_argument("--werewolves", nargs="+", default=["auto"], help="Hombres lobo ('auto' = regla de assign_roles)")
+    parser.add_argument(
+        "--specials", nargs="+", default=[",".join(role.value for role in DEFAULT_SPECIAL_ROLES)],
+        help="Conjuntos de roles especiales separados por comas ('none' = ninguno)"
+    )
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="random", help="Estrategia de los bots")
+    parser.add_argument("--werewolf-strategy", choices=sorted(STRATEGIES), help="Estrategia de los lobos (por defecto, la misma)")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS, help="Límite de rondas por partida")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla base")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos del pool")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Partidas por tarea del pool")
+    parser.add_argument("--json", help="Guardar también el informe en este fichero JSON")
+    args = parser.parse_args()
+
+    configs = parse_configs(args.players, args.werewolves, args.specials)
+    werewolf_strategy = args.werewolf_strategy or args.strategy
+    results: Dict[RoleConfig, BalanceStats] = {config: BalanceStats() for config in configs}
+    total_games = args.games * len(configs)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # Las mismas semillas para todas las configuraciones: comparaciones emparejadas
+        futures = [
+            executor.submit(
+                run_shard, config, args.seed + offset, min(args.chunk_size, args.games - offset),
+                args.strategy, werewolf_strategy, args.max_rounds
+            )
+            for config in configs
+            for offset in range(0, args.games, args.chunk_size)
+        ]
+        done_games = 0
+        for future in as_completed(futures):
+            config, stats = future.result()
+            results[config].merge(stats)
+            done_games += stats.games
+            print(f"\r{done_games}/{total_games} partidas", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    print_report(results, elapsed)
+
+    if args.json:
+        report = {
+            "games_per_config": args.games,
+            "strategy": args.strategy,
+            "werewolf_strategy": werewolf_strategy,
+            "seed": args.seed,
+            "elapsed_seconds": round(elapsed, 2),
+            "configs": [{"config": config.label, **results[config].to_dict()} for config in configs]
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nInforme guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
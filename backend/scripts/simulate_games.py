@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Simulador headless de partidas completas con bots.
+
+Recorre el motor de juego de principio a fin sin red ni esperas reales: crea la
+partida, une a los bots, asigna roles (`assign_roles`), ejecuta las acciones nocturnas
+de cada rol, los votos diurnos y las resoluciones de `GameFlowController` hasta que
+hay un ganador. Las decisiones de los bots las toman estrategias intercambiables y
+toda la aleatoriedad (reparto de roles incluido) sale de una semilla, de modo que una
+misma semilla reproduce exactamente las mismas partidas.
+
+Sirve como benchmark de rendimiento del motor (partidas por segundo) y como guarda
+de regresión: --min-games-per-second hace fallar la ejecución si el rendimiento cae.
+
+Usa una base de datos SQLite temporal propia (o SIMULATOR_DATABASE_URL), nunca la
+del servidor.
+
+Uso (desde backend/):
+    python -m scripts.simulate_games --games 200 --players 12 --seed 42 --strategy coordinated
+"""
+import argparse
+import asyncio
+import atexit
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+def _simulator_database_url() -> str:
+    """Base de datos del simulador: la indicada o un fichero temporal por proceso"""
+    url = os.getenv("SIMULATOR_DATABASE_URL")
+    if url:
+        return url
+    fd, path = tempfile.mkstemp(prefix="hombres_lobo_sim_", suffix=".db")
+    os.close(fd)
+    atexit.register(lambda: os.path.exists(path) and os.remove(path))
+    return f"sqlite:///{path}"
+
+
+# Debe fijarse antes de importar la app (database.py crea el engine al importarse)
+os.environ["DATABASE_URL"] = _simulator_database_url()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.game_and_roles import Game, GameRole, GameStatus  # noqa: E402
+from app.services import player_action_service  # noqa: E402
+from app.services.eligible_targets_service import eligible_targets_service  # noqa: E402
+from app.services.game_flow_controller import game_flow_controller  # noqa: E402
+from app.services.game_flow_service import assign_roles, change_game_status  # noqa: E402
+from app.services.game_index_service import GameIndex, game_index_service  # noqa: E402
+from app.services.game_service import create_game, delete_game, join_game  # noqa: E402
+from app.services.pending_actions_service import pending_actions_service  # noqa: E402
+from app.services.vote_tally_service import day_vote_tally_service  # noqa: E402
+from app.services.voting_service import VoteType, voting_service  # noqa: E402
+from app.services.werewolf_consensus_service import werewolf_consensus_service  # noqa: E402
+
+DEFAULT_MAX_ROUNDS = 30
+
+
+@dataclass
+class Bot:
+    """Jugador simulado: su rol, su generador aleatorio y lo que sabe de los demás"""
+    player_id: str
+    role: GameRole
+    strategy: "BotStrategy"
+    rng: random.Random
+    known_roles: Dict[str, GameRole] = field(default_factory=dict)
+
+
+@dataclass
+class GameResult:
+    """Resultado de una partida simulada"""
+    game_id: str
+    seed: int
+    victory_type: Optional[str]  # None si se alcanzó el límite de rondas
+    rounds: int
+    deaths: int
+    duration_ms: float
+    roles: Dict[str, GameRole] = field(default_factory=dict)
+
+
+class BotStrategy:
+    """Estrategia aleatoria: elige uniformemente entre las acciones legales"""
+    name = "random"
+    heal_probability = 0.5
+    poison_probability = 0.3
+
+    def choose_lovers(self, bot: Bot, index: GameIndex) -> Optional[Tuple[str, str]]:
+        candidates = index.get_alive_players()
+        if len(candidates) < 2:
+            return None
+        lover1, lover2 = bot.rng.sample(candidates, 2)
+        return lover1, lover2
+
+    def choose_model(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        return self._pick(bot, index.get_alive_players(exclude=bot.player_id))
+
+    def choose_attack(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        return self._pick(bot, [p for p in index.get_alive_players() if not index.has_role(p, GameRole.WAREWOLF)])
+
+    def choose_vision(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        unknown = [p for p in index.get_alive_players(exclude=bot.player_id) if p not in bot.known_roles]
+        return self._pick(bot, unknown or index.get_alive_players(exclude=bot.player_id))
+
+    def choose_heal(self, bot: Bot, index: GameIndex, victim_id: str) -> bool:
+        return bot.rng.random() < self.heal_probability
+
+    def choose_poison(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        if bot.rng.random() >= self.poison_probability:
+            return None
+        return self._pick(bot, index.get_alive_players(exclude=bot.player_id))
+
+    def choose_day_vote(self, bot: Bot, index: GameIndex, votes: Dict[str, str]) -> Optional[str]:
+        return self._pick(bot, index.get_alive_players(exclude=bot.player_id))
+
+    def choose_revenge(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        return self._pick(bot, index.get_alive_players(exclude=bot.player_id))
+
+    @staticmethod
+    def _pick(bot: Bot, candidates: List[str]) -> Optional[str]:
+        return bot.rng.choice(candidates) if candidates else None
+
+
+class CoordinatedStrategy(BotStrategy):
+    """
+    Estrategia coordinada: los lobos atacan todos al mismo objetivo, los roles usan la
+    información que tienen (la vidente vota a los lobos que ha descubierto) y el pueblo
+    se suma al candidato con más votos.
+    """
+    name = "coordinated"
+    heal_probability = 1.0
+    poison_probability = 0.5
+
+    def choose_attack(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        # Todos los lobos derivan el mismo objetivo de la partida y la ronda
+        candidates = [p for p in index.get_alive_players() if not index.has_role(p, GameRole.WAREWOLF)]
+        if not candidates:
+            return None
+        return random.Random(f"{index.game_id}:{index.game.current_round}").choice(candidates)
+
+    def choose_poison(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        known = self._known_werewolves(bot, index)
+        if known:
+            return known[0]
+        return super().choose_poison(bot, index)
+
+    def choose_day_vote(self, bot: Bot, index: GameIndex, votes: Dict[str, str]) -> Optional[str]:
+        if bot.role == GameRole.WAREWOLF:
+            candidates = [p for p in index.get_alive_players() if not index.has_role(p, GameRole.WAREWOLF)]
+        else:
+            known = self._known_werewolves(bot, index)
+            if known:
+                return known[0]
+            candidates = index.get_alive_players(exclude=bot.player_id)
+
+        # Sumarse al candidato válido más votado, o elegir uno si aún no hay votos
+        counts = Counter(target for target in votes.values() if target in candidates)
+        if counts:
+            return min(counts, key=lambda target: (-counts[target], target))
+        return self._pick(bot, candidates)
+
+    def choose_revenge(self, bot: Bot, index: GameIndex) -> Optional[str]:
+        return self.choose_day_vote(bot, index, {})
+
+    @staticmethod
+    def _known_werewolves(bot: Bot, index: GameIndex) -> List[str]:
+        return [p for p in index.get_alive_players() if bot.known_roles.get(p) == GameRole.WAREWOLF]
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (BotStrategy, CoordinatedStrategy)}
+
+
+class GameSimulator:
+    """Ejecuta partidas completas contra los servicios del motor, sin red ni esperas"""
+
+    def __init__(
+        self,
+        players: int = 12,
+        strategy: str = "random",
+        werewolf_strategy: Optional[str] = None,
+        max_rounds: int = DEFAULT_MAX_ROUNDS
+    ):
+        self.players = players
+        self.strategy = STRATEGIES[strategy]()
+        self.werewolf_strategy = STRATEGIES[werewolf_strategy or strategy]()
+        self.max_rounds = max_rounds
+
+    async def run_game(self, seed: int) -> GameResult:
+        """Simular una partida completa con una semilla"""
+        started = time.perf_counter()
+        game_id = f"sim-{seed}"
+        creator_id = "bot-00"
+
+        # El reparto de roles usa el random global: se siembra por partida
+        random.seed(seed)
+        create_game(Game(id=game_id, name=f"Simulación {seed}", creator_id=creator_id, max_players=self.players))
+        for i in range(self.players):
+            join_game(game_id, f"bot-{i:02d}")
+        game = assign_roles(game_id, creator_id, is_admin=True)
+        if not game:
+            raise RuntimeError(f"No se pudieron asignar roles en la partida {game_id}")
+        change_game_status(game_id, creator_id, GameStatus.NIGHT, is_admin=True)
+
+        rng = random.Random(seed)
+        bots = {
+            player_id: Bot(
+                player_id=player_id,
+                role=role_info.role,
+                strategy=self.werewolf_strategy if role_info.role == GameRole.WAREWOLF else self.strategy,
+                rng=random.Random(rng.getrandbits(64))
+            )
+            for player_id, role_info in game.roles.items()
+        }
+
+        results: Dict = {}
+        deaths = 0
+        while True:
+            index = game_index_service.get_by_id(game_id)
+            if index.status == GameStatus.FINISHED or index.game.current_round > self.max_rounds:
+                break
+
+            if index.status == GameStatus.NIGHT:
+                self._play_night(game_id, bots)
+                results = game_flow_controller.process_night_phase(game_id)
+            else:
+                self._play_day(game_id, bots)
+                results = game_flow_controller.process_day_phase(game_id)
+
+            if not results.get("success"):
+                raise RuntimeError(f"Fallo resolviendo la partida {game_id}: {results.get('error')}")
+            deaths += len(results["deaths"])
+            if not results.get("game_over"):
+                deaths += self._play_hunter_revenge(game_id, bots)
+
+            # Dejar correr las notificaciones programadas (sin esperas reales)
+            await asyncio.sleep(0)
+
+        index = game_index_service.get_by_id(game_id)
+        result = GameResult(
+            game_id=game_id,
+            seed=seed,
+            victory_type=results.get("victory_type"),
+            rounds=index.game.current_round,
+            deaths=deaths,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            roles={player_id: bot.role for player_id, bot in bots.items()}
+        )
+        await self._release(game_id)
+        return result
+
+    def _play_night(self, game_id: str, bots: Dict[str, Bot]):
+        """Acciones nocturnas de todos los roles vivos, en el orden del juego"""
+        index = game_index_service.get_by_id(game_id)
+        alive_bots = [bots[player_id] for player_id in index.get_alive_players()]
+
+        for bot in alive_bots:
+            if index.has_role(bot.player_id, GameRole.CUPID) and index.game.current_round == 1:
+                lovers = bot.strategy.choose_lovers(bot, index)
+                if lovers:
+                    player_action_service.cupid_choose_lovers(game_id, bot.player_id, *lovers)
+            elif index.has_role(bot.player_id, GameRole.WILD_CHILD) and index.game.current_round == 1:
+                model_id = bot.strategy.choose_model(bot, index)
+                if model_id:
+                    player_action_service.wild_child_choose_model(game_id, bot.player_id, model_id)
+
+        for bot in alive_bots:
+            if index.has_role(bot.player_id, GameRole.WAREWOLF):
+                target_id = bot.strategy.choose_attack(bot, game_index_service.get_by_id(game_id))
+                if target_id:
+                    player_action_service.warewolf_attack(game_id, bot.player_id, target_id)
+            elif index.has_role(bot.player_id, GameRole.SEER):
+                target_id = bot.strategy.choose_vision(bot, game_index_service.get_by_id(game_id))
+                if target_id and player_action_service.seer_vision(game_id, bot.player_id, target_id):
+                    bot.known_roles[target_id] = index.get_player(target_id).role
+
+        for bot in alive_bots:
+            if not index.has_role(bot.player_id, GameRole.WITCH):
+                continue
+            victim_id = player_action_service.get_warewolf_attack_victim(game_id)
+            current = game_index_service.get_by_id(game_id)
+            if victim_id and bot.strategy.choose_heal(bot, current, victim_id):
+                player_action_service.witch_heal_victim(game_id, bot.player_id, victim_id)
+            target_id = bot.strategy.choose_poison(bot, game_index_service.get_by_id(game_id))
+            if target_id:
+                player_action_service.witch_poison_player(game_id, bot.player_id, target_id)
+
+    def _play_day(self, game_id: str, bots: Dict[str, Bot]):
+        """Votos diurnos de todos los jugadores vivos"""
+        index = game_index_service.get_by_id(game_id)
+        for player_id in index.get_alive_players():
+            bot = bots[player_id]
+            votes = voting_service.get_votes(game_id, VoteType.DAY_VOTE)
+            target_id = bot.strategy.choose_day_vote(bot, index, votes)
+            if target_id:
+                player_action_service.day_vote(game_id, player_id, target_id)
+
+    def _play_hunter_revenge(self, game_id: str, bots: Dict[str, Bot]) -> int:
+        """Venganza pendiente de los cazadores muertos en la última resolución"""
+        kills = 0
+        index = game_index_service.get_by_id(game_id)
+        for hunter_id in sorted(index.role_ids.get(GameRole.HUNTER, ())):
+            if not player_action_service.can_hunter_revenge(game_id, hunter_id):
+                continue
+            bot = bots[hunter_id]
+            target_id = bot.strategy.choose_revenge(bot, game_index_service.get_by_id(game_id))
+            if target_id and player_action_service.hunter_revenge_kill(game_id, hunter_id, target_id):
+                kills += 1
+        return kills
+
+    @staticmethod
+    async def _release(game_id: str):
+        """Liberar el estado en memoria y borrar la partida simulada"""
+        await voting_service.cleanup_session(game_id)
+        pending_actions_service.clear_game(game_id)
+        game_index_service.discard(game_id)
+        eligible_targets_service.invalidate(game_id)
+        day_vote_tally_service.discard(game_id)
+        werewolf_consensus_service.clear_game(game_id)
+        delete_game(game_id)
+
+
+async def run_simulation(simulator: GameSimulator, games: int, seed: int) -> List[GameResult]:
+    """Simular `games` partidas con semillas consecutivas a partir de `seed`"""
+    results = [await simulator.run_game(seed + i) for i in range(games)]
+    await voting_service.flush()
+    return results
+
+
+def print_report(results: List[GameResult], elapsed: float):
+    """Resumen de rendimiento y de resultados"""
+    victories = Counter(result.victory_type or "unfinished" for result in results)
+    durations = sorted(result.duration_ms for result in results)
+
+    print(f"Partidas simuladas: {len(results)} en {elapsed:.2f}s")
+    print(f"Rendimiento: {len(results) / elapsed:.1f} partidas/s")
+    if durations:
+        print(f"Duración por partida: media {sum(durations) / len(durations):.2f} ms, "
+              f"p95 {durations[min(len(durations) - 1, int(len(durations) * 0.95))]:.2f} ms")
+        print(f"Rondas medias: {sum(r.rounds for r in results) / len(results):.2f}, "
+              f"muertes medias: {sum(r.deaths for r in results) / len(results):.2f}")
+    print("Victorias:")
+    for victory_type, count in victories.most_common():
+        print(f"  {victory_type}: {count} ({count / len(results):.1%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulador headless de partidas de Hombres Lobo")
+    parser.add_argument("--games", type=int, default=100, help="Número de partidas a simular")
+    parser.add_argument("--players", type=int, default=12, help="Jugadores por partida (10-18)")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de la primera partida")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="random", help="Estrategia de los bots")
+    parser.add_argument("--werewolf-strategy", choices=sorted(STRATEGIES), help="Estrategia de los lobos (por defecto, la misma)")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS, help="Límite de rondas por partida")
+    parser.add_argument("--min-games-per-second", type=float, help="Fallar si el rendimiento queda por debajo")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    simulator = GameSimulator(args.players, args.strategy, args.werewolf_strategy, args.max_rounds)
+
+    started = time.perf_counter()
+    results = asyncio.run(run_simulation(simulator, args.games, args.seed))
+    elapsed = time.perf_counter() - started
+    print_report(results, elapsed)
+
+    if args.min_games_per_second and len(results) / elapsed < args.min_games_per_second:
+        print(f"Rendimiento por debajo del mínimo ({args.min_games_per_second} partidas/s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
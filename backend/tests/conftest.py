@@ -0,0 +1,32 @@
+"""
+Configuración común de las pruebas unitarias.
+
+app.database crea el engine al importarse: se apunta a una base de datos SQLite
+temporal antes de importar nada de la app para no tocar la base de datos real.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='hombres_lobo_tests_'), 'tests.db')}"
+
+from typing import Dict  # noqa: E402
+
+import pytest  # noqa: E402
+
+from app.models.game_and_roles import GameRole  # noqa: E402
+
+
+@pytest.fixture
+def village() -> Dict[str, GameRole]:
+    """Reparto básico: dos lobos, vidente, bruja, cazador, alguacil y tres aldeanos"""
+    return {
+        "wolf1": GameRole.WAREWOLF,
+        "wolf2": GameRole.WAREWOLF,
+        "seer": GameRole.SEER,
+        "witch": GameRole.WITCH,
+        "hunter": GameRole.HUNTER,
+        "sheriff": GameRole.SHERIFF,
+        "villager1": GameRole.VILLAGER,
+        "villager2": GameRole.VILLAGER,
+        "villager3": GameRole.VILLAGER,
+    }
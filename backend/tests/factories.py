@@ -0,0 +1,34 @@
+"""Constructores de partidas en memoria para las pruebas unitarias"""
+from typing import Dict, Optional
+
+from app.models.game_and_roles import Game, GameRole, GameStatus
+from app.services.game_flow_service import create_player_info
+
+
+def build_game(
+    roles: Dict[str, GameRole],
+    status: GameStatus = GameStatus.NIGHT,
+    current_round: int = 1,
+    night_actions: Optional[Dict[str, Dict[str, str]]] = None,
+    day_votes: Optional[Dict[str, str]] = None
+) -> Game:
+    """Partida en memoria con los roles indicados (en ese orden de jugadores)"""
+    return Game(
+        id="test-game",
+        name="Prueba",
+        creator_id=next(iter(roles)),
+        max_players=max(len(roles), 4),
+        players=list(roles),
+        roles={player_id: create_player_info(role) for player_id, role in roles.items()},
+        status=status,
+        current_round=current_round,
+        night_actions=night_actions or {},
+        day_votes=day_votes or {}
+    )
+
+
+def make_lovers(game: Game, lover1_id: str, lover2_id: str):
+    """Enlazar a dos jugadores como enamorados (lo que hace Cupido)"""
+    for player_id, partner_id in ((lover1_id, lover2_id), (lover2_id, lover1_id)):
+        game.roles[player_id].is_lover = True
+        game.roles[player_id].lover_partner_id = partner_id
@@ -0,0 +1,110 @@
+"""Pruebas de la resolución pura del día (day_resolution_service)"""
+from app.models.game_and_roles import GameStatus
+from app.services.day_resolution_service import get_vote_weight, resolve_day, tally_day_votes
+
+from tests.factories import build_game
+
+
+def day_game(village, day_votes, current_round=1):
+    return build_game(village, status=GameStatus.DAY, current_round=current_round, day_votes=day_votes)
+
+
+def test_majority_is_lynched_and_next_night_prepared(village):
+    game = day_game(village, {"seer": "wolf1", "witch": "wolf1", "villager1": "seer"})
+    resolution = resolve_day(game)
+
+    assert resolution.lynched_player == "wolf1"
+    assert resolution.reason == "Lynching successful"
+    assert resolution.deaths == ["wolf1"]
+    assert resolution.game.status == GameStatus.NIGHT
+    assert resolution.game.current_round == 2
+    assert resolution.game.night_actions == {}
+    assert game.roles["wolf1"].is_alive
+
+
+def test_vote_counts_list_every_alive_player(village):
+    game = day_game(village, {"seer": "wolf1", "witch": "wolf1", "villager1": "seer"})
+    resolution = resolve_day(game)
+
+    counts = {count["player_id"]: count["vote_count"] for count in resolution.vote_counts}
+    assert set(counts) == set(village)
+    assert counts["wolf1"] == 2 and counts["seer"] == 1 and counts["villager2"] == 0
+    assert resolution.vote_counts[0]["player_id"] == "wolf1"
+
+
+def test_sheriff_vote_counts_double(village):
+    game = day_game(village, {"sheriff": "wolf1", "seer": "wolf2", "witch": "wolf2"})
+    assert get_vote_weight(game, "sheriff") == 2
+    assert get_vote_weight(game, "seer") == 1
+    assert tally_day_votes(game) == {"wolf1": 2, "wolf2": 2}
+
+
+def test_dead_voters_and_dead_targets_are_ignored(village):
+    game = day_game(village, {"seer": "wolf1", "witch": "villager1", "villager2": "villager1"})
+    game.roles["villager2"].is_alive = False
+    assert tally_day_votes(game) == {"wolf1": 1, "villager1": 1}
+
+    game.roles["wolf1"].is_alive = False
+    assert tally_day_votes(game) == {"villager1": 1}
+
+
+def test_sheriff_breaks_a_tie_for_the_tied_player_they_voted(village):
+    # alguacil (2) -> wolf1; seer + witch -> wolf2: empate a 2
+    game = day_game(village, {"sheriff": "wolf1", "seer": "wolf2", "witch": "wolf2"})
+    resolution = resolve_day(game)
+
+    assert resolution.lynched_player == "wolf1"
+    assert {"type": "sheriff_tiebreak", "tied_players": ["wolf1", "wolf2"], "chosen_player": "wolf1"} in [
+        {**event, "tied_players": sorted(event["tied_players"])} if event["type"] == "sheriff_tiebreak" else event
+        for event in resolution.events
+    ]
+
+
+def test_tie_without_sheriff_vote_for_a_tied_player_lynches_nobody(village):
+    # wolf1 y wolf2 empatan a 3; el alguacil (2) votó a otro jugador
+    game = day_game(village, {
+        "seer": "wolf1", "witch": "wolf1", "hunter": "wolf1",
+        "villager1": "wolf2", "villager2": "wolf2", "villager3": "wolf2",
+        "sheriff": "seer"
+    })
+    resolution = resolve_day(game)
+
+    assert resolution.lynched_player is None
+    assert resolution.reason == "Tie vote with no sheriff tiebreak"
+    assert resolution.deaths == []
+    assert {"type": "no_lynching", "reason": "Tie vote with no sheriff tiebreak"} in resolution.events
+
+
+def test_dead_sheriff_cannot_break_ties(village):
+    game = day_game(village, {"seer": "wolf1", "witch": "wolf2", "sheriff": "wolf1"})
+    game.roles["sheriff"].is_alive = False
+    resolution = resolve_day(game)
+    assert resolution.lynched_player is None
+
+
+def test_no_votes_lynches_nobody(village):
+    resolution = resolve_day(day_game(village, {}))
+    assert resolution.lynched_player is None
+    assert resolution.reason == "No votes cast"
+    assert resolution.game.status == GameStatus.NIGHT
+
+
+def test_lynching_the_last_werewolf_ends_the_game(village):
+    game = day_game(village, {"seer": "wolf1", "witch": "wolf1"})
+    game.roles["wolf2"].is_alive = False
+    resolution = resolve_day(game)
+
+    assert resolution.game.status == GameStatus.FINISHED
+    assert resolution.victory["victory_type"] == "villagers"
+    assert "wolf1" not in resolution.victory["winner_ids"]
+
+
+def test_lynched_sheriff_hands_over_to_the_successor(village):
+    game = day_game(village, {"seer": "sheriff", "witch": "sheriff"})
+    game.roles["sheriff"].successor_id = "villager1"
+    resolution = resolve_day(game)
+
+    successor = resolution.game.roles["villager1"]
+    assert successor.role.value == "sheriff"
+    assert successor.has_double_vote and successor.can_break_ties
+    assert {"type": "sheriff_succession", "old_sheriff": "sheriff", "new_sheriff": "villager1"} in resolution.notifications
@@ -0,0 +1,115 @@
+"""Pruebas de la cascada de muertes (death_cascade_service)"""
+from app.models.game_and_roles import GameRole
+from app.services.death_cascade_service import resolve_death_cascade
+from app.services.game_index_service import GameIndex
+
+from tests.factories import build_game, make_lovers
+
+
+def test_single_death_without_consequences(village):
+    game = build_game(village)
+    cascade = resolve_death_cascade(game, [("villager1", "lynching")])
+
+    assert cascade.deaths == ["villager1"]
+    assert cascade.events == [{"type": "death", "player_id": "villager1", "cause": "lynching"}]
+    assert cascade.notifications == []
+    assert not game.roles["villager1"].is_alive
+
+
+def test_lover_chain_kills_the_partner_once(village):
+    game = build_game(village)
+    make_lovers(game, "seer", "villager1")
+    cascade = resolve_death_cascade(game, [("seer", "werewolf_attack"), ("villager1", "witch_poison")])
+
+    assert cascade.deaths == ["seer", "villager1"]
+    assert [event["cause"] for event in cascade.events if event["type"] == "death"] == ["werewolf_attack", "witch_poison"]
+    assert not any(n["type"] == "lover_death" for n in cascade.notifications)
+
+
+def test_lover_dies_of_grief(village):
+    game = build_game(village)
+    make_lovers(game, "seer", "villager1")
+    cascade = resolve_death_cascade(game, [("seer", "werewolf_attack")])
+
+    assert cascade.deaths == ["seer", "villager1"]
+    assert {"type": "death", "player_id": "villager1", "cause": "love", "source": "seer"} in cascade.events
+    assert {"type": "lover_death", "original_death": "seer", "lover_deaths": ["villager1"]} in cascade.notifications
+
+
+def test_dead_hunter_gets_a_pending_revenge(village):
+    game = build_game(village)
+    cascade = resolve_death_cascade(game, [("hunter", "lynching")])
+
+    assert game.roles["hunter"].can_revenge_kill is True
+    assert {"type": "hunter_revenge_available", "hunter_id": "hunter"} in cascade.notifications
+    # La venganza no mata a nadie hasta que el cazador elige objetivo
+    assert cascade.deaths == ["hunter"]
+
+
+def test_hunter_who_already_took_revenge_gets_nothing(village):
+    game = build_game(village)
+    game.roles["hunter"].has_used_revenge = True
+    cascade = resolve_death_cascade(game, [("hunter", "lynching")])
+    assert not any(n["type"] == "hunter_revenge_available" for n in cascade.notifications)
+
+
+def test_sheriff_succession(village):
+    game = build_game(village)
+    game.roles["sheriff"].successor_id = "villager2"
+    cascade = resolve_death_cascade(game, [("sheriff", "werewolf_attack")])
+
+    successor = game.roles["villager2"]
+    assert successor.role == GameRole.SHERIFF
+    assert successor.has_double_vote and successor.can_break_ties
+    assert any(n["type"] == "sheriff_succession" and n["new_sheriff"] == "villager2" for n in cascade.notifications)
+
+
+def test_sheriff_succession_skips_a_dead_successor(village):
+    game = build_game(village)
+    game.roles["sheriff"].successor_id = "villager2"
+    make_lovers(game, "sheriff", "villager2")
+    resolve_death_cascade(game, [("sheriff", "werewolf_attack")])
+    assert game.roles["villager2"].role == GameRole.VILLAGER
+
+
+def test_wild_child_turns_werewolf_when_the_model_dies(village):
+    roles = dict(village, child=GameRole.WILD_CHILD)
+    game = build_game(roles)
+    game.roles["child"].model_player_id = "seer"
+    cascade = resolve_death_cascade(game, [("seer", "werewolf_attack")])
+
+    assert game.roles["child"].role == GameRole.WAREWOLF
+    assert game.roles["child"].has_transformed
+    assert cascade.transformations[0]["wild_child_id"] == "child"
+    notification = next(n for n in cascade.notifications if n["type"] == "new_werewolf")
+    assert notification["new_werewolf"] == "child"
+    assert sorted(notification["existing_werewolves"]) == ["wolf1", "wolf2"]
+
+
+def test_initial_death_counts_even_if_already_marked_dead(village):
+    game = build_game(village)
+    game.roles["villager1"].is_alive = False
+    cascade = resolve_death_cascade(game, [("villager1", "werewolf_attack")])
+    assert cascade.deaths == ["villager1"]
+
+
+def test_unknown_player_is_ignored(village):
+    cascade = resolve_death_cascade(build_game(village), [("ghost", "lynching")])
+    assert cascade.deaths == []
+
+
+def test_index_follows_deaths_and_transformations(village):
+    roles = dict(village, child=GameRole.WILD_CHILD)
+    game = build_game(roles)
+    game.roles["child"].model_player_id = "hunter"
+    game.roles["sheriff"].successor_id = "villager3"
+    make_lovers(game, "hunter", "sheriff")
+    index = GameIndex.from_game(game)
+
+    resolve_death_cascade(game, [("hunter", "lynching")], index=index)
+
+    rebuilt = GameIndex.from_game(game)
+    assert index.alive == rebuilt.alive
+    assert (index.alive_werewolves, index.alive_villagers) == (rebuilt.alive_werewolves, rebuilt.alive_villagers)
+    assert {role: ids for role, ids in index.role_ids.items() if ids} == rebuilt.role_ids
+    assert index.sheriff_id == rebuilt.sheriff_id == "villager3"
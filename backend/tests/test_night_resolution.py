@@ -0,0 +1,123 @@
+"""Pruebas de la resolución pura de la noche (night_resolution_service)"""
+from app.models.game_and_roles import GameRole, GameStatus
+from app.services.game_index_service import GameIndex
+from app.services.night_resolution_service import get_werewolf_consensus, resolve_night, start_night
+
+from tests.factories import build_game, make_lovers
+
+
+def test_consensus_requires_every_alive_werewolf(village):
+    game = build_game(village)
+    assert get_werewolf_consensus(game, {"warewolf_attacks": {"wolf1": "seer"}}) is None
+    assert get_werewolf_consensus(game, {"warewolf_attacks": {"wolf1": "seer", "wolf2": "seer"}}) == "seer"
+
+
+def test_consensus_ignores_dead_werewolves(village):
+    game = build_game(village)
+    game.roles["wolf2"].is_alive = False
+    assert get_werewolf_consensus(game, {"warewolf_attacks": {"wolf1": "seer", "wolf2": "witch"}}) == "seer"
+
+
+def test_consensus_tie_has_no_victim(village):
+    game = build_game(village)
+    assert get_werewolf_consensus(game, {"warewolf_attacks": {"wolf1": "seer", "wolf2": "witch"}}) is None
+    assert get_werewolf_consensus(game, {}) is None
+
+
+def test_attack_kills_victim_and_moves_to_day(village):
+    game = build_game(village, night_actions={"warewolf_attacks": {"wolf1": "seer", "wolf2": "seer"}})
+    resolution = resolve_night(game)
+
+    assert resolution.deaths == ["seer"]
+    assert not resolution.game.roles["seer"].is_alive
+    assert resolution.game.status == GameStatus.DAY
+    assert resolution.game.day_votes == {}
+    assert resolution.victory is None
+    assert [event["type"] for event in resolution.events] == ["werewolf_attack", "death"]
+
+
+def test_input_game_is_not_modified(village):
+    game = build_game(village, night_actions={"warewolf_attacks": {"wolf1": "seer", "wolf2": "seer"}})
+    resolve_night(game)
+    assert game.roles["seer"].is_alive
+    assert game.status == GameStatus.NIGHT
+
+
+def test_witch_heal_saves_victim_and_poison_kills(village):
+    game = build_game(village, night_actions={
+        "warewolf_attacks": {"wolf1": "seer", "wolf2": "seer"},
+        "witch_heal": {"witch": "seer"},
+        "witch_poison": {"witch": "wolf1"},
+    })
+    resolution = resolve_night(game)
+
+    assert resolution.deaths == ["wolf1"]
+    assert resolution.game.roles["seer"].is_alive
+    assert {"type": "witch_healing", "healed": ["seer"]} in resolution.events
+    assert {"type": "witch_poison", "poisoned": ["wolf1"]} in resolution.events
+
+
+def test_explicit_night_actions_override_the_game_ones(village):
+    game = build_game(village, night_actions={"warewolf_attacks": {"wolf1": "seer", "wolf2": "seer"}})
+    resolution = resolve_night(game, {"warewolf_attacks": {"wolf1": "witch", "wolf2": "witch"}})
+    assert resolution.deaths == ["witch"]
+
+
+def test_lover_dies_of_grief(village):
+    game = build_game(village, night_actions={"warewolf_attacks": {"wolf1": "seer", "wolf2": "seer"}})
+    make_lovers(game, "seer", "villager1")
+    resolution = resolve_night(game)
+
+    assert resolution.deaths == ["seer", "villager1"]
+    assert {"type": "death", "player_id": "villager1", "cause": "love", "source": "seer"} in resolution.events
+
+
+def test_werewolf_victory_finishes_the_game():
+    game = build_game(
+        {"wolf": GameRole.WAREWOLF, "seer": GameRole.SEER, "villager": GameRole.VILLAGER},
+        night_actions={"warewolf_attacks": {"wolf": "seer"}}
+    )
+    resolution = resolve_night(game)
+
+    assert resolution.game.status == GameStatus.FINISHED
+    assert resolution.victory == {"victory_type": "werewolves", "winner_ids": ["wolf"]}
+
+
+def test_villager_victory_when_last_werewolf_is_poisoned():
+    game = build_game(
+        {"wolf": GameRole.WAREWOLF, "witch": GameRole.WITCH, "villager1": GameRole.VILLAGER, "villager2": GameRole.VILLAGER},
+        night_actions={"warewolf_attacks": {"wolf": "villager1"}, "witch_poison": {"witch": "wolf"}}
+    )
+    resolution = resolve_night(game)
+
+    assert resolution.deaths == ["villager1", "wolf"]
+    assert resolution.victory == {"victory_type": "villagers", "winner_ids": ["witch", "villager2"]}
+
+
+def test_index_is_kept_in_sync_with_the_deaths(village):
+    game = build_game(village, night_actions={"warewolf_attacks": {"wolf1": "hunter", "wolf2": "hunter"}})
+    make_lovers(game, "hunter", "wolf2")
+    index = GameIndex.from_game(game)
+    resolution = resolve_night(game, index=index)
+
+    rebuilt = GameIndex.from_game(resolution.game)
+    assert index.alive == rebuilt.alive
+    assert (index.alive_werewolves, index.alive_villagers) == (rebuilt.alive_werewolves, rebuilt.alive_villagers)
+
+
+def test_start_night_resets_night_state(village):
+    game = build_game(village, status=GameStatus.DAY, current_round=2,
+                      night_actions={"warewolf_attacks": {"wolf1": "seer"}})
+    game.roles["wolf1"].has_acted_tonight = True
+    game.roles["wolf1"].target_player_id = "seer"
+    game.roles["seer"].has_used_vision_tonight = True
+
+    night = start_night(game)
+
+    assert night.status == GameStatus.NIGHT
+    assert night.current_round == 3
+    assert night.night_actions == {}
+    assert night.roles["wolf1"].has_acted_tonight is False
+    assert night.roles["wolf1"].target_player_id is None
+    assert night.roles["seer"].has_used_vision_tonight is False
+    assert game.current_round == 2
@@ -0,0 +1,117 @@
+"""Pruebas del planificador de timers de fase (PhaseTimerScheduler)"""
+import asyncio
+import random
+
+from app.services.phase_scheduler_service import PhaseTimerScheduler
+
+
+def noop():
+    return None
+
+
+def assert_heap_invariant(scheduler: PhaseTimerScheduler):
+    heap = scheduler._heap
+    assert len(heap) == len(scheduler._entries)
+    for i, entry in enumerate(heap):
+        assert entry.index == i
+        assert scheduler._entries[entry.key] is entry
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                assert entry.sort_key() <= heap[child].sort_key()
+
+
+def test_minimum_deadline_is_at_the_top():
+    scheduler = PhaseTimerScheduler()
+    for key, deadline in (("c", 30.0), ("a", 10.0), ("b", 20.0)):
+        scheduler.schedule_at(key, deadline, noop)
+
+    assert scheduler._heap[0].key == "a"
+    assert scheduler.get_deadline("b") == 20.0
+    assert_heap_invariant(scheduler)
+
+
+def test_reschedule_updates_in_place():
+    scheduler = PhaseTimerScheduler()
+    scheduler.schedule_at("a", 10.0, noop)
+    scheduler.schedule_at("b", 20.0, noop)
+
+    scheduler.schedule_at("b", 5.0, noop)
+    assert scheduler._heap[0].key == "b"
+    assert len(scheduler._heap) == 2
+
+    scheduler.schedule_at("b", 50.0, noop)
+    assert scheduler._heap[0].key == "a"
+    assert scheduler.get_deadline("b") == 50.0
+    assert_heap_invariant(scheduler)
+
+
+def test_cancel():
+    scheduler = PhaseTimerScheduler()
+    scheduler.schedule_at("a", 10.0, noop)
+    scheduler.schedule_at("b", 20.0, noop)
+
+    assert scheduler.cancel("a") is True
+    assert scheduler.cancel("a") is False
+    assert not scheduler.has_timer("a")
+    assert scheduler._heap[0].key == "b"
+    assert scheduler.cancelled_total == 1
+    assert_heap_invariant(scheduler)
+
+
+def test_random_operations_keep_the_heap_invariant():
+    for seed in range(20):
+        rng = random.Random(seed)
+        scheduler = PhaseTimerScheduler()
+        expected = {}
+        for _ in range(300):
+            key = f"game-{rng.randrange(40)}"
+            if rng.random() < 0.3:
+                assert scheduler.cancel(key) == (key in expected)
+                expected.pop(key, None)
+            else:
+                deadline = rng.uniform(0, 100)
+                scheduler.schedule_at(key, deadline, noop)
+                expected[key] = deadline
+            assert_heap_invariant(scheduler)
+
+        assert {key: scheduler.get_deadline(key) for key in expected} == expected
+        if expected:
+            assert scheduler._heap[0].deadline == min(expected.values())
+
+
+def test_due_timers_fire_in_deadline_order_in_one_batch():
+    async def scenario():
+        scheduler = PhaseTimerScheduler(tick_resolution=0.05)
+        fired = []
+        scheduler.schedule("late", 0.03, lambda: fired.append("late"))
+        scheduler.schedule("early", 0.01, lambda: fired.append("early"))
+        scheduler.schedule("cancelled", 0.02, lambda: fired.append("cancelled"))
+        scheduler.schedule("future", 60, lambda: fired.append("future"))
+        scheduler.cancel("cancelled")
+
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+        return scheduler, fired
+
+    scheduler, fired = asyncio.run(scenario())
+    assert fired == ["early", "late"]
+    assert scheduler.batches_total == 1
+    assert scheduler.has_timer("future")
+
+
+def test_reschedule_postpones_the_callback():
+    async def scenario():
+        scheduler = PhaseTimerScheduler(tick_resolution=0.01)
+        fired = []
+        scheduler.schedule("phase", 0.02, lambda: fired.append("first"))
+        scheduler.schedule("phase", 0.1, lambda: fired.append("second"))
+
+        await asyncio.sleep(0.05)
+        before = list(fired)
+        await asyncio.sleep(0.15)
+        await scheduler.stop()
+        return before, fired
+
+    before, fired = asyncio.run(scenario())
+    assert before == []
+    assert fired == ["second"]
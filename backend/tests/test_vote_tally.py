@@ -0,0 +1,141 @@
+"""Pruebas del recuento incremental de votos (VoteTally)"""
+import random
+from collections import Counter
+
+from app.services.vote_tally_service import VoteTally
+
+
+def naive_leaders(votes, weights):
+    counts = Counter()
+    for voter_id, target_id in votes.items():
+        counts[target_id] += weights.get(voter_id, 1)
+    if not counts:
+        return counts, set()
+    top = max(counts.values())
+    return counts, {target for target, count in counts.items() if count == top}
+
+
+def test_first_vote_delta():
+    tally = VoteTally()
+    delta = tally.cast("a", "x")
+
+    assert delta == {
+        "voter_id": "a",
+        "previous_target": None,
+        "target_id": "x",
+        "changes": {"x": 1},
+        "leaders": ["x"],
+        "is_tie": False,
+        "total_votes": 1
+    }
+    assert tally.get_winner() == "x"
+
+
+def test_repeated_vote_changes_nothing():
+    tally = VoteTally()
+    tally.cast("a", "x")
+    version = tally.version
+    assert tally.cast("a", "x") is None
+    assert tally.version == version
+
+
+def test_vote_change_moves_the_count():
+    tally = VoteTally()
+    tally.cast("a", "x")
+    tally.cast("b", "x")
+    delta = tally.cast("a", "y")
+
+    assert delta["previous_target"] == "x"
+    assert delta["changes"] == {"x": 1, "y": 1}
+    assert delta["leaders"] == ["x", "y"] and delta["is_tie"]
+    assert tally.get_winner() is None
+    assert tally.total_votes == 2
+
+
+def test_retract_and_max_count_goes_down():
+    tally = VoteTally()
+    tally.cast("a", "x")
+    tally.cast("b", "x")
+    tally.cast("c", "y")
+    assert tally.max_count == 2
+
+    delta = tally.retract("a")
+    assert delta["target_id"] is None
+    assert delta["changes"] == {"x": 1}
+    assert tally.max_count == 1
+    assert tally.leaders == {"x", "y"}
+
+    assert tally.retract("a") is None
+    tally.retract("b")
+    tally.retract("c")
+    assert tally.max_count == 0
+    assert tally.leaders == set() and tally.get_winner() is None
+    assert tally.counts == {} and tally.buckets == {}
+
+
+def test_weighted_vote_and_weight_change():
+    tally = VoteTally()
+    tally.cast("sheriff", "x", weight=2)
+    tally.cast("a", "y")
+    tally.cast("b", "y")
+    assert tally.is_tie
+
+    delta = tally.cast("sheriff", "x", weight=1)
+    assert delta["changes"] == {"x": 1}
+    assert tally.get_winner() == "y"
+
+
+def test_max_count_drops_by_the_weight_of_the_retracted_vote():
+    tally = VoteTally()
+    tally.cast("sheriff", "x", weight=2)
+    tally.cast("a", "y")
+    tally.cast("sheriff", "y", weight=2)
+    assert tally.counts == {"y": 3} and tally.max_count == 3
+    tally.retract("sheriff")
+    assert tally.max_count == 1 and tally.leaders == {"y"}
+
+
+def test_sorted_candidates_follow_changes():
+    tally = VoteTally()
+    tally.cast("a", "y")
+    tally.cast("b", "x")
+    assert tally.get_sorted_candidates() == [("x", 1), ("y", 1)]
+    tally.cast("c", "y")
+    assert tally.get_sorted_candidates() == [("y", 2), ("x", 1)]
+
+
+def test_copy_is_independent():
+    tally = VoteTally.from_votes({"a": "x"})
+    clone = tally.copy()
+    clone.cast("b", "y")
+    clone.cast("c", "y")
+    assert tally.leaders == {"x"}
+    assert clone.leaders == {"y"}
+
+
+def test_incremental_tally_matches_a_full_recount():
+    players = [f"p{i}" for i in range(12)]
+    for seed in range(50):
+        rng = random.Random(seed)
+        weights = {rng.choice(players): 2}
+        tally = VoteTally()
+        votes = {}
+
+        for _ in range(60):
+            voter_id = rng.choice(players)
+            if voter_id in votes and rng.random() < 0.2:
+                tally.retract(voter_id)
+                del votes[voter_id]
+            else:
+                target_id = rng.choice(players)
+                tally.cast(voter_id, target_id, weights.get(voter_id, 1))
+                votes[voter_id] = target_id
+
+            counts, leaders = naive_leaders(votes, weights)
+            assert tally.counts == dict(counts), seed
+            assert tally.leaders == leaders, seed
+            assert tally.max_count == max(counts.values(), default=0), seed
+
+        rebuilt = VoteTally.from_votes(votes, lambda voter_id: weights.get(voter_id, 1))
+        assert rebuilt.counts == tally.counts
+        assert rebuilt.leaders == tally.leaders
@@ -0,0 +1,76 @@
+"""Pruebas del recuento incremental del ataque de los hombres lobo (WerewolfConsensus)"""
+import random
+
+from app.models.game_and_roles import GameRole
+from app.services.night_resolution_service import get_werewolf_consensus
+from app.services.werewolf_consensus_service import WerewolfConsensus
+
+from tests.factories import build_game
+
+
+def test_from_game_counts_only_alive_werewolves(village):
+    game = build_game(village, night_actions={"warewolf_attacks": {"wolf1": "seer", "wolf2": "witch"}})
+    game.roles["wolf2"].is_alive = False
+    consensus = WerewolfConsensus.from_game(game, version=3)
+
+    assert consensus.alive_werewolves == {"wolf1"}
+    assert consensus.version == 3 and consensus.round == game.current_round
+    assert consensus.all_voted
+    assert consensus.target == "seer"
+
+
+def test_target_waits_for_every_werewolf(village):
+    consensus = WerewolfConsensus.from_game(build_game(village), version=0)
+    assert not consensus.all_voted and consensus.target is None
+
+    consensus.cast("wolf1", "seer")
+    assert consensus.target is None
+
+    consensus.cast("wolf2", "seer")
+    assert consensus.target == "seer"
+
+
+def test_split_vote_has_no_target(village):
+    consensus = WerewolfConsensus.from_game(build_game(village), version=0)
+    consensus.cast("wolf1", "seer")
+    consensus.cast("wolf2", "witch")
+    assert consensus.all_voted and consensus.target is None
+
+    consensus.cast("wolf2", "seer")
+    assert consensus.target == "seer"
+
+
+def test_non_werewolf_votes_are_ignored(village):
+    consensus = WerewolfConsensus.from_game(build_game(village), version=0)
+    consensus.cast("seer", "wolf1")
+    assert consensus.tally.total_votes == 0
+
+
+def test_copy_is_independent(village):
+    consensus = WerewolfConsensus.from_game(build_game(village), version=0)
+    consensus.cast("wolf1", "seer")
+    clone = consensus.copy()
+    clone.cast("wolf2", "seer")
+    assert consensus.target is None
+    assert clone.target == "seer"
+
+
+def test_matches_the_night_resolution_rule():
+    for seed in range(200):
+        rng = random.Random(seed)
+        roles = {f"wolf{i}": GameRole.WAREWOLF for i in range(rng.randint(1, 4))}
+        roles.update({f"villager{i}": GameRole.VILLAGER for i in range(6)})
+        game = build_game(roles)
+        for player_id in roles:
+            if rng.random() < 0.2:
+                game.roles[player_id].is_alive = False
+
+        attacks = {
+            wolf_id: rng.choice(list(roles))
+            for wolf_id, role in roles.items()
+            if role == GameRole.WAREWOLF and rng.random() < 0.85
+        }
+        game.night_actions = {"warewolf_attacks": attacks}
+
+        consensus = WerewolfConsensus.from_game(game, version=0)
+        assert consensus.target == get_werewolf_consensus(game, game.night_actions), seed
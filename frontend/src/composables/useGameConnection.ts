@@ -2,6 +2,7 @@ import { ref, computed, onMounted, onUnmounted } from 'vue'
 import { useWebSocketPolling } from '../websocket/WebSocketPollingManager'
 import { useAuthStore, logoutEventBus } from '../stores/authStore'
 import type { PlayerStatus, PlayerDTO } from '../types'
+import type { WebSocketMessageMap } from '../types/websocket'
 import type { WebSocketPollingManager } from '../websocket/WebSocketPollingManager'
 
 export interface GameConnectionState {
@@ -13,7 +14,12 @@ export interface GameConnectionState {
   lastUpdate: Date | null
 }
 
-export function useGameConnection(gameId: string) {
+export interface GameConnectionOptions {
+  /** Se invoca con cada `phase_changed` (y `phase_timer`, si el servidor emite ticks) */
+  onPhaseChanged?: (data: WebSocketMessageMap['phase_changed'] | WebSocketMessageMap['phase_timer']) => void
+}
+
+export function useGameConnection(gameId: string, options: GameConnectionOptions = {}) {
   const auth = useAuthStore()
   const { createConnection, connectionStatus } = useWebSocketPolling(gameId)
   
@@ -178,7 +184,20 @@ export function useGameConnection(gameId: string) {
 
   const unsubHeartbeat = wsManager.subscribe('heartbeat', handleHeartbeat)
 
-      unsubscribeFunctions = [unsubGameState, unsubUserStatusChanged, unsubSuccess, unsubError, unsubHeartbeat]
+      // Suscribirse a los cambios de fase: el deadline llega una vez y la cuenta atrás es local
+  const handlePhaseChanged = (data: unknown) => {
+        const payload = data as WebSocketMessageMap['phase_changed'] | WebSocketMessageMap['phase_timer'] | undefined
+        if (!payload?.phase) return
+        options.onPhaseChanged?.(payload)
+      }
+
+  const unsubPhaseChanged = wsManager.subscribe('phase_changed', handlePhaseChanged)
+  const unsubPhaseTimer = wsManager.subscribe('phase_timer', handlePhaseChanged)
+
+      unsubscribeFunctions = [
+        unsubGameState, unsubUserStatusChanged, unsubSuccess, unsubError, unsubHeartbeat,
+        unsubPhaseChanged, unsubPhaseTimer
+      ]
 
       // Solicitar el estado inicial del juego
       requestGameState()
@@ -0,0 +1,48 @@
+import { ref, computed, onUnmounted } from 'vue'
+
+/**
+ * Cuenta atrás de fase calculada en el cliente.
+ * El backend envía el deadline absoluto una única vez en `phase_changed`; aquí se
+ * corrige el desfase de reloj con `server_time` y se refresca localmente cada segundo,
+ * sin depender de mensajes `phase_timer` periódicos.
+ */
+export function usePhaseCountdown() {
+  const deadlineMs = ref<number | null>(null)
+  const clockOffsetMs = ref(0)
+  const now = ref(Date.now())
+  let intervalId: ReturnType<typeof setInterval> | null = null
+
+  const remainingSeconds = computed(() => {
+    if (deadlineMs.value === null) return 0
+    const serverNow = now.value + clockOffsetMs.value
+    return Math.max(0, Math.ceil((deadlineMs.value - serverNow) / 1000))
+  })
+
+  function start() {
+    if (intervalId) return
+    intervalId = setInterval(() => {
+      now.value = Date.now()
+      if (remainingSeconds.value === 0) stop()
+    }, 1000)
+  }
+
+  function stop() {
+    if (intervalId) {
+      clearInterval(intervalId)
+      intervalId = null
+    }
+  }
+
+  /** Sincronizar con el payload de `phase_changed` (o `phase_timer` si el servidor emite ticks) */
+  function setDeadline(deadline?: number | null, serverTime?: number | null) {
+    now.value = Date.now()
+    if (serverTime) clockOffsetMs.value = serverTime * 1000 - now.value
+    deadlineMs.value = deadline ? deadline * 1000 : null
+    if (deadlineMs.value === null) stop()
+    else start()
+  }
+
+  onUnmounted(stop)
+
+  return { remainingSeconds, setDeadline, stop }
+}
@@ -124,13 +124,19 @@ export interface WebSocketMessageMap {
   force_next_phase: undefined
 
   // Fases del juego
-  phase_changed: { previous: string; current: string }
-  phase_timer: { remainingSeconds: number }
+  phase_changed: {
+    phase: string
+    previous_phase?: string | null
+    duration: number
+    deadline?: number | null // epoch (segundos) de fin de fase
+    server_time?: number | null // epoch (segundos) del servidor al emitir
+  }
+  phase_timer: { phase: string; time_remaining: number; deadline?: number | null }
 
   // Votaciones
-  cast_vote: { voter_id: string; target_id: string }
-  get_voting_status: undefined
-  vote_cast: { voter_id: string; target_id: string }
+  cast_vote: { voter_id: string; target_id: string; vote_type?: string } // day_vote por defecto
+  get_voting_status: { vote_type?: string } | undefined
+  vote_cast: { voter_id: string; target_id: string; vote_type: string }
   voting_started: { options?: Record<string, unknown> }
   voting_ended: { results?: Record<string, unknown> }
   voting_results: { results: Record<string, number> }